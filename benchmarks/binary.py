@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Load time of the binary tree format.
+
+Saves a random tree with ``Tree.save_binary`` and compares opening it with
+``MappedTree`` against parsing the same tree from JSON.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ttree import Tree, MappedTree  # noqa: E402
+
+
+parser = argparse.ArgumentParser(description='Measure binary load time.')
+parser.add_argument('--size', type=int, default=10 ** 6,
+                    help='Number of nodes in the tree')
+args = parser.parse_args()
+
+
+def measure(name, function):
+    start = time.perf_counter()
+    result = function()
+    print(f'{name:>24}: {time.perf_counter() - start:.3f} s')
+    return result
+
+
+def main():
+    random.seed(0)
+    rows = [(0, None, '0', None)]
+    rows.extend((node_id, random.randrange(node_id), str(node_id), None)
+                for node_id in range(1, args.size))
+    tree = Tree.from_edges(rows)
+
+    with tempfile.TemporaryDirectory() as directory:
+        binary = os.path.join(directory, 'tree.bin')
+        measure('save_binary', lambda: tree.save_binary(binary))
+        json = measure('to_json', tree.to_json)
+
+        mapped = measure('MappedTree open', lambda: MappedTree(binary))
+        measure('children of root', lambda: mapped.children(mapped.root))
+        measure('level of a node (index)', lambda: mapped.level(1))
+        measure('from_json', lambda: Tree.from_json(json))
+        print(f'binary file: {os.path.getsize(binary) / 2 ** 20:.1f} MiB, '
+              f'json: {len(json) / 2 ** 20:.1f} MiB')
+        mapped.close()
+
+
+if __name__ == '__main__':
+    main()
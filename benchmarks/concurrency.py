@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Benchmark of ``ConcurrentTree`` under contention.
+
+N reader threads traverse random subtrees while M writer threads run
+transactions adding and removing nodes, each writer in its own branch of
+the root. Transactions are made either under the whole-tree write lock
+or under the lock of the writer's subtree.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ttree import Tree  # noqa: E402
+from ttree.concurrency import ConcurrentTree  # noqa: E402
+
+
+parser = argparse.ArgumentParser(description='Measure ConcurrentTree.')
+parser.add_argument('--size', type=int, default=10 ** 4,
+                    help='Number of nodes in every branch')
+parser.add_argument('--readers', type=int, default=4,
+                    help='Number of reader threads')
+parser.add_argument('--writers', type=int, default=4,
+                    help='Number of writer threads')
+parser.add_argument('--seconds', type=float, default=2.0,
+                    help='Duration of every run')
+parser.add_argument('--work', type=float, default=0.0005,
+                    help='Seconds of work outside the tree per transaction')
+args = parser.parse_args()
+
+
+def build():
+    tree = Tree()
+    tree.create_node('root', 'root')
+    for branch in range(args.writers):
+        tree.create_node(branch, (branch, 0), parent='root')
+        for i in range(1, args.size):
+            tree.create_node(i, (branch, i),
+                             parent=(branch, random.randrange(i)))
+    return ConcurrentTree(tree)
+
+
+def reader(tree, stop, counts):
+    rng = random.Random()
+    while not stop.is_set():
+        start = (rng.randrange(args.writers), rng.randrange(args.size))
+        counts.append(sum(1 for _ in tree.expand_tree(start)))
+
+
+def writer(tree, branch, mode, stop, counts):
+    rng = random.Random(branch)
+    serial = args.size
+    while not stop.is_set():
+        parent = (branch, rng.randrange(args.size))
+        lock = tree.write() if mode == 'tree' else tree.lock_subtree(
+            (branch, 0)
+        )
+        with lock:
+            # Read, think, write: the transaction keeps the lock
+            tree.children(parent)
+            time.sleep(args.work)
+            node = tree.create_node(serial, (branch, serial), parent=parent)
+            tree.remove_node(node.id)
+        serial += 1
+        counts.append(1)
+
+
+def run(mode):
+    random.seed(0)
+    tree = build()
+    stop = threading.Event()
+    reads, writes = [], []
+    threads = [threading.Thread(target=reader, args=(tree, stop, reads))
+               for _ in range(args.readers)]
+    threads += [
+        threading.Thread(target=writer,
+                         args=(tree, branch, mode, stop, writes))
+        for branch in range(args.writers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(f'{mode + " lock":>12}: {len(writes) / args.seconds:8.0f} '
+          f'transactions/s, {len(reads) / args.seconds:6.0f} traversals/s, '
+          f'{sum(reads) / args.seconds:9.0f} nodes read/s')
+
+
+def main():
+    print(f'{args.readers} readers, {args.writers} writers, '
+          f'{args.writers * args.size + 1} nodes')
+    for mode in ('tree', 'subtree'):
+        run(mode)
+
+
+if __name__ == '__main__':
+    main()
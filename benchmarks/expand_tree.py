@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Benchmark of ``Tree.expand_tree`` traversal modes.
+
+Random trees from 10^3 up to ``--max-size`` nodes are traversed in every
+mode. Time per node must stay flat while the tree grows, which shows
+that traversal is linear in the number of nodes.
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ttree import Tree  # noqa: E402
+from ttree.common import TraversalMode  # noqa: E402
+
+
+parser = argparse.ArgumentParser(description='Measure expand_tree scaling.')
+parser.add_argument('--max-size', type=int, default=10 ** 6,
+                    help='Size of the largest tree')
+parser.add_argument('--repeat', type=int, default=3,
+                    help='Number of repetitions, the best one is reported')
+args = parser.parse_args()
+
+
+def build_tree(size):
+    """Build a random recursive tree: each node hangs under a random
+    earlier one."""
+    tree = Tree()
+    tree.create_node('0', 0)
+    for node_id in range(1, size):
+        tree.create_node(str(node_id), node_id,
+                         parent=random.randrange(node_id))
+    return tree
+
+
+def main():
+    random.seed(0)
+    print(f'{"nodes":>10} {"mode":>8} {"total, s":>10} {"per node, us":>13}')
+
+    size = 10 ** 3
+    while size <= args.max_size:
+        tree = build_tree(size)
+        for mode in TraversalMode:
+            best = min(timeit.repeat(
+                lambda: sum(1 for _ in tree.expand_tree(mode=mode)),
+                number=1, repeat=args.repeat
+            ))
+            print(f'{size:>10} {mode.value:>8} {best:>10.3f} '
+                  f'{best / size * 10 ** 6:>13.2f}')
+        size *= 10
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Throughput of bulk tree construction.
+
+Compares ``Tree.from_edges`` on shuffled rows with ``create_node`` called
+for every row in parent-before-child order.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ttree import Tree  # noqa: E402
+
+
+parser = argparse.ArgumentParser(description='Measure tree construction.')
+parser.add_argument('--size', type=int, default=10 ** 6,
+                    help='Number of rows')
+args = parser.parse_args()
+
+
+def main():
+    random.seed(0)
+    rows = [(0, None, '0', None)]
+    rows.extend((node_id, random.randrange(node_id), str(node_id), None)
+                for node_id in range(1, args.size))
+
+    start = time.perf_counter()
+    tree = Tree()
+    for node_id, parent, tag, data in rows:
+        tree.create_node(tag, node_id, parent=parent, data=data)
+    elapsed = time.perf_counter() - start
+    print(f'create_node, ordered: {elapsed:.3f} s, '
+          f'{args.size / elapsed:,.0f} rows/s')
+
+    for name in ('ordered', 'shuffled'):
+        if name == 'shuffled':
+            random.shuffle(rows)
+
+        start = time.perf_counter()
+        Tree.from_edges(rows)
+        elapsed = time.perf_counter() - start
+        print(f'from_edges, {name}: {elapsed:.3f} s, '
+              f'{args.size / elapsed:,.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
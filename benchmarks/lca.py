@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Benchmark of lowest common ancestor queries.
+
+Compares ``Tree.lca`` with the naive intersection of two ``rsearch``
+paths on a random tree.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ttree import Tree  # noqa: E402
+
+
+parser = argparse.ArgumentParser(description='Measure LCA queries.')
+parser.add_argument('--size', type=int, default=10 ** 5,
+                    help='Number of nodes in the tree')
+parser.add_argument('--queries', type=int, default=10 ** 5,
+                    help='Number of queries')
+args = parser.parse_args()
+
+
+def naive_lca(tree, a, b):
+    ancestors = set(tree.rsearch(b))
+    return next(n for n in tree.rsearch(a) if n in ancestors)
+
+
+def main():
+    random.seed(0)
+    tree = Tree()
+    tree.create_node('0', 0)
+    for node_id in range(1, args.size):
+        tree.create_node(str(node_id), node_id,
+                         parent=random.randrange(node_id))
+
+    pairs = [(random.randrange(args.size), random.randrange(args.size))
+             for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    tree.lca(0, 0)
+    print(f'index build: {time.perf_counter() - start:.3f} s')
+
+    for name, function in (('naive', lambda a, b: naive_lca(tree, a, b)),
+                           ('indexed', tree.lca)):
+        start = time.perf_counter()
+        for a, b in pairs:
+            function(a, b)
+        elapsed = time.perf_counter() - start
+        print(f'{name:>8}: {elapsed:.3f} s, '
+              f'{elapsed / args.queries * 10 ** 6:.2f} us per query')
+
+
+if __name__ == '__main__':
+    main()
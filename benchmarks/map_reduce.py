@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Benchmark of ``Tree.map_reduce`` over a process pool.
+
+Sums a CPU-bound function of the data of every node of a random tree,
+or of a star whose leaves hang on the root, with 1 to 16 workers and
+prints the speedup over one worker.
+"""
+import argparse
+import operator
+import os
+import random
+import sys
+import time
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ttree import Tree  # noqa: E402
+
+
+parser = argparse.ArgumentParser(description='Measure Tree.map_reduce.')
+parser.add_argument('--size', type=int, default=10 ** 5,
+                    help='Number of nodes in the tree')
+parser.add_argument('--shape', choices=('random', 'star'),
+                    default='random',
+                    help='Random parents or the root as the parent of all')
+parser.add_argument('--work', type=int, default=200,
+                    help='Iterations of the map function per node')
+parser.add_argument('--workers', type=int, nargs='+',
+                    default=[1, 2, 4, 8, 16],
+                    help='Numbers of workers to measure')
+args = parser.parse_args()
+
+
+def weight(node):
+    value = node.data
+    for _ in range(args.work):
+        value = (value * 1103515245 + 12345) % 2 ** 31
+    return value
+
+
+def main():
+    random.seed(0)
+    tree = Tree()
+    tree.create_node('0', 0, data=0)
+    for node_id in range(1, args.size):
+        parent = 0 if args.shape == 'star' else random.randrange(node_id)
+        tree.create_node(str(node_id), node_id, parent=parent, data=node_id)
+
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        tree.map_reduce(weight, operator.add, workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f'{workers:>3} workers: {elapsed:.3f} s, '
+              f'speedup {baseline / elapsed:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Memory footprint of tree backends.
+
+Random trees are built with ``Tree`` and ``ColumnarTree`` and the memory
+allocated while building is measured with :mod:`tracemalloc`.
+"""
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ttree import Tree, ColumnarTree  # noqa: E402
+
+
+parser = argparse.ArgumentParser(description='Measure memory per node.')
+parser.add_argument('--size', type=int, default=10 ** 5,
+                    help='Number of nodes in the tree')
+parser.add_argument('--fanout', type=int, default=None,
+                    help='Build a leaf-heavy tree with the given number of '
+                         'children per inner node instead of a random one')
+args = parser.parse_args()
+
+
+def build_tree(tree_cls, size, fanout=None):
+    tree = tree_cls()
+    tree.create_node('0', 0)
+    for node_id in range(1, size):
+        if fanout is None:
+            parent = random.randrange(node_id)
+        else:
+            parent = (node_id - 1) // fanout
+        tree.create_node(str(node_id), node_id, parent=parent)
+    return tree
+
+
+def measure(tree_cls, size, fanout=None):
+    random.seed(0)
+    tracemalloc.start()
+    tree = build_tree(tree_cls, size, fanout)
+    # Children tables of the columnar tree are built on first access
+    tree.children(tree.root)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated
+
+
+def main():
+    print(f'{"backend":>14} {"nodes":>10} {"total, MiB":>11} '
+          f'{"per node, B":>12}')
+    for tree_cls in (Tree, ColumnarTree):
+        allocated = measure(tree_cls, args.size, args.fanout)
+        print(f'{tree_cls.__name__:>14} {args.size:>10} '
+              f'{allocated / 2 ** 20:>11.1f} {allocated / args.size:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
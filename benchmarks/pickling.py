@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""
+Pickle size and time, and deepcopy time of a tree.
+"""
+import argparse
+import copy
+import os
+import pickle
+import random
+import sys
+import time
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ttree import Tree  # noqa: E402
+
+
+parser = argparse.ArgumentParser(description='Measure tree pickling.')
+parser.add_argument('--size', type=int, default=10 ** 5,
+                    help='Number of nodes in the tree')
+args = parser.parse_args()
+
+
+def measure(name, function):
+    start = time.perf_counter()
+    result = function()
+    print(f'{name:>14}: {time.perf_counter() - start:.3f} s')
+    return result
+
+
+def main():
+    random.seed(0)
+    tree = Tree()
+    tree.create_node('0', 0)
+    for node_id in range(1, args.size):
+        tree.create_node(str(node_id), node_id,
+                         parent=random.randrange(node_id),
+                         data={'rank': node_id % 7})
+
+    dump = measure('pickle.dumps',
+                   lambda: pickle.dumps(tree, pickle.HIGHEST_PROTOCOL))
+    measure('pickle.loads', lambda: pickle.loads(dump))
+    measure('copy.deepcopy', lambda: copy.deepcopy(tree))
+    measure('Tree(deepcopy)', lambda: Tree(tree, deepcopy=True))
+    print(f'{"pickle size":>14}: {len(dump) / 2 ** 20:.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
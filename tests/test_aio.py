@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from ttree import Tree
+from ttree.aio import aiterate, aprint_tree
+
+
+def run_with_ticks(coroutine):
+    """Run the coroutine and count switches of a concurrent task."""
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def main():
+        task = asyncio.ensure_future(ticker())
+        try:
+            return await coroutine
+        finally:
+            task.cancel()
+
+    return asyncio.run(main()), len(ticks)
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+def test_aiterate():
+    result, ticks = run_with_ticks(collect(aiterate(range(10), budget=3)))
+    assert result == list(range(10))
+    assert ticks >= 3
+
+    with pytest.raises(ValueError):
+        asyncio.run(collect(aiterate(range(10), budget=0)))
+
+
+def test_aexpand_tree(tree):
+    result, ticks = run_with_ticks(collect(tree.aexpand_tree(budget=2)))
+    assert result == list(tree.expand_tree())
+    assert ticks >= 2
+
+
+def test_ato_json(tree):
+    result, ticks = run_with_ticks(tree.ato_json(with_data=True,
+                                                 chunk_size=10))
+    assert result == tree.to_json(with_data=True)
+    assert ticks > 1
+
+
+def test_aprint(tree, tree_as_string, capsys):
+    assert asyncio.run(aprint_tree(tree, ascii_mode='simple')) == \
+        tree_as_string
+
+    lines = []
+
+    async def sink(line):
+        lines.append(line)
+
+    asyncio.run(tree.aprint(ascii_mode='simple', func=sink, budget=1))
+    assert '\n'.join(lines) + '\n' == tree_as_string
+
+    asyncio.run(Tree().aprint())
+    assert capsys.readouterr().out == 'Tree is empty\n'
+    asyncio.run(tree.aprint(ascii_mode='simple'))
+    assert capsys.readouterr().out == tree_as_string
+
+    lines.clear()
+    asyncio.run(Tree().aprint(func=sink))
+    assert lines == ['Tree is empty']
+    assert capsys.readouterr().out == ''
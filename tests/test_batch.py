@@ -0,0 +1,99 @@
+import pytest
+
+from ttree import Tree, TreeBatch
+from ttree.exceptions import (
+    DuplicatedNode, LoopError, MultipleRoots, NodeNotFound
+)
+
+
+def test_batch_applies_changes(tree):
+    tree.build_path_index()
+    index = tree.create_index('tag')
+    snapshot = tree.snapshot()
+    expected = tree.to_dict()
+
+    with tree.batch() as batch:
+        assert isinstance(batch, TreeBatch)
+        # Children may go before their parents
+        batch.create_node('Jill', 'jill', parent='mary')
+        batch.create_node('Mary', 'mary', parent='diane')
+        batch.move_node('diane', 'bill')
+        batch.remove_node('george')
+        assert len(batch) == 4
+        assert 'mary' not in tree
+
+    assert tree.to_dict(sort=False) == {'Hárry': {'children': [
+        'Jane',
+        {'Bill': {'children': [
+            {'Diane': {'children': [
+                {'Mary': {'children': ['Jill']}}
+            ]}}
+        ]}}
+    ]}}
+    assert tree['jill'].tree is tree
+    assert 'george' not in tree
+    assert tree.level('jill') == 4
+    assert tree.depth() == 4
+    assert [tree.size(level) for level in range(5)] == [1, 2, 1, 1, 1]
+    assert tree.get_by_path('Bill/Diane/Mary/Jill').id == 'jill'
+    assert index.get('George') == []
+    assert index.get('Jill') == ['jill']
+    assert tree.is_ancestor('bill', 'jill')
+    assert snapshot.to_dict() == expected
+
+
+def test_batch_readds_and_roots():
+    tree = Tree()
+    with tree.batch() as batch:
+        batch.create_node('B', 'b', parent='a')
+        batch.create_node('A', 'a')
+    assert tree.root == 'a'
+    assert tree.level('b') == 1
+
+    with tree.batch() as batch:
+        batch.remove_node('a')
+        batch.create_node('C', 'c')
+        batch.create_node('A', 'a', parent='c')
+    assert list(tree) == ['c', 'a']
+    assert tree['c'].children == ['a']
+    assert tree.level('a') == 1
+
+
+@pytest.mark.parametrize('operations, error', [
+    ([('create_node', ('X', 'jane'), {'parent': 'hárry'})], DuplicatedNode),
+    ([('create_node', ('X', 'x'), {})], MultipleRoots),
+    ([('create_node', ('X', 'x'), {'parent': 'nobody'})], NodeNotFound),
+    ([('remove_node', ('nobody',), {})], NodeNotFound),
+    ([('move_node', ('jane', 'diane'), {})], LoopError),
+    ([('move_node', ('hárry', 'jane'), {})], LoopError),
+    ([('move_node', ('bill', None), {})], NodeNotFound),
+    ([('move_node', ('bill', 'nobody'), {})], NodeNotFound),
+    ([('move_node', ('bill', 'jill'), {}),
+      ('remove_node', ('diane',), {}),
+      ('move_node', ('jane', 'jill'), {})], NodeNotFound),
+    ([('create_node', ('X', 'x'), {'parent': 'george'}),
+      ('remove_node', ('bill',), {}),
+      ('move_node', ('jane', 'x'), {})], NodeNotFound),
+])
+def test_batch_rolls_back(tree, operations, error):
+    expected = tree.to_dict(with_data=True)
+    with pytest.raises(error):
+        with tree.batch() as batch:
+            batch.create_node('Jill', 'jill', parent='diane')
+            for name, args, kwargs in operations:
+                getattr(batch, name)(*args, **kwargs)
+
+    assert tree.to_dict(with_data=True) == expected
+    assert 'jill' not in tree
+    assert tree.depth() == 2
+
+
+def test_batch_discarded_on_error(tree):
+    with pytest.raises(KeyError):
+        with tree.batch() as batch:
+            batch.remove_node('jane')
+            raise KeyError
+    assert 'jane' in tree
+
+    with pytest.raises(RuntimeError):
+        batch.commit()
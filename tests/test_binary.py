@@ -0,0 +1,77 @@
+import uuid
+
+import pytest
+
+from ttree import Tree, MappedTree
+from ttree.exceptions import NodeNotFound
+
+
+@pytest.fixture
+def mapped(tree, tmp_path):
+    tree['george'].data = {'color': 'white'}
+    tree.create_node('Unique', uuid.uuid4(), parent='jane', expanded=False)
+    filename = str(tmp_path / 'tree.bin')
+    tree.save_binary(filename)
+    with MappedTree(filename) as result:
+        yield result
+
+
+def test_structure(tree, mapped):
+    assert len(mapped) == len(tree)
+    assert mapped.root == 'hárry'
+    assert mapped.is_branch('jane') == tree.is_branch('jane')
+    assert mapped.parent('diane').id == 'jane'
+    assert mapped.level('george') == 2
+    assert mapped.size(2) == tree.size(2) == 3
+    assert mapped['george'].data == {'color': 'white'}
+    assert mapped.to_dict(with_data=True) == tree.to_dict(with_data=True)
+
+    for mode in ('depth', 'width', 'zigzag'):
+        assert list(mapped.expand_tree(mode=mode)) == \
+            list(tree.expand_tree(mode=mode))
+
+    with pytest.raises(NodeNotFound):
+        mapped.level('alien')
+
+
+def test_to_tree(tree, mapped):
+    copy = mapped.to_tree()
+    assert copy.to_json(with_data=True) == tree.to_json(with_data=True)
+    assert list(copy) == list(mapped)
+
+
+def test_read_only(mapped):
+    with pytest.raises(TypeError):
+        mapped.create_node('Alien', 'alien', parent='hárry')
+
+
+def test_empty_and_invalid(tmp_path):
+    filename = str(tmp_path / 'empty.bin')
+    Tree().save_binary(filename)
+    with MappedTree(filename) as mapped:
+        assert len(mapped) == 0
+        assert mapped.root is None
+
+    filename = str(tmp_path / 'invalid.bin')
+    with open(filename, 'wb') as fp:
+        fp.write(b'\0' * 256)
+    with pytest.raises(ValueError):
+        MappedTree(filename)
+
+
+def test_unsupported_values(tree, tmp_path):
+    filename = str(tmp_path / 'tree.bin')
+    tree.create_node(('tuple', 'tag'), 'tuple', parent='jane')
+    with pytest.raises(TypeError):
+        tree.save_binary(filename)
+
+    # Values of unknown encodings, e.g. pickles, are never loaded
+    tree.remove_node('tuple')
+    tree.save_binary(filename)
+    with open(filename, 'rb') as fp:
+        content = fp.read()
+    with open(filename, 'wb') as fp:
+        fp.write(content.replace(b's' + 'hárry'.encode(),
+                                 b'p' + 'hárry'.encode()))
+    with pytest.raises(ValueError):
+        MappedTree(filename)
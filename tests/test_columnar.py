@@ -0,0 +1,66 @@
+import pytest
+
+from ttree import ColumnarTree, Node
+from ttree.exceptions import NodeNotFound, MultipleRoots, DuplicatedNode
+
+
+@pytest.fixture
+def columnar(tree):
+    return ColumnarTree.from_tree(tree)
+
+
+def test_create_node():
+    tree = ColumnarTree()
+    assert tree.create_node('Root', 'root') == 'root'
+    tree.create_node('Child', 'child', parent='root', data=42)
+    assert len(tree) == 2
+    assert 'child' in tree
+    assert tree.root == 'root'
+    assert tree['child'].data == 42
+    assert tree['child'].parent == 'root'
+    assert tree['root'].children == ['child']
+
+    with pytest.raises(DuplicatedNode):
+        tree.create_node('Child', 'child', parent='root')
+
+    with pytest.raises(MultipleRoots):
+        tree.create_node('Other root', 'other')
+
+    with pytest.raises(NodeNotFound):
+        tree.create_node('Orphan', 'orphan', parent='alien')
+
+
+def test_structure(columnar):
+    assert [n.id for n in columnar.children('hárry')] == ['jane', 'bill']
+    assert columnar.is_branch('bill') == ['george']
+    assert columnar.parent('diane').id == 'jane'
+    assert columnar.parent('hárry') is None
+    assert columnar.level('george') == 2
+    assert columnar.depth() == 2
+    assert columnar.size(level=1) == 2
+    assert {n.id for n in columnar.leaves()} == {'diane', 'george'}
+    assert [n.id for n in columnar.leaves('jane')] == ['diane']
+
+
+def test_expand_tree(tree, columnar):
+    for mode in ('depth', 'width', 'zigzag'):
+        assert list(columnar.expand_tree(mode=mode)) == \
+            list(tree.expand_tree(mode=mode))
+
+    assert list(columnar.expand_tree(reverse=True)) == \
+        list(tree.expand_tree(reverse=True))
+    assert list(columnar.expand_tree(filtering=lambda x: x.tag != 'Bill')) \
+        == ['hárry', 'jane', 'diane']
+
+
+def test_to_dict(tree, columnar):
+    assert columnar.to_dict() == tree.to_dict()
+    assert columnar.to_dict(with_data=True) == tree.to_dict(with_data=True)
+    assert columnar.to_dict('jane') == tree.to_dict('jane')
+
+
+def test_round_trip(tree, columnar):
+    copy = columnar.to_tree()
+    assert copy.to_dict(with_data=True) == tree.to_dict(with_data=True)
+    assert columnar.get('alien') is None
+    assert isinstance(columnar.get('jane'), Node)
@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+
+from ttree.concurrency import ConcurrentTree, RWLock
+from ttree.exceptions import NodeNotFound
+
+
+@pytest.fixture
+def concurrent(tree):
+    return ConcurrentTree(tree, chunk_size=2)
+
+
+def test_concurrent_tree(concurrent):
+    assert 'jane' in concurrent
+    assert len(concurrent) == 5
+    assert concurrent['jane'].tag == 'Jane'
+    assert [n.id for n in concurrent.children('hárry')] == ['jane', 'bill']
+    assert concurrent.level('diane') == 2
+
+    concurrent.create_node('Jill', 'jill', parent='diane')
+    concurrent.move_node('jill', 'george')
+    concurrent.update_node('jill', data=1)
+    assert concurrent.parent('jill').id == 'george'
+    assert list(concurrent.rsearch('jill')) == ['jill', 'george', 'bill',
+                                                'hárry']
+    assert [n.id for n in concurrent.select('//*[tag="Jill"]')] == ['jill']
+
+    with concurrent.write() as tree:
+        tree.remove_node('bill')
+        assert concurrent.depth() == 2
+
+    with pytest.raises(NodeNotFound):
+        concurrent['jill']
+
+
+def test_iteration_is_consistent(concurrent):
+    nodes = concurrent.expand_tree()
+    assert next(nodes) == 'hárry'
+
+    concurrent.remove_node('jane')
+    concurrent.create_node('Jill', 'jill', parent='george')
+    # The traversal goes on over the tree as it was when it started
+    assert list(nodes) == ['bill', 'george', 'jane', 'diane']
+    assert list(concurrent) == ['hárry', 'bill', 'george', 'jill']
+
+
+def test_subtree_locks(concurrent):
+    locked, release = threading.Event(), threading.Event()
+
+    def hold_jane():
+        with concurrent.lock_subtree('jane'):
+            locked.set()
+            release.wait(5)
+            concurrent.create_node('Jill', 'jill', parent='diane')
+
+    holder = threading.Thread(target=hold_jane)
+    holder.start()
+    locked.wait(5)
+
+    # Disjoint subtrees are not blocked
+    with concurrent.lock_subtree('bill'):
+        concurrent.create_node('Mark', 'mark', parent='george')
+
+    done = []
+    writer = threading.Thread(target=lambda: done.append(
+        concurrent.remove_node('diane')
+    ))
+    creator = threading.Thread(target=lambda: concurrent.create_node(
+        'Mary', 'mary', parent=concurrent['jane']
+    ))
+    writer.start()
+    creator.start()
+    writer.join(0.2)
+    creator.join(0.01)
+    assert writer.is_alive() and 'diane' in concurrent
+    assert creator.is_alive() and 'mary' not in concurrent
+
+    release.set()
+    holder.join(5)
+    writer.join(5)
+    creator.join(5)
+    assert done == [2]
+    assert 'jill' not in concurrent
+    assert concurrent.parent('mary').id == 'jane'
+
+
+def test_rwlock_prefers_writers():
+    lock = RWLock()
+    lock.acquire_read()
+    order = []
+
+    def write():
+        with lock.write():
+            order.append('write')
+            with lock.read():
+                order.append('owner read')
+
+    def read():
+        with lock.read():
+            order.append('read')
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    while not lock._waiting_writers:
+        pass
+    reader = threading.Thread(target=read)
+    reader.start()
+    reader.join(0.1)
+    assert order == []
+
+    # A reentrant read doesn't wait for the waiting writer
+    with lock.read():
+        order.append('reentrant read')
+    lock.release_read()
+    writer.join(5)
+    reader.join(5)
+    assert order == ['reentrant read', 'write', 'owner read', 'read']
@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+import ttree
+from ttree import Tree
+from ttree.common import EventKind
+from ttree.delta import Edit, diff, subtree_hashes
+
+
+def structure(tree):
+    return {node_id: (node.parent, node.tag, node.data, node.children)
+            for node_id, node in tree.items()}
+
+
+def test_diff(tree):
+    new = Tree(tree, deepcopy=True)
+    assert diff(tree, new) == []
+    assert subtree_hashes(tree) == subtree_hashes(new)
+
+    new.create_node('Jill', 'jill', parent='diane')
+    new.move_node('jane', 'bill')
+    new.update_node('george', data={'age': 3})
+    new.remove_node('diane')
+    new.create_node('Mark', 'mark', parent='hárry')
+
+    script = ttree.diff(tree, new)
+    assert script == [
+        Edit(EventKind.ADDED, 'mark', 'hárry', 'Mark'),
+        Edit(EventKind.UPDATED, 'george', 'bill', 'George', {'age': 3}),
+        Edit(EventKind.MOVED, 'jane', 'bill'),
+        Edit(EventKind.REMOVED, 'diane', 'jane'),
+    ]
+
+    tree.build_path_index()
+    tree.apply_patch(script)
+    assert structure(tree) == structure(new)
+    assert tree.get_by_path('Bill/Jane').id == 'jane'
+    assert tree.level('jane') == 2
+
+
+def test_diff_roots(tree):
+    new = Tree()
+    assert diff(tree, new) == [Edit(EventKind.REMOVED, 'hárry')]
+
+    new.create_node('Jane', 'jane')
+    new.create_node('Diane', 'diane', parent='jane')
+    tree.apply_patch(diff(tree, new))
+    assert structure(tree) == structure(new)
+
+    tree.apply_patch(diff(tree, Tree()))
+    assert tree.root is None and not tree
+
+
+def test_random_patches():
+    random.seed(1)
+    old = Tree()
+    old.create_node(0, 0)
+    for node_id in range(1, 200):
+        old.create_node(node_id, node_id, parent=random.randrange(node_id),
+                        data=node_id % 7)
+
+    for _ in range(20):
+        new = Tree(old, deepcopy=True)
+        for node_id in range(200, 230):
+            new.create_node(node_id, node_id,
+                            parent=random.choice(list(new)))
+        for _ in range(20):
+            source, destination = random.sample(list(new)[1:], 2)
+            if not new.is_ancestor(source, destination):
+                new.move_node(source, destination)
+        for node_id in random.sample(list(new)[1:], 10):
+            if node_id in new:
+                new.update_node(node_id, data=-1)
+        for node_id in random.sample(list(new)[1:], 5):
+            if node_id in new:
+                new.remove_node(node_id)
+
+        patched = Tree(old, deepcopy=True)
+        patched.apply_patch(diff(old, new))
+        assert structure(patched) == structure(new)
+        assert [patched.size(level) for level in range(patched.depth())] \
+            == [new.size(level) for level in range(new.depth())]
+
+
+def test_invalid_patch(tree):
+    expected = structure(tree)
+    with pytest.raises(ValueError):
+        tree.apply_patch([Edit(EventKind.REMOVED, 'jane'),
+                          Edit(EventKind.PASTED, 'bill')])
+    assert structure(tree) == expected
+
+
+@pytest.mark.parametrize('old_value, new_value', [(-1, -2), (1, True)])
+def test_diff_equal_hashes(tree, old_value, new_value):
+    # hash(-1) == hash(-2) and 1 == True, the change is still found
+    tree.update_node('george', data=old_value)
+    new = Tree(tree, deepcopy=True)
+    new.update_node('george', data=new_value)
+    assert subtree_hashes(tree)['hárry'] != subtree_hashes(new)['hárry']
+    assert diff(tree, new) == [
+        Edit(EventKind.UPDATED, 'george', 'bill', 'George', new_value)
+    ]
+
+    tree.apply_patch(diff(tree, new))
+    assert tree['george'].data is new_value
@@ -0,0 +1,61 @@
+from ttree import Tree
+from ttree.common import EventKind
+from ttree.events import TreeEvent
+
+
+def test_events(tree):
+    events = []
+    tree.subscribe(events.append)
+    tree.create_node('Jill', 'jill', parent='diane')
+    tree.move_node('jill', 'george')
+    tree.update_node('jill', tag='Jillian', data=1)
+    tree.link_past_node('bill')
+
+    other = Tree()
+    other.create_node('Mark', 'mark')
+    other.create_node('Mary', 'mary', parent='mark')
+    tree.paste('jane', other)
+    tree.remove_subtree('mark')
+    tree.remove_node('jane')
+
+    assert events == [
+        TreeEvent(EventKind.ADDED, 'jill', 'diane'),
+        TreeEvent(EventKind.MOVED, 'jill', 'george', 'diane'),
+        TreeEvent(EventKind.UPDATED, 'jill', 'george',
+                  attributes=('tag', 'data')),
+        TreeEvent(EventKind.MOVED, 'george', 'hárry', 'bill'),
+        TreeEvent(EventKind.REMOVED, 'bill', 'hárry'),
+        TreeEvent(EventKind.PASTED, 'mark', 'jane'),
+        TreeEvent(EventKind.PASTED, 'mary', 'mark'),
+        TreeEvent(EventKind.REMOVED, 'mark', 'jane'),
+        TreeEvent(EventKind.REMOVED, 'mary', 'mark'),
+        TreeEvent(EventKind.REMOVED, 'jane', 'hárry'),
+        TreeEvent(EventKind.REMOVED, 'diane', 'jane'),
+    ]
+
+    tree.unsubscribe(events.append)
+    tree.create_node('Bill', 'bill', parent='hárry')
+    assert len(events) == 11
+
+
+def test_coalesced_events(tree):
+    calls = []
+    tree.subscribe(calls.append, coalesce=True)
+    tree.remove_node('bill')
+    assert calls == [[TreeEvent(EventKind.REMOVED, 'bill', 'hárry'),
+                      TreeEvent(EventKind.REMOVED, 'george', 'bill')]]
+
+    calls.clear()
+    with tree.batch() as batch:
+        batch.create_node('Jill', 'jill', parent='diane')
+        batch.create_node('Mark', 'mark', parent='jill')
+        batch.move_node('jill', 'hárry')
+        batch.move_node('diane', 'hárry')
+        batch.move_node('diane', 'jane')
+        batch.remove_node('mark')
+        batch.create_node('Mary', 'mary', parent='jill')
+        batch.remove_node('jane')
+    assert calls == [[TreeEvent(EventKind.REMOVED, 'jane', 'hárry'),
+                      TreeEvent(EventKind.REMOVED, 'diane', 'jane'),
+                      TreeEvent(EventKind.ADDED, 'jill', 'hárry'),
+                      TreeEvent(EventKind.ADDED, 'mary', 'jill')]]
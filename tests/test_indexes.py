@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import pytest
+
+from ttree.indexes import HashIndex, SortedIndex
+
+
+@pytest.fixture
+def ranked(tree):
+    for rank, node_id in enumerate(['hárry', 'jane', 'bill', 'diane']):
+        tree[node_id].data = SimpleNamespace(rank=rank % 3)
+    return tree
+
+
+def test_hash_index(ranked):
+    index = ranked.create_index('tag')
+    assert isinstance(index, HashIndex)
+    assert ranked.get_index('tag') is index
+    assert index.get('Jane') == ['jane']
+    assert index.get('Nobody') == []
+    assert 'Bill' in index
+
+    ranked.create_node('Jane', 'jane2', parent='bill')
+    assert index.get('Jane') == ['jane', 'jane2']
+
+    ranked.update_node('jane', tag='Janet')
+    assert index.get('Jane') == ['jane2']
+    assert index.get('Janet') == ['jane']
+
+    ranked.remove_node('bill')
+    assert index.get('Jane') == []
+    assert index.get('George') == []
+    assert len(index) == 3
+
+    with pytest.raises(ValueError):
+        ranked.create_index('tag')
+
+    ranked.drop_index('tag')
+    assert ranked.get_index('tag') is None
+
+
+def test_sorted_index(ranked):
+    index = ranked.create_index('data.rank', kind='sorted')
+    assert isinstance(index, SortedIndex)
+    # george has no data and is not indexed
+    assert len(index) == 4
+    assert index.get(0) == ['hárry', 'diane']
+    assert index.range(1) == ['jane', 'bill']
+    assert index.range(0, 2) == ['hárry', 'diane', 'jane']
+    assert index.range(stop=1, inclusive=True) == ['hárry', 'diane', 'jane']
+    assert (index.min(), index.max()) == (0, 2)
+
+    # Changed in place, the old value is remembered
+    ranked['diane'].data.rank = 5
+    ranked.update_node('diane', data=ranked['diane'].data)
+    assert index.get(0) == ['hárry']
+    assert index.range(3) == ['diane']
+
+    ranked.remove_subtree('jane')
+    assert index.range() == ['hárry', 'bill']
+
+
+def test_callable_index(ranked):
+    index = ranked.create_index(lambda node: node.is_leaf, name='leaf')
+    assert index.get(True) == ['diane', 'george']
+
+    ranked.move_node('george', 'diane')
+    assert index.get(True) == ['george', 'bill']
+    assert index.get(False) == ['hárry', 'jane', 'diane']
+
+    ranked.link_past_node('diane')
+    assert index.value('jane') is False
+    assert 'diane' not in index.get(False)
+
+
+def test_sorted_index_incomparable(ranked):
+    index = ranked.create_index('data.rank', kind='sorted')
+    node = ranked.create_node('Jill', 'jill', parent='jane',
+                              data=SimpleNamespace(rank=None))
+    # The value can't be compared with integers, the node is not indexed
+    assert 'jill' not in index._values
+    assert node.parent == 'jane'
+    assert ranked.level('jill') == 2
+    assert index.range() == ['hárry', 'diane', 'jane', 'bill']
+
+    ranked.update_node('jill', data=SimpleNamespace(rank=1))
+    assert index.get(1) == ['jane', 'jill']
+
+
+def test_parent_index(tree):
+    index = tree.create_index('parent')
+    tree.create_node('Jill', 'jill', parent='george')
+    assert index.get('george') == ['jill']
+    assert index.get(None) == ['hárry']
+
+
+def test_sorted_index_equal_values(tree):
+    index = tree.create_index(lambda node: 0, kind='sorted', name='zero')
+    for number in range(100):
+        tree.create_node(str(number), number, parent='hárry')
+    for number in range(0, 100, 2):
+        tree.remove_node(number)
+    assert sorted(index.get(0), key=str) == sorted(tree, key=str)
+    assert index.range(0, 1) == index.get(0)
+    assert index.range(1) == []
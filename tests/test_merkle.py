@@ -0,0 +1,116 @@
+import random
+
+import pytest
+
+from ttree import Tree
+from ttree.exceptions import NodeNotFound
+
+
+def fresh_hash(tree, node_id=None):
+    return Tree(tree).subtree_hash(node_id)
+
+
+def test_subtree_hash(tree):
+    tree.enable_hashes()
+    root_hash = tree.subtree_hash()
+    assert len(root_hash) == 16
+    assert root_hash == fresh_hash(tree)
+    assert set(tree._hashes) == set(tree)
+    assert tree.subtree_hash('bill') != tree.subtree_hash('jane')
+
+    tree.update_node('george', data={'age': 3})
+    # Only the changed path is hashed again
+    assert set(tree._hashes) == {'jane', 'diane'}
+    assert tree.subtree_hash() != root_hash
+    assert tree.subtree_hash() == fresh_hash(tree)
+
+    tree.update_node('george', data=None)
+    assert tree.subtree_hash() == root_hash
+
+    with pytest.raises(NodeNotFound):
+        tree.subtree_hash('mark')
+
+
+def test_subtree_hash_ignores_ids(tree):
+    other = Tree()
+    other.create_node('Hárry', 1)
+    other.create_node('Jane', 2, parent=1)
+    other.create_node('Bill', 3, parent=1)
+    other.create_node('Diane', 4, parent=2)
+    other.create_node('George', 5, parent=3)
+    tree.enable_hashes()
+    assert tree.content_equals(other)
+    assert other.content_equals(tree)
+
+    # Order of children matters
+    other.move_node(2, 3)
+    other.move_node(2, 1)
+    assert not tree.content_equals(other)
+    assert not tree.content_equals(Tree())
+    assert Tree().content_equals(Tree())
+
+
+def test_subtree_hash_mutations(tree):
+    tree.enable_hashes()
+    tree.subtree_hash()
+
+    tree.create_node('Mark', 'mark', parent='diane')
+    assert tree.subtree_hash() == fresh_hash(tree)
+    tree.move_node('jane', 'bill')
+    assert tree.subtree_hash() == fresh_hash(tree)
+    tree.link_past_node('jane')
+    assert tree.subtree_hash() == fresh_hash(tree)
+    assert 'jane' not in tree._hashes
+
+    pasted = Tree()
+    pasted.create_node('Jill', 'jill')
+    pasted.create_node('Jack', 'jack', parent='jill')
+    tree.paste('george', pasted)
+    assert tree.subtree_hash() == fresh_hash(tree)
+
+    removed = tree.remove_subtree('jill')
+    assert tree.subtree_hash() == fresh_hash(tree)
+    assert removed.subtree_hash() == pasted.subtree_hash()
+    tree.remove_node('diane')
+    assert tree.subtree_hash() == fresh_hash(tree)
+    assert set(tree._hashes) == set(tree)
+
+    with tree.batch() as batch:
+        batch.create_node('Jill', 'jill', parent='george')
+        batch.update_node('bill', tag='William')
+        batch.move_node('george', 'hárry')
+    assert tree.subtree_hash() == fresh_hash(tree)
+
+    tree.disable_hashes()
+    tree.update_node('george', data=1)
+    assert tree.subtree_hash() == fresh_hash(tree)
+
+
+def test_subtree_hash_random():
+    rng = random.Random(7)
+    tree = Tree()
+    tree.create_node('root', 0)
+    for node_id in range(1, 200):
+        tree.create_node(str(rng.randrange(5)), node_id,
+                         parent=rng.randrange(node_id))
+    tree.enable_hashes()
+    next_id = 200
+
+    for _ in range(300):
+        # Hash a random subtree, so that hashes are partial
+        tree.subtree_hash(rng.choice(list(tree)))
+        node_id = rng.choice(list(tree))
+        action = rng.randrange(4)
+        if action == 0:
+            tree.create_node(str(rng.randrange(5)), next_id, parent=node_id)
+            next_id += 1
+        elif action == 1:
+            tree.update_node(node_id, data=rng.randrange(3))
+        elif action == 2 and node_id != tree.root:
+            destination = rng.choice(list(tree))
+            if destination != node_id and \
+                    not tree.is_ancestor(node_id, destination):
+                tree.move_node(node_id, destination)
+        elif action == 3 and node_id != tree.root and len(tree) > 50:
+            tree.remove_node(node_id)
+        assert tree.subtree_hash() == fresh_hash(tree)
@@ -1,5 +1,12 @@
+import copy
+import os
+import pickle
+
 import pytest
 
+from ttree import Node, Tree
+from ttree.node import generate_id
+
 
 def test_node_initialization(node1):
     assert node1.tag == "Test One"
@@ -36,6 +43,55 @@ def test_node_add_child(node1):
     assert node1.children == ['id 2']
 
 
+def test_node_compact(node1):
+    assert not hasattr(node1, '__dict__')
+    assert node1._children is None
+    assert node1.children == []
+    node1.add_child('id 2')
+    node1.remove_child('id 2')
+    assert node1.is_leaf
+
+
+def test_node_lazy_id():
+    node = Node()
+    assert node._id is None
+    assert node.id.version == 1
+    assert node.tag == node.id
+    assert Node().id != node.id
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork')
+def test_node_id_after_fork():
+    generate_id()
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if not pid:
+        os.close(read_end)
+        os.write(write_end, generate_id().bytes)
+        os._exit(0)
+
+    os.close(write_end)
+    with os.fdopen(read_end, 'rb') as pipe:
+        child_id = pipe.read()
+    os.waitpid(pid, 0)
+    assert child_id != generate_id().bytes
+
+
+def test_node_children_order(node1):
+    for i in range(10):
+        node1.add_child(i)
+    node1.remove_child(3)
+    node1.remove_child(42)
+    assert node1.children == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+    assert node1.has_child(4)
+    assert not node1.has_child(3)
+
+    node1.children = {'a': 1, 'b': 2}
+    assert node1.children == ['a', 'b']
+    node1.children = None
+    assert node1.is_leaf
+
+
 def test_node_parent(node2):
     node2.parent = "id 1"
     assert node2.parent == 'id 1'
@@ -58,3 +114,15 @@ def test_node_data(node1):
 
     node1.data = Flower("red")
     assert node1.data.color == "red"
+
+
+def test_node_pickle(node1):
+    tree = Tree()
+    tree.add_node(node1)
+    node1.data = [1, 2]
+    result = pickle.loads(pickle.dumps(node1))
+    assert result.tree is None
+    assert result.tag == 'Test One'
+    assert result.id == 'identifier 1'
+    assert result.data == [1, 2]
+    assert copy.deepcopy(node1).tree is None
@@ -0,0 +1,95 @@
+import operator
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from ttree import Tree
+from ttree.exceptions import NodeNotFound
+from ttree.parallel import partition
+
+
+def data_or_one(node):
+    return 1 if node.data is None else node.data
+
+
+def tags(node):
+    return [node.tag]
+
+
+@pytest.fixture
+def big_tree():
+    random.seed(0)
+    tree = Tree()
+    tree.create_node('0', 0, data=0)
+    for node_id in range(1, 1000):
+        tree.create_node(str(node_id), node_id,
+                         parent=random.randrange(node_id), data=node_id)
+    return tree
+
+
+def check_parts(tree, node_id, parts, parents, target):
+    ids = sum(parts, [])
+    assert len(ids) == len(set(ids))
+    assert set(ids) == set(tree.expand_tree(node_id))
+    assert parents[0] == -1 and parts[0][0] == node_id
+    for index, (part, parent) in enumerate(zip(parts, parents)):
+        assert parent < index
+        if index:
+            assert target <= len(part) < 2 * target
+        # Roots of a part hang on nodes of its parent part
+        for child in part[0 if index else 1:]:
+            pid = tree.parent(child).id
+            assert pid in part or pid in parts[parent]
+
+
+def test_partition(big_tree):
+    parts, parents = partition(big_tree, 0, 8)
+    check_parts(big_tree, 0, parts, parents, 1000 // 8)
+
+    assert partition(big_tree, 0, 1) == ([list(big_tree.expand_tree(
+        0, key=lambda node: 0))], [-1])
+
+
+def test_partition_wide_trees():
+    star = Tree()
+    star.create_node('root', 'root', data=0)
+    for node_id in range(10000):
+        star.create_node(str(node_id), node_id, parent='root', data=node_id)
+    parts, parents = partition(star, 'root', 16)
+    # Groups of leaves, the root is left alone
+    assert len(parts) == 17 and parts[0] == ['root']
+    check_parts(star, 'root', parts, parents, 10001 // 16)
+    assert star.map_reduce(data_or_one, operator.add, workers=1) == \
+        sum(range(10000))
+
+    two_levels = Tree()
+    two_levels.create_node('root', 'root')
+    for parent in range(100):
+        two_levels.create_node(str(parent), parent, parent='root')
+        for child in range(100):
+            two_levels.create_node('leaf', (parent, child), parent=parent)
+    parts, parents = partition(two_levels, 'root', 16)
+    assert len(parts) > 8
+    check_parts(two_levels, 'root', parts, parents, 10101 // 16)
+    assert two_levels.map_reduce(data_or_one, operator.add, workers=1) == \
+        len(two_levels)
+
+
+def test_map_reduce(big_tree, tree):
+    assert big_tree.map_reduce(data_or_one, operator.add, workers=1) == \
+        sum(range(1000))
+    assert sorted(tree.map_reduce(tags, operator.add, 'jane',
+                                  workers=1)) == ['Diane', 'Jane']
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        assert big_tree.map_reduce(data_or_one, max, executor=executor) == \
+            999
+        assert big_tree.map_reduce(data_or_one, operator.add, 5,
+                                   executor=executor) == \
+            sum(big_tree.expand_tree(5))
+        assert big_tree.map_reduce(data_or_one, operator.add, workers=2,
+                                   executor=executor) == sum(range(1000))
+
+    with pytest.raises(NodeNotFound):
+        tree.map_reduce(data_or_one, operator.add, 'nobody')
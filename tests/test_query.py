@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import pytest
+
+from ttree.exceptions import InvalidQuery, NodeNotFound
+from ttree.query import compile_query
+
+
+@pytest.fixture
+def ranked(tree):
+    tree.create_node('Jane', 'jane2', parent='george')
+    for rank, node_id in enumerate(['hárry', 'jane', 'bill', 'diane']):
+        tree[node_id].data = {'rank': rank % 3}
+    tree['george'].data = SimpleNamespace(rank=2)
+    return tree
+
+
+def ids(nodes):
+    return [node.id for node in nodes]
+
+
+def test_select_steps(ranked):
+    assert ids(ranked.select('/Hárry')) == ['hárry']
+    assert ids(ranked.select('/Hárry/Jane')) == ['jane']
+    assert ids(ranked.select('/Jane')) == []
+    assert ids(ranked.select('//Jane')) == ['jane', 'jane2']
+    assert ids(ranked.select('//*')) == [
+        'hárry', 'jane', 'diane', 'bill', 'george', 'jane2']
+    assert ids(ranked.select('/*//{2}*')) == ['diane', 'george']
+    assert ids(ranked.select('/*//{2,}*')) == ['diane', 'george', 'jane2']
+    assert ids(ranked.select('//Bill//*')) == ['george', 'jane2']
+    assert ids(ranked.select('/*', 'jane')) == ['diane']
+    assert ids(ranked.select('//"Jane"', 'bill')) == ['jane2']
+
+
+def test_select_predicates(ranked):
+    assert ids(ranked.select('//*[rank=2]')) == ['bill', 'george']
+    assert ids(ranked.select('//*[data.rank>=1]')) == ['jane', 'bill',
+                                                       'george']
+    assert ids(ranked.select('//*[rank!=0]')) == ['jane', 'bill', 'george']
+    assert ids(ranked.select('//*[rank]/*')) == ['jane', 'bill', 'diane',
+                                                 'george', 'jane2']
+    assert ids(ranked.select("//*[tag='Jane'][rank]")) == ['jane']
+    assert ids(ranked.select("//*[rank='2']")) == []
+
+
+def test_select_with_indexes(ranked):
+    query = compile_query('//*[rank=2]/Jane')
+    assert query.explain(ranked) == [
+        "//*[rank=2]: subtree scan",
+        "/'Jane': children scan",
+    ]
+    assert ids(ranked.select(query)) == ['jane2']
+
+    ranked.create_index('data.rank', kind='sorted')
+    ranked.create_index('tag')
+    assert query.explain(ranked)[0] == "//*[rank=2]: index 'data.rank' lookup"
+    assert ids(ranked.select(query)) == ['jane2']
+    assert ids(ranked.select('//*[rank>0]')) == ['jane', 'bill', 'george']
+    assert ids(ranked.select('//*[rank<1]')) == ['hárry', 'diane']
+
+    assert compile_query('//Jane').explain(ranked) == [
+        "//'Jane': index 'tag' lookup"]
+    assert ids(ranked.select('/Hárry/*//{2}Jane')) == ['jane2']
+    assert ids(ranked.select('//Jane', 'jane')) == []
+
+
+def test_select_index_attributes(ranked):
+    # An index of the node attribute 'rank', which nodes don't have, can't
+    # answer predicates on data
+    ranked.create_index('rank')
+    query = compile_query('//*[rank=2]')
+    assert query.explain(ranked) == ["//*[rank=2]: subtree scan"]
+    assert ids(ranked.select(query)) == ['bill', 'george']
+
+    ranked.create_index('data.rank', name='by_rank')
+    assert query.explain(ranked) == ["//*[rank=2]: index 'by_rank' lookup"]
+    assert ids(ranked.select(query)) == ['bill', 'george']
+
+    ranked.create_index(lambda node: node.tag.lower(), name='tag')
+    assert compile_query('//Jane').explain(ranked) == [
+        "//'Jane': subtree scan"]
+    assert ids(ranked.select('//Jane')) == ['jane', 'jane2']
+
+
+def test_select_errors(tree):
+    for query in ['', 'Harry', '/Harry{2}', '//{0}*', '//{3,2}*',
+                  '/*[rank=two]', '/*[rank', '/[rank]']:
+        with pytest.raises(InvalidQuery):
+            compile_query(query)
+
+    with pytest.raises(NodeNotFound):
+        list(tree.select('/*', 'nobody'))
+
+
+def test_select_incomparable_literals(ranked):
+    ranked.create_index('data.rank', kind='sorted')
+    for query in ("//*[rank='x']", "//*[rank<'x']", "//*[rank>='x']"):
+        assert ids(ranked.select(query)) == []
+
+    ranked.update_node('george', data={'rank': 'x'})
+    assert ids(ranked.select("//*[rank='x']")) == ['george']
+    assert ids(ranked.select('//*[rank=2]')) == ['bill']
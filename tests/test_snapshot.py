@@ -0,0 +1,75 @@
+import gc
+
+import pytest
+
+from ttree import Tree, TreeSnapshot
+from ttree.exceptions import NodeNotFound
+
+
+def test_snapshot_is_isolated(tree):
+    snapshot = tree.snapshot()
+    expected = tree.to_dict(with_data=True)
+    assert isinstance(snapshot, TreeSnapshot)
+
+    tree.create_node('Jill', 'jill', parent='diane')
+    tree.move_node('diane', 'bill')
+    tree.update_node('hárry', tag='Harry', data={'age': 40})
+    tree.remove_node('jane')
+
+    assert snapshot.to_dict(with_data=True) == expected
+    assert len(snapshot) == 5
+    assert list(snapshot) == ['hárry', 'jane', 'diane', 'bill', 'george']
+    assert 'jill' not in snapshot
+    assert 'jane' in snapshot
+    assert snapshot['diane'].parent == 'jane'
+    assert snapshot.get('jill') is None
+    assert snapshot.get('jill', 0) == 0
+    assert snapshot.get('jane').id == 'jane'
+    assert snapshot['hárry'].tag == 'Hárry'
+    assert snapshot.level('diane') == 2
+    assert snapshot.depth() == 2
+    assert snapshot.size(1) == 2
+
+    with pytest.raises(NodeNotFound):
+        snapshot['jill']
+
+    # Untouched nodes are shared with the tree
+    assert snapshot['george'] is tree['george']
+    assert set(snapshot._saved) == {'jill', 'diane', 'jane', 'bill',
+                                    'hárry'}
+
+
+def test_snapshot_versions(tree):
+    first = tree.snapshot()
+    tree.remove_subtree('bill')
+    second = tree.snapshot()
+    tree.link_past_node('jane')
+
+    assert list(first) == ['hárry', 'jane', 'diane', 'bill', 'george']
+    assert list(second) == ['hárry', 'jane', 'diane']
+    assert list(tree) == ['hárry', 'diane']
+    assert second['diane'].parent == 'jane'
+
+    copy = second.to_tree()
+    assert isinstance(copy, Tree)
+    assert copy.to_dict() == second.to_dict()
+    assert copy.level('diane') == 2
+    assert copy['jane'] is not second['jane']
+
+
+def test_snapshot_release(tree):
+    snapshot = tree.snapshot()
+    assert len(tree._snapshots) == 1
+    del snapshot
+    gc.collect()
+    assert not tree._snapshots
+    tree.create_node('Jill', 'jill', parent='george')
+
+
+def test_update_node(tree):
+    tree.update_node('jane', tag='Jenny', expanded=False)
+    assert tree['jane'].tag == 'Jenny'
+    assert not tree['jane'].expanded
+
+    with pytest.raises(ValueError):
+        tree.update_node('jane', parent='bill')
@@ -1,9 +1,16 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import copy
+import io
+import pickle
+import random
+
 import pytest
 
 from ttree import Tree, Node
-from ttree.exceptions import NodeNotFound, LoopError
+from ttree.exceptions import (
+    NodeNotFound, LoopError, FrozenTree, DuplicatedNode, MultipleRoots
+)
 
 
 def test_tree(tree, copytree):
@@ -23,6 +30,25 @@ def test_paths_to_leaves(tree):
     assert ['hárry', 'bill', 'george'] in paths
 
 
+def test_iter_paths_to_leaves(tree):
+    tree.create_node('Jill', 'jill', parent='jane')
+    tree.create_node('Mark', 'mark', parent='diane')
+    assert list(tree.iter_paths_to_leaves()) == [
+        ('hárry', 'jane', 'diane', 'mark'),
+        ('hárry', 'jane', 'jill'),
+        ('hárry', 'bill', 'george'),
+    ]
+    assert list(tree.iter_paths_to_leaves(deltas=True)) == [
+        (0, ('hárry', 'jane', 'diane', 'mark')),
+        (2, ('jill',)),
+        (1, ('bill', 'george')),
+    ]
+    assert list(tree.iter_paths_to_leaves('bill')) == [('bill', 'george')]
+    assert list(tree.iter_paths_to_leaves('george', deltas=True)) == \
+        [(0, ('george',))]
+    assert list(Tree().iter_paths_to_leaves()) == []
+
+
 def test_nodes(tree):
     assert len(tree) == 5
     assert len(tree.values()) == 5
@@ -154,6 +180,55 @@ def test_expand_tree(tree):
     assert len(nodes) == 3
 
 
+def test_expand_tree_order(tree):
+    assert list(tree.expand_tree()) == \
+        ['hárry', 'bill', 'george', 'jane', 'diane']
+    assert list(tree.expand_tree(reverse=True)) == \
+        ['hárry', 'jane', 'diane', 'bill', 'george']
+    assert list(tree.expand_tree(mode='width')) == \
+        ['hárry', 'bill', 'jane', 'george', 'diane']
+    assert list(tree.expand_tree(mode='zigzag')) == \
+        ['hárry', 'bill', 'jane', 'diane', 'george']
+
+
+def test_expand_tree_deep_chain():
+    tree = Tree()
+    tree.create_node('0', 0)
+    for i in range(1, 10000):
+        tree.create_node(str(i), i, parent=i - 1)
+
+    for mode in ('depth', 'width', 'zigzag'):
+        assert list(tree.expand_tree(mode=mode)) == list(range(10000))
+
+
+def test_from_edges(tree):
+    edges = [('diane', 'jane', 'Diane'),
+             ('george', 'bill', 'George', 42),
+             ('jane', 'hárry', 'Jane'),
+             ('hárry', None, 'Hárry'),
+             ('bill', 'hárry', 'Bill')]
+    result = Tree.from_edges(edges)
+    assert result.root == 'hárry'
+    assert result.to_dict() == tree.to_dict()
+    assert result['george'].data == 42
+    assert result['george'].tree is result
+    assert result.level('diane') == 2
+    assert result.depth() == 2
+    assert list(Tree.from_edges([])) == []
+
+    with pytest.raises(DuplicatedNode):
+        Tree.from_edges(edges + [('bill', 'jane')])
+
+    with pytest.raises(MultipleRoots):
+        Tree.from_edges(edges + [('alien', None)])
+
+    with pytest.raises(NodeNotFound):
+        Tree.from_edges(edges + [('alien', 'ufo')])
+
+    with pytest.raises(LoopError):
+        Tree.from_edges(edges + [('a', 'b'), ('b', 'a')])
+
+
 def test_move_node(tree):
     diane_parent = tree.parent("diane")
     tree.move_node("diane", "bill")
@@ -206,6 +281,61 @@ def test_to_json(tree):
     )
 
 
+def test_dump_json(tree):
+    stream = io.StringIO()
+    tree.dump_json(stream, with_data=True)
+    assert stream.getvalue() == tree.to_json(with_data=True)
+
+    chunks = list(tree.iter_json(chunk_size=10))
+    assert len(chunks) > 1
+    assert ''.join(chunks) == tree.to_json()
+    assert ''.join(tree.iter_json('jane')) == \
+        '{"Jane": {"children": ["Diane"]}}'
+
+
+def test_to_json_deep_tree():
+    tree = Tree()
+    tree.create_node('0', 0)
+    for i in range(1, 5000):
+        tree.create_node(str(i), i, parent=i - 1)
+
+    result = tree.to_json()
+    assert result.startswith('{"0": {"children": [{"1": {"children": [')
+    assert result.endswith('"4999"' + ']}}' * 4999)
+
+
+def test_from_json(tree):
+    for with_data in (False, True):
+        source = tree.to_json(with_data=with_data)
+        for incremental in (False, True):
+            result = Tree.from_json(source, incremental=incremental,
+                                    chunk_size=3)
+            assert result.to_json(with_data=with_data) == source
+            assert len(result) == 5
+            assert result.level(result.leaves()[0].id) == 2
+
+    result = Tree.from_dict(tree.to_dict(), id_factory=str.lower)
+    assert result.root == 'hárry'
+    assert result.is_branch('jane') == ['diane']
+
+
+def test_from_json_collapsed_and_data():
+    tree = Tree()
+    tree.create_node('Root', 'root', data={'rank': 1})
+    tree.create_node('Folded', 'folded', parent='root', expanded=False)
+    tree.create_node('Hidden', 'hidden', parent='folded')
+    source = tree.to_json(with_data=True)
+
+    result = Tree.from_json(io.StringIO(source), incremental=True)
+    assert result[result.root].data == {'rank': 1}
+    folded, = result.children(result.root)
+    assert not folded.expanded
+    assert result.to_json(with_data=True) == source
+
+    with pytest.raises(ValueError):
+        Tree.from_json('{"Root": {"children": ["A"]}} []', incremental=True)
+
+
 def test_siblings(tree):
     assert not tree.siblings("hárry")
     assert tree.siblings("jane")[0].id == "bill"
@@ -246,6 +376,33 @@ def test_level(tree):
     assert tree.level('diane', lambda x: x.id != 'jane') == depth - 1
 
 
+def test_level_index(tree):
+    tree.create_node("Jill", "jill", parent="george")
+    tree.create_node("Mark", "mark", parent="jill")
+    assert tree.depth() == 4
+    assert tree.size(level=4) == 1
+
+    tree.move_node("jill", "hárry")
+    assert tree.level("mark") == 2
+    assert tree.depth() == 2
+    assert tree.size(level=1) == 3
+
+    tree.link_past_node("jill")
+    assert tree.level("mark") == 1
+
+    subtree = tree.remove_subtree("bill")
+    assert subtree.level("george") == 1
+    assert tree.size(level=2) == 1
+
+    tree.paste("diane", subtree)
+    assert tree.level("george") == 4
+    assert tree.depth() == 4
+
+    tree.remove_node("jane")
+    assert tree.depth() == 1
+    assert tree.size(level=2) == 0
+
+
 def test_size(tree):
     assert tree.size(level=2) == 2
     assert tree.size(level=1) == 2
@@ -305,6 +462,72 @@ def test_loop():
         tree.move_node(source='b', destination='d')
 
 
+def test_is_ancestor(tree):
+    assert tree.is_ancestor('hárry', 'diane')
+    assert tree.is_ancestor('jane', 'diane')
+    assert not tree.is_ancestor('bill', 'diane')
+    assert not tree.is_ancestor('diane', 'diane')
+    assert tree.is_descendant('george', 'hárry')
+
+    with pytest.raises(LoopError):
+        tree.move_node('jane', 'jane')
+
+
+def test_intervals(tree):
+    intervals = tree.intervals
+    assert tree.intervals is intervals
+    assert intervals.order == ['hárry', 'jane', 'diane', 'bill', 'george']
+    assert intervals.subtree('jane') == ['jane', 'diane']
+    assert tree.subtree_size('hárry') == 5
+    assert tree.is_ancestor('hárry', 'george')
+    assert not tree.is_ancestor('jane', 'george')
+
+    tree.move_node('george', 'jane')
+    assert tree._intervals is None
+    assert tree.is_ancestor('jane', 'george')
+    assert tree.subtree_size('jane') == 3
+
+    with pytest.raises(NodeNotFound):
+        tree.intervals.range('alien')
+
+
+def test_freeze(tree):
+    tree.freeze()
+    assert tree.frozen
+    assert tree.subtree_size('bill') == 2
+
+    with pytest.raises(FrozenTree):
+        tree.create_node('Jill', 'jill', parent='jane')
+
+    with pytest.raises(FrozenTree):
+        tree.remove_node('bill')
+
+    assert 'bill' in tree
+    tree.unfreeze()
+    tree.create_node('Jill', 'jill', parent='jane')
+    assert tree.subtree_size('jane') == 3
+
+
+def test_lca(tree):
+    assert tree.lca('diane', 'george') == 'hárry'
+    assert tree.lca('jane', 'diane') == 'jane'
+    assert tree.lca('diane', 'diane') == 'diane'
+    assert tree.lca_many(['diane', 'jane']) == 'jane'
+    assert tree.lca_many(['george', 'bill', 'diane']) == 'hárry'
+    assert tree.distance('diane', 'george') == 4
+    assert tree.distance('hárry', 'george') == 2
+
+    tree.move_node('george', 'diane')
+    assert tree.lca('diane', 'george') == 'diane'
+    assert tree.distance('bill', 'george') == 4
+
+    with pytest.raises(NodeNotFound):
+        tree.lca('alien', 'diane')
+
+    with pytest.raises(ValueError):
+        tree.lca_many([])
+
+
 def test_node_to_tree_link():
     tree = Tree()
     node_a = tree.create_node('a', 'a')
@@ -314,3 +537,137 @@ def test_node_to_tree_link():
     tree.create_node('d', 'd', parent='c')
     tree.remove_node(node_a.id)
     assert node_a.tree is None
+
+
+@pytest.mark.parametrize('clone', [
+    lambda t: pickle.loads(pickle.dumps(t, pickle.HIGHEST_PROTOCOL)),
+    copy.deepcopy,
+    lambda t: Tree(t, deepcopy=True),
+])
+def test_pickle_and_deepcopy(tree, clone):
+    tree.move_node('george', 'jane')
+    tree['diane'].data = {'age': 7}
+    tree['bill'].expanded = False
+    result = clone(tree)
+
+    assert list(result) == list(tree)
+    assert result.root == 'hárry'
+    assert result.to_dict(with_data=True) == tree.to_dict(with_data=True)
+    assert result['jane'].children == ['diane', 'george']
+    assert result['george'].parent == 'jane'
+    assert not result['bill'].expanded
+    assert result.level('george') == 2
+    assert result.size(2) == 2
+    assert all(node.tree is result for node in result.values())
+    assert result['diane'] is not tree['diane']
+    assert result['diane'].data is not tree['diane'].data
+
+    result.create_node('Jill', 'jill', parent='george')
+    assert 'jill' not in tree
+    assert not tree['george'].children
+
+
+def test_pickle_subtree(tree):
+    result = pickle.loads(pickle.dumps(tree.subtree('jane')))
+    assert list(result) == ['jane', 'diane']
+    assert result['jane'].parent == 'hárry'
+    assert result.level('diane') == 1
+
+
+@pytest.mark.parametrize('indexed', [False, True])
+def test_path_lookup(tree, indexed):
+    if indexed:
+        tree.build_path_index()
+    assert tree.get_by_path('Jane/Diane').id == 'diane'
+    assert tree.get_by_path(['Bill', 'George']).id == 'george'
+    assert tree.get_by_path('').id == 'hárry'
+    assert tree.get_by_path('George', node_id='bill').id == 'george'
+
+    with pytest.raises(NodeNotFound):
+        tree.get_by_path('Jane/George')
+
+    node = tree.ensure_path('Jane/Diane/Jill/Mark',
+                            id_factory=lambda tags: '/'.join(tags))
+    assert node.id == 'Jane/Diane/Jill/Mark'
+    assert tree['Jane/Diane/Jill'].parent == 'diane'
+    assert tree.ensure_path('/Jane/Diane/Jill/') is tree['Jane/Diane/Jill']
+    assert len(tree) == 7
+
+
+def test_path_index_maintenance(tree):
+    tree.build_path_index()
+    tree.move_node('george', 'jane')
+    assert tree.get_by_path('Jane/George').id == 'george'
+    with pytest.raises(NodeNotFound):
+        tree.get_by_path('Bill/George')
+
+    tree.create_node('Diane', 'diane2', parent='jane')
+    tree.remove_node('diane')
+    assert tree.get_by_path('Jane/Diane').id == 'diane2'
+
+    tree.update_node('diane2', tag='Di')
+    assert tree.get_by_path('Jane/Di').id == 'diane2'
+
+    tree.link_past_node('jane')
+    assert tree.get_by_path('George').id == 'george'
+    with pytest.raises(NodeNotFound):
+        tree.get_by_path('Jane')
+
+    tree.remove_subtree('bill')
+    with pytest.raises(NodeNotFound):
+        tree.get_by_path('Bill')
+
+    other = Tree()
+    other.create_node('Mark', 'mark')
+    other.create_node('Jill', 'jill', parent='mark')
+    tree.paste('george', other)
+    assert tree.get_by_path('George/Mark/Jill').id == 'jill'
+
+
+def test_path_index_first_sibling(tree):
+    for name in ('a', 'b', 'c', 'd'):
+        tree.create_node(name.upper(), name, parent='jane')
+    tree.build_path_index()
+
+    tree.update_node('c', tag='X')
+    tree.update_node('a', tag='X')
+    assert tree.get_by_path('Jane/X').id == 'a'
+    tree.update_node('b', tag='X')
+    tree.remove_node('a')
+    assert tree.get_by_path('Jane/X').id == 'b'
+    tree.move_node('b', 'bill')
+    tree.move_node('b', 'jane')
+    assert tree.get_by_path('Jane/X').id == 'c'
+    tree.update_node('d', tag='X')
+    tree.update_node('c', tag='C')
+    assert tree.get_by_path('Jane/X').id == 'd'
+
+
+def test_path_index_random(tree):
+    rng = random.Random(3)
+    indexed = Tree(tree, deepcopy=True)
+    indexed.build_path_index()
+    for step in range(300):
+        node_id = rng.choice(list(tree))
+        action = rng.randrange(4)
+        tag = rng.choice('XYZ')
+        if action == 0:
+            for copy_ in (tree, indexed):
+                copy_.create_node(tag, step, parent=node_id)
+        elif action == 1:
+            for copy_ in (tree, indexed):
+                copy_.update_node(node_id, tag=tag)
+        elif action == 2 and node_id != tree.root:
+            destination = rng.choice(list(tree))
+            if destination != node_id and \
+                    not tree.is_ancestor(node_id, destination):
+                for copy_ in (tree, indexed):
+                    copy_.move_node(node_id, destination)
+        elif action == 3 and node_id != tree.root and len(tree) > 20:
+            for copy_ in (tree, indexed):
+                copy_.remove_node(node_id)
+
+        for parent in tree:
+            for tag in 'XYZ':
+                assert tree._child_by_tag(parent, tag) == \
+                    indexed._child_by_tag(parent, tag)
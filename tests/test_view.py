@@ -0,0 +1,65 @@
+import pytest
+
+from ttree import SubtreeView
+from ttree.exceptions import NodeNotFound
+
+
+@pytest.fixture
+def view(tree):
+    tree.create_node('Jill', 'jill', parent='diane')
+    tree.create_node('Mark', 'mark', parent='jane')
+    return tree.subtree_view('jane')
+
+
+def test_view_reads(tree, view):
+    assert isinstance(view, SubtreeView)
+    assert view.root == 'jane'
+    assert view.tree is tree
+    assert len(view) == 4
+    assert list(view) == ['jane', 'diane', 'jill', 'mark']
+    assert 'jill' in view
+    assert 'bill' not in view
+    assert 'hárry' not in view
+    assert 'alien' not in view
+    assert view['diane'] is tree['diane']
+    assert view.get('diane') is tree['diane']
+    assert view.get('bill') is None
+    assert view.get('alien', 0) == 0
+    assert view.parent('jane') is None
+    assert view.parent('jill').id == 'diane'
+    assert view.level('jill') == 2
+    assert view.depth() == 2
+    assert view.size(1) == 2
+    assert list(view.rsearch('jill')) == ['jill', 'diane', 'jane']
+    assert [n.id for n in view.leaves()] == ['jill', 'mark']
+    assert list(view.expand_tree(mode='width')) == \
+        ['jane', 'diane', 'mark', 'jill']
+    assert view.to_dict() == tree.to_dict('jane')
+    assert view.to_json() == '{"Jane": {"children": [{"Diane": ' \
+                             '{"children": ["Jill"]}}, "Mark"]}}'
+    assert str(view) == 'Jane\n|-- Diane\n|   +-- Jill\n+-- Mark\n'
+
+    with pytest.raises(NodeNotFound):
+        view['george']
+
+    with pytest.raises(NodeNotFound):
+        list(view.expand_tree('bill'))
+
+
+def test_view_is_live(tree, view):
+    assert tree.intervals is not None
+    assert 'jill' in view
+    assert len(view) == 4
+
+    tree.move_node('george', 'mark')
+    assert 'george' in view
+    assert len(view) == 5
+    assert view.level('george') == 2
+
+    tree.remove_node('jane')
+    assert 'jane' not in view
+    assert len(view) == 0
+    assert list(view) == []
+
+    with pytest.raises(NodeNotFound):
+        view.to_tree()
@@ -11,3 +11,10 @@ __version__ = '1.0.3'
 
 from .tree import Tree  # noqa
 from .node import Node  # noqa
+from .columnar import ColumnarTree  # noqa
+from .binary import MappedTree  # noqa
+from .snapshot import TreeSnapshot  # noqa
+from .view import SubtreeView  # noqa
+from .batch import TreeBatch  # noqa
+from .concurrency import ConcurrentTree  # noqa
+from .delta import diff  # noqa
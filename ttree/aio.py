@@ -0,0 +1,57 @@
+"""
+Asyncio counterparts of traversals and rendering of trees.
+
+The work is still done by the synchronous generators of the tree, only
+control is given back to the event loop with ``await asyncio.sleep(0)``
+after every ``budget`` items, e.g. nodes or lines, so a long traversal
+doesn't block other tasks. The tree must not be changed by other tasks
+while it is traversed.
+"""
+import asyncio
+import inspect
+from typing import AsyncIterator, Callable, Hashable, Iterable, Union
+
+from ttree.common import ASCIIMode
+from .utils import tree_lines
+
+#: default number of items between switches to the event loop
+DEFAULT_BUDGET = 1000
+
+
+async def aiterate(iterable: Iterable, budget: int = DEFAULT_BUDGET
+                   ) -> AsyncIterator:
+    """Generate items of ``iterable`` yielding control every ``budget``."""
+    if budget < 1:
+        raise ValueError('Budget must be positive.')
+
+    left = budget
+    for item in iterable:
+        yield item
+        left -= 1
+        if not left:
+            await asyncio.sleep(0)
+            left = budget
+
+
+async def aprint_tree(tree, node_id: Hashable = None, id_hidden: bool = True,
+                      filtering=None, key=None, reverse: bool = False,
+                      ascii_mode: Union[ASCIIMode, str] = ASCIIMode.ex,
+                      data_property: str = None, func: Callable = None,
+                      budget: int = DEFAULT_BUDGET):
+    """
+    Pass lines of the tree to ``func`` like :func:`ttree.utils.print_tree`.
+
+    ``func`` may be a coroutine function, e.g. a sink writing to an
+    :class:`asyncio.StreamWriter`, then it is awaited for every line.
+    Without ``func`` the whole text is returned.
+    """
+    lines = tree_lines(tree, node_id, id_hidden, filtering, key, reverse,
+                       ascii_mode, data_property)
+    if func is None:
+        return '\n'.join([line async for line in aiterate(lines, budget)]) \
+            + '\n'
+
+    async for line in aiterate(lines, budget):
+        result = func(line)
+        if inspect.isawaitable(result):
+            await result
@@ -0,0 +1,371 @@
+from collections import OrderedDict
+
+from ttree.common import EventKind
+from ttree.exceptions import (
+    NodeNotFound, MultipleRoots, DuplicatedNode, LoopError
+)
+from .events import TreeEvent
+from .node import Node
+
+
+class _Changes:
+    """
+    Overlay of the structure of a tree built by replaying the operations
+    of a batch, the tree itself is not changed.
+    """
+    def __init__(self, tree):
+        self.tree = tree
+        self.root = tree.root
+        #: new nodes by IDs in the order of additions
+        self.added = {}
+        #: IDs of nodes of the tree which are removed, in the order of
+        #: removals
+        self.removed = {}
+        #: new parents of added and moved nodes
+        self.parents = {}
+        #: new children of changed nodes, also of parents which are not
+        #: added yet
+        self.children = {}
+        #: new attributes of updated nodes of the tree
+        self.updates = {}
+
+    def exists(self, node_id) -> bool:
+        if node_id in self.added:
+            return True
+        if node_id in self.removed:
+            return False
+        return OrderedDict.__contains__(self.tree, node_id)
+
+    def parent(self, node_id):
+        if node_id in self.parents:
+            return self.parents[node_id]
+        return OrderedDict.__getitem__(self.tree, node_id)._parent
+
+    def children_of(self, node_id) -> dict:
+        """Return the children of the node to be changed."""
+        children = self.children.get(node_id)
+        if children is None:
+            children = self.children[node_id] = {}
+            if node_id not in self.removed and \
+                    OrderedDict.__contains__(self.tree, node_id):
+                raw = OrderedDict.__getitem__(self.tree, node_id)._children
+                children.update(raw or ())
+        return children
+
+    def add(self, node: Node, pid):
+        node_id = node.id
+        if self.exists(node_id):
+            raise DuplicatedNode(f"Node with ID '{node_id}' "
+                                 f"is already exists in tree.")
+
+        if pid is None:
+            if self.root is not None:
+                raise MultipleRoots('A tree takes one root merely.')
+            self.root = node_id
+
+        self.added[node_id] = node
+        self.parents[node_id] = pid
+        # Children may have been added before the node
+        self.children.setdefault(node_id, {})
+        if pid is not None:
+            self.children_of(pid)[node_id] = None
+
+    def move(self, source, destination):
+        for node_id in (source, destination):
+            if node_id is None or not self.exists(node_id):
+                raise NodeNotFound(f"Node '{node_id}' is not in the tree")
+
+        if source == destination or source == self.root:
+            raise LoopError(f"Node '{source}' can't be moved "
+                            f"to '{destination}'")
+
+        self.children_of(self.parent(source)).pop(source, None)
+        self.children_of(destination)[source] = None
+        self.parents[source] = destination
+
+    def update(self, node_id, attrs: dict):
+        if not self.exists(node_id):
+            raise NodeNotFound(f"Node '{node_id}' is not in the tree")
+
+        if node_id in self.added:
+            # New nodes are not in the tree yet
+            for name, value in attrs.items():
+                setattr(self.added[node_id], name, value)
+        else:
+            self.updates.setdefault(node_id, {}).update(attrs)
+
+    def remove(self, node_id):
+        if not self.exists(node_id):
+            raise NodeNotFound(f"Node '{node_id}' is not in the tree")
+
+        pid = self.parent(node_id)
+        if pid is None:
+            self.root = None
+        else:
+            self.children_of(pid).pop(node_id, None)
+
+        stack = [node_id]
+        while stack:
+            node_id = stack.pop()
+            children = self.children.pop(node_id, None)
+            if children is None:
+                children = OrderedDict.__getitem__(
+                    self.tree, node_id
+                )._children
+            stack.extend(children or ())
+
+            self.parents.pop(node_id, None)
+            self.updates.pop(node_id, None)
+            if node_id in self.added:
+                del self.added[node_id]
+            else:
+                self.removed[node_id] = None
+
+    def validate(self):
+        """Check that the result is a tree: no orphans and no cycles."""
+        for node_id, pid in self.parents.items():
+            if pid is not None and not self.exists(pid):
+                raise NodeNotFound(f"Parent node '{pid}' is not in the tree")
+
+        # Every changed node has to reach the root, nodes which reach it
+        # are not walked again
+        reaching = set()
+        for node_id in self.parents:
+            path = set()
+            current = node_id
+            while current is not None and current not in reaching:
+                if current in path:
+                    raise LoopError(f"Node '{node_id}' is in a cycle.")
+                path.add(current)
+                current = self.parent(current)
+            reaching |= path
+
+
+class TreeBatch:
+    """
+    Mutations of a :class:`~ttree.Tree` buffered by
+    :meth:`ttree.Tree.batch` and applied at once.
+
+    :meth:`add_node`, :meth:`create_node`, :meth:`move_node`,
+    :meth:`remove_node` and :meth:`update_node` only record operations, the
+    tree is not changed until :meth:`commit`, which the ``with`` block
+    calls on exit. A commit replays the operations in one pass over plain
+    dicts, so a node may be added before its parent. Then the result is
+    validated as a whole: duplicated IDs, several roots, unknown parents
+    and cycles raise the same exceptions as the methods of the tree, and
+    the tree is left untouched. Only a valid batch is applied: nodes are
+    linked directly, and levels, the path index, secondary indexes, subtree
+    hashes and snapshots are updated once for all changed nodes.
+    Subscribers of :meth:`ttree.Tree.subscribe` are notified of the net
+    changes only.
+
+    If the ``with`` block raises, the operations are discarded.
+    """
+    def __init__(self, tree):
+        self._tree = tree
+        self._operations = []
+        self._closed = False
+
+    def __len__(self):
+        return len(self._operations)
+
+    def __enter__(self) -> 'TreeBatch':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def _record(self, *operation):
+        if self._closed:
+            raise RuntimeError('Batch is already committed or rolled back.')
+        self._operations.append(operation)
+
+    def add_node(self, node: Node, parent: Node = None):
+        """Buffer :meth:`ttree.Tree.add_node`."""
+        if not isinstance(node, Node):
+            raise TypeError('First parameter must be instance of Node.')
+
+        pid = parent.id if isinstance(parent, Node) else parent
+        self._record('add', node, pid)
+
+    def create_node(self, *args, parent=None, node_cls=Node, **kwargs):
+        """Buffer :meth:`ttree.Tree.create_node` and return the new node."""
+        if not issubclass(node_cls, Node):
+            raise ValueError('node_cls must be a subclass of Node.')
+
+        node = node_cls(*args, **kwargs)
+        self.add_node(node, parent)
+        return node
+
+    def move_node(self, source, destination):
+        """Buffer :meth:`ttree.Tree.move_node`."""
+        self._record('move', source, destination)
+
+    def remove_node(self, node_id):
+        """Buffer :meth:`ttree.Tree.remove_node`."""
+        if node_id is not None:
+            self._record('remove', node_id)
+
+    def update_node(self, node_id, **attrs):
+        """Buffer :meth:`ttree.Tree.update_node`."""
+        for name in ('id', 'parent', 'children'):
+            if name in attrs:
+                raise ValueError(f"'{name}' of a node can't be updated.")
+
+        self._record('update', node_id, attrs)
+
+    def rollback(self):
+        """Discard the buffered operations."""
+        self._operations = []
+        self._closed = True
+
+    def commit(self):
+        """Validate the buffered operations and apply them to the tree."""
+        if self._closed:
+            raise RuntimeError('Batch is already committed or rolled back.')
+
+        operations, self._operations = self._operations, []
+        self._closed = True
+        if not operations:
+            return
+
+        changes = _Changes(self._tree)
+        for operation in operations:
+            kind = operation[0]
+            if kind == 'add':
+                changes.add(operation[1], operation[2])
+            elif kind == 'move':
+                changes.move(operation[1], operation[2])
+            elif kind == 'update':
+                changes.update(operation[1], operation[2])
+            else:
+                changes.remove(operation[1])
+        changes.validate()
+        self._apply(changes)
+
+    def _apply(self, changes: _Changes):
+        tree = self._tree
+        tree._touch()
+        get = OrderedDict.__getitem__
+
+        changed_children = [node_id for node_id in changes.children
+                            if changes.exists(node_id)]
+        tree._save([*changes.removed, *changes.added, *changes.parents,
+                    *changed_children, *changes.updates])
+        if tree._subscribers:
+            events = self._events(changes)
+
+        removed = changes.removed
+        if removed:
+            tree._forget_paths(removed)
+            tree._unindex_levels(removed)
+            tree._drop_from_indexes(removed)
+            for node_id in removed:
+                OrderedDict.pop(tree, node_id)._tree = None
+
+        for node_id, node in changes.added.items():
+            OrderedDict.__setitem__(tree, node_id, node)
+            node._tree = tree
+
+        for node_id, pid in changes.parents.items():
+            get(tree, node_id)._parent = pid
+        for node_id in changed_children:
+            get(tree, node_id)._children = changes.children[node_id] or None
+        for node_id, attrs in changes.updates.items():
+            node = get(tree, node_id)
+            for name, value in attrs.items():
+                setattr(node, name, value)
+        tree.root = changes.root
+
+        self._index_levels(changes.parents)
+
+        if tree._path_index is not None:
+            # Parents of renamed nodes are indexed again too
+            parents = dict.fromkeys(changed_children)
+            parents.update(dict.fromkeys(
+                get(tree, node_id)._parent
+                for node_id, attrs in changes.updates.items()
+                if 'tag' in attrs
+            ))
+            parents.pop(None, None)
+            for node_id in parents:
+                tree._index_children_paths(node_id)
+
+        if tree._indexes:
+            tree._reindex([*changes.parents, *changed_children,
+                           *changes.updates])
+        if tree._hashes is not None:
+            tree._forget_hashes(removed)
+            tree._rehash(changed_children + list(changes.updates))
+        if tree._subscribers:
+            tree._emit(events)
+
+    def _events(self, changes: _Changes) -> list:
+        """Return events of the net changes before they are applied."""
+        get = OrderedDict.__getitem__
+        tree = self._tree
+        events = [TreeEvent(EventKind.REMOVED, node_id,
+                            get(tree, node_id)._parent)
+                  for node_id in changes.removed]
+        for node_id, pid in changes.parents.items():
+            if node_id in changes.added:
+                events.append(TreeEvent(EventKind.ADDED, node_id, pid))
+                continue
+
+            old_parent = get(tree, node_id)._parent
+            if old_parent != pid:
+                events.append(TreeEvent(EventKind.MOVED, node_id, pid,
+                                        old_parent))
+        events.extend(
+            TreeEvent(EventKind.UPDATED, node_id, changes.parent(node_id),
+                      attributes=tuple(attrs))
+            for node_id, attrs in changes.updates.items()
+        )
+        return events
+
+    def _index_levels(self, node_ids):
+        """
+        Set levels of subtrees of moved and added nodes which have no moved
+        or added ancestors.
+        """
+        tree = self._tree
+        get = OrderedDict.__getitem__
+        levels, sizes = tree._levels, tree._level_sizes
+
+        # Whether a node or any of its ancestors is moved or added
+        changed = dict.fromkeys(node_ids, True)
+        stack = []
+        for node_id in node_ids:
+            pid = get(tree, node_id)._parent
+            path = []
+            current = pid
+            while current is not None and current not in changed:
+                path.append(current)
+                current = get(tree, current)._parent
+            below_changed = current is not None and changed[current]
+            changed.update(dict.fromkeys(path, below_changed))
+
+            if not below_changed:
+                stack.append((node_id, 0 if pid is None else levels[pid] + 1))
+
+        # Subtrees of these nodes are disjoint, every node is visited once
+        while stack:
+            node_id, level = stack.pop()
+            old_level = levels.get(node_id)
+            if old_level is not None:
+                sizes[old_level] -= 1
+            levels[node_id] = level
+            if level < len(sizes):
+                sizes[level] += 1
+            else:
+                sizes.append(1)
+
+            children = get(tree, node_id)._children
+            if children:
+                level += 1
+                stack.extend((child, level) for child in children)
+
+        tree._trim_level_sizes()
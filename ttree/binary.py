@@ -0,0 +1,278 @@
+"""
+Compact binary tree file format.
+
+A file consists of a fixed header, a table of sections and the sections
+themselves, all integers are little-endian and sections are aligned to
+8 bytes::
+
+    header     magic b'TTREEBIN', version (u16), flags (u16), nodes (u64)
+    table      (offset, length) as two u64 for every section below
+    parents    i64 parent position of every node, -1 for the root
+    depths     i64 level of every node
+    offsets    i64 position of the first child of every node, plus total
+    collapsed  i64 positions of nodes which are not expanded
+    ids        i64 offsets of every encoded ID in the pool, plus total
+    id pool    encoded IDs
+    tags       i64 offsets of every encoded tag in the pool, plus total
+    tag pool   encoded tags
+    data       pickled dict of data payloads by position, may be empty
+
+Nodes are stored in breadth-first order, so children of every node take
+consecutive positions and the ``offsets`` column is enough to find them.
+IDs and tags are encoded with a type byte: UTF-8 strings and integers are
+stored as text and UUIDs as 16 bytes, other types of IDs and tags are not
+supported. Only data payloads are pickled, so they must come from a trusted
+file, while IDs, tags and structure are safe to read from any file.
+"""
+import mmap
+import operator
+import pickle
+import struct
+import sys
+import uuid
+from array import array
+
+from ttree.exceptions import NodeNotFound
+from .columnar import ColumnarTree
+
+MAGIC = b'TTREEBIN'
+VERSION = 1
+FLAG_DATA = 1
+
+_HEADER = struct.Struct('<8sHHQ')
+_SECTIONS = ('parents', 'depths', 'offsets', 'collapsed', 'ids', 'id_pool',
+             'tags', 'tag_pool', 'data')
+_TABLE = struct.Struct('<' + 'QQ' * len(_SECTIONS))
+
+_STR, _INT, _UUID = b's', b'i', b'u'
+
+
+def _encode(value) -> bytes:
+    if isinstance(value, str):
+        return _STR + value.encode('utf-8')
+    if type(value) is int:
+        return _INT + str(value).encode('ascii')
+    if isinstance(value, uuid.UUID):
+        return _UUID + value.bytes
+    raise TypeError(f'IDs and tags of type {type(value).__name__} '
+                    f'are not supported by the binary format.')
+
+
+def _decode(raw: bytes):
+    kind, payload = raw[:1], raw[1:]
+    if kind == _STR:
+        return payload.decode('utf-8')
+    if kind == _INT:
+        return int(payload)
+    if kind == _UUID:
+        return uuid.UUID(bytes=payload)
+    raise ValueError(f'Unknown encoding {kind!r} of an ID or a tag.')
+
+
+def _int64(values) -> bytes:
+    result = array('q', values)
+    if sys.byteorder == 'big':
+        result.byteswap()
+    return result.tobytes()
+
+
+def _pool(values):
+    offsets, chunks, total = [0], [], 0
+    for value in values:
+        raw = _encode(value)
+        chunks.append(raw)
+        total += len(raw)
+        offsets.append(total)
+    return _int64(offsets), b''.join(chunks)
+
+
+def write_binary(tree, fp, with_data: bool = True):
+    """
+    Write ``tree`` to the binary file object ``fp``.
+
+    Any tree providing ``root``, ``is_branch`` and node access by ID, e.g.
+    :class:`~ttree.Tree` or :class:`~ttree.ColumnarTree`, can be written.
+    Data payloads are pickled in a single blob if ``with_data`` is set.
+    IDs and tags must be strings, integers or UUIDs, otherwise
+    :class:`TypeError` is raised before anything is written.
+    """
+    order = [] if tree.root is None else [tree.root]
+    parents, depths, offsets = [], [], []
+    children_start = 1
+    for position, node_id in enumerate(order):
+        if position == 0:
+            parents.append(-1)
+            depths.append(0)
+        children = tree.is_branch(node_id)
+        offsets.append(children_start)
+        children_start += len(children)
+        order.extend(children)
+        parents.extend(position for _ in children)
+        depths.extend(depths[position] + 1 for _ in children)
+    offsets.append(len(order))
+
+    nodes = [tree[node_id] for node_id in order]
+    collapsed = [i for i, node in enumerate(nodes) if not node.expanded]
+    data = {}
+    if with_data:
+        data = {i: node.data for i, node in enumerate(nodes)
+                if node.data is not None}
+
+    id_offsets, id_pool = _pool(order)
+    tag_offsets, tag_pool = _pool(node.tag for node in nodes)
+    sections = [
+        _int64(parents), _int64(depths), _int64(offsets), _int64(collapsed),
+        id_offsets, id_pool, tag_offsets, tag_pool,
+        pickle.dumps(data, pickle.HIGHEST_PROTOCOL) if data else b'',
+    ]
+
+    position = _HEADER.size + _TABLE.size
+    table = []
+    for section in sections:
+        position += -position % 8
+        table.extend((position, len(section)))
+        position += len(section)
+
+    fp.write(_HEADER.pack(MAGIC, VERSION, FLAG_DATA if data else 0,
+                          len(order)))
+    fp.write(_TABLE.pack(*table))
+    written = _HEADER.size + _TABLE.size
+    for offset, section in zip(table[::2], sections):
+        fp.write(b'\0' * (offset - written))
+        fp.write(section)
+        written = offset + len(section)
+
+
+class _PoolColumn:
+    """Sequence of values decoded on access from a pool section."""
+    def __init__(self, offsets, pool):
+        self._offsets = offsets
+        self._pool = pool
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        return _decode(
+            bytes(self._pool[self._offsets[index]:self._offsets[index + 1]])
+        )
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class MappedTree(ColumnarTree):
+    """
+    Read-only tree loaded from a file written by :func:`write_binary`.
+
+    The file is memory-mapped and opening it only reads the header: the
+    structure columns are used in place, IDs and tags are decoded on
+    access, the ID index is built on the first lookup by ID and data
+    payloads are unpickled on the first access to data. All read methods
+    of :class:`~ttree.ColumnarTree` are available.
+
+    Data payloads are unpickled, so, like with :mod:`pickle`, data must
+    only be read from trusted files. Nothing is unpickled until data is
+    accessed, so the structure, IDs and tags of any file are safe to read.
+    """
+    def __init__(self, filename):
+        with open(filename, 'rb') as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(self._mmap)
+        #: all views of the memory map, they are released on close
+        self._views = [buffer]
+        magic, version, flags, size = _HEADER.unpack_from(buffer)
+        if magic != MAGIC or version > VERSION:
+            buffer.release()
+            self._mmap.close()
+            if magic != MAGIC:
+                raise ValueError(f"'{filename}' is not a ttree binary file")
+            raise ValueError(f"Unsupported ttree binary version {version}")
+
+        table = _TABLE.unpack_from(buffer, _HEADER.size)
+        sections = {
+            name: buffer[offset:offset + length]
+            for name, offset, length in zip(_SECTIONS, table[::2],
+                                            table[1::2])
+        }
+        self._views.extend(sections.values())
+
+        def column(name):
+            if sys.byteorder == 'big':
+                result = array('q', sections[name].tobytes())
+                result.byteswap()
+                return result
+            result = sections[name].cast('q')
+            self._views.append(result)
+            return result
+
+        self._parents = column('parents')
+        self._depths = column('depths')
+        self._offsets = column('offsets')
+        self._child_indexes = range(size)
+        self._collapsed = set(column('collapsed'))
+        self._ids = _PoolColumn(column('ids'), sections['id_pool'])
+        self._tags = _PoolColumn(column('tags'), sections['tag_pool'])
+        self._data_section = sections['data'] if flags & FLAG_DATA else None
+        self._index_cache = None
+        self._data_cache = None
+
+        try:
+            self.root = self._ids[0] if size else None
+        except ValueError:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Release the memory map, the tree is unusable afterwards."""
+        self._parents = self._depths = self._offsets = None
+        self._ids = self._tags = self._data_section = None
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    @property
+    def _index(self):
+        if self._index_cache is None:
+            self._index_cache = {
+                node_id: i for i, node_id in enumerate(self._ids)
+            }
+        return self._index_cache
+
+    @property
+    def _data(self):
+        if self._data_cache is None:
+            self._data_cache = {} if self._data_section is None \
+                else pickle.loads(self._data_section)
+        return self._data_cache
+
+    def __len__(self):
+        return len(self._depths)
+
+    def _get_index(self, node_id) -> int:
+        if self._index_cache is None and len(self) and node_id == self.root:
+            return 0
+        try:
+            return self._index[node_id]
+        except KeyError:
+            raise NodeNotFound(f"Node '{node_id}' is not in the tree")
+
+    def size(self, level: int = None) -> int:
+        if level is None or not isinstance(level, int):
+            return super().size(level)
+        # Mapped columns are memoryviews, which can't count values
+        return operator.countOf(self._depths, level)
+
+    def add_node(self, node, parent=None):
+        raise TypeError('MappedTree is read-only.')
+
+    def create_node(self, *args, **kwargs):
+        raise TypeError('MappedTree is read-only.')
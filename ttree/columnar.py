@@ -0,0 +1,392 @@
+from array import array
+from collections import deque
+from typing import Callable, Hashable, List, MutableMapping, Optional, Union
+
+from ttree.common import TraversalMode
+from ttree.exceptions import NodeNotFound, MultipleRoots, DuplicatedNode
+from .node import Node, generate_id
+
+
+class ColumnarTree:
+    """
+    Compact append-only tree backend.
+
+    Instead of one :class:`Node` object per node the structure is kept in
+    columns: identifiers, tags, parent and depth indices are stored in
+    lists and :class:`array.array` buffers addressed by the insertion index
+    of a node, and children are looked up through CSR-style offset tables
+    (``_offsets`` and ``_child_indexes``) built lazily from the parent
+    column. Data payloads are stored sparsely, so nodes without data cost
+    nothing extra.
+
+    The read API mirrors :class:`~ttree.Tree`. Nodes returned by
+    ``__getitem__``, ``children`` and ``parent`` are materialized
+    :class:`Node` copies, changing them does not affect the tree.
+    Nodes can't be removed or moved.
+    """
+    def __init__(self):
+        #: id of the root node
+        self.root = None
+
+        self._ids = []
+        self._tags = []
+        self._index = {}
+        self._parents = array('l')
+        self._depths = array('l')
+        self._collapsed = set()
+        self._data = {}
+
+        self._offsets = None
+        self._child_indexes = None
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, node_id):
+        return node_id in self._index
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __getitem__(self, node_id) -> Node:
+        return self._node(self._get_index(node_id))
+
+    def get(self, node_id, default=None) -> Optional[Node]:
+        """Return the node of ``node_id`` or ``default`` if it is absent."""
+        if node_id not in self._index:
+            return default
+        return self[node_id]
+
+    def _get_index(self, node_id) -> int:
+        try:
+            return self._index[node_id]
+        except KeyError:
+            raise NodeNotFound(f"Node '{node_id}' is not in the tree")
+
+    def _node(self, index: int) -> Node:
+        node = Node(self._tags[index], self._ids[index],
+                    expanded=index not in self._collapsed,
+                    data=self._data.get(index))
+        parent = self._parents[index]
+        node.parent = None if parent < 0 else self._ids[parent]
+        node.children = [self._ids[i] for i in self._children_of(index)]
+        return node
+
+    def _build_children(self):
+        """Build CSR offsets table of children ordered by insertion."""
+        size = len(self._ids)
+        offsets = array('l', bytes(array('l').itemsize * (size + 1)))
+        for parent in self._parents:
+            if parent >= 0:
+                offsets[parent + 1] += 1
+
+        for i in range(size):
+            offsets[i + 1] += offsets[i]
+
+        positions = array('l', offsets)
+        child_indexes = array('l', bytes(array('l').itemsize * offsets[-1]))
+        for index, parent in enumerate(self._parents):
+            if parent >= 0:
+                child_indexes[positions[parent]] = index
+                positions[parent] += 1
+
+        self._offsets = offsets
+        self._child_indexes = child_indexes
+
+    def _children_of(self, index: int):
+        if self._offsets is None:
+            self._build_children()
+        return self._child_indexes[
+            self._offsets[index]:self._offsets[index + 1]
+        ]
+
+    def _expansion(self, index: int, filtering=None, key=None,
+                   reverse: bool = False) -> List[int]:
+        children = self._children_of(index)
+        if filtering is None and key is None:
+            tags = self._tags
+            return sorted(children, key=lambda i: tags[i], reverse=reverse)
+
+        nodes = [(i, self._node(i)) for i in children]
+        if filtering is not None:
+            nodes = [(i, n) for i, n in nodes if filtering(n)]
+        nodes.sort(key=lambda item: item[1] if key is None else key(item[1]),
+                   reverse=reverse)
+        return [i for i, _ in nodes]
+
+    def add_node(self, node: Node, parent=None):
+        """
+        Add a copy of the ``node`` to the tree.
+
+        The node object itself is not kept, only its id, tag, data and
+        expanded flag are stored.
+        """
+        if not isinstance(node, Node):
+            raise TypeError('First parameter must be instance of Node.')
+
+        if node.id in self._index:
+            raise DuplicatedNode(f"Node with ID '{node.id}' "
+                                 f"is already exists in tree.")
+
+        pid = parent.id if isinstance(parent, Node) else parent
+
+        if pid is None:
+            if self.root is not None:
+                raise MultipleRoots('A tree takes one root merely.')
+
+            parent_index, depth = -1, 0
+        elif pid not in self._index:
+            raise NodeNotFound(f"Parent node '{pid}' is not in the tree")
+        else:
+            parent_index = self._index[pid]
+            depth = self._depths[parent_index] + 1
+
+        self._append(node.id, node.tag, parent_index, depth, node.expanded,
+                     node.data)
+        if pid is None:
+            self.root = node.id
+
+    def _append(self, node_id, tag, parent_index, depth, expanded, data):
+        index = len(self._ids)
+        self._index[node_id] = index
+        self._ids.append(node_id)
+        self._tags.append(node_id if tag is None else tag)
+        self._parents.append(parent_index)
+        self._depths.append(depth)
+        if not expanded:
+            self._collapsed.add(index)
+        if data is not None:
+            self._data[index] = data
+        self._offsets = self._child_indexes = None
+
+    def create_node(self, tag=None, id=None, expanded=True, data=None,
+                    parent=None) -> Hashable:
+        """
+        Create a new node and add it to this tree.
+
+        If ``id`` is absent, a UUID will be generated automatically.
+        Unlike :meth:`ttree.Tree.create_node` no :class:`Node` object is
+        created, the identifier of the new node is returned.
+        """
+        node_id = generate_id() if id is None else id
+
+        if node_id in self._index:
+            raise DuplicatedNode(f"Node with ID '{node_id}' "
+                                 f"is already exists in tree.")
+
+        pid = parent.id if isinstance(parent, Node) else parent
+
+        if pid is None:
+            if self.root is not None:
+                raise MultipleRoots('A tree takes one root merely.')
+
+            self._append(node_id, tag, -1, 0, expanded, data)
+            self.root = node_id
+        else:
+            parent_index = self._get_index(pid)
+            self._append(node_id, tag, parent_index,
+                         self._depths[parent_index] + 1, expanded, data)
+
+        return node_id
+
+    @classmethod
+    def from_tree(cls, tree) -> 'ColumnarTree':
+        """Create compact copy of the :class:`~ttree.Tree` instance."""
+        result = cls()
+        if tree.root is None:
+            return result
+
+        # Walk through the children lists directly to keep their order
+        queue = deque([(tree.root, None)])
+        while queue:
+            node_id, parent = queue.popleft()
+            node = tree[node_id]
+            result.add_node(node, parent=parent)
+            queue.extend((child, node_id) for child in node.children)
+        return result
+
+    def to_tree(self, tree_cls=None):
+        """Create a :class:`~ttree.Tree` instance with the same nodes."""
+        if tree_cls is None:
+            from .tree import Tree
+            tree_cls = Tree
+
+        result = tree_cls()
+        for index, node_id in enumerate(self._ids):
+            parent = self._parents[index]
+            result.create_node(
+                self._tags[index], node_id,
+                expanded=index not in self._collapsed,
+                data=self._data.get(index),
+                parent=None if parent < 0 else self._ids[parent]
+            )
+        return result
+
+    def children(self, node_id) -> List[Node]:
+        """Return the children (Node) list of ``node_id``."""
+        return [self._node(i)
+                for i in self._children_of(self._get_index(node_id))]
+
+    def is_branch(self, node_id) -> List[Hashable]:
+        """Get the children ids list of the node with ID == node_id."""
+        if node_id is None:
+            raise ValueError("First parameter can't be None")
+
+        return [self._ids[i]
+                for i in self._children_of(self._get_index(node_id))]
+
+    def parent(self, node_id) -> Optional[Node]:
+        """
+        Obtain specific node's parent (Node instance).
+
+        Return None if the node is root.
+        """
+        parent = self._parents[self._get_index(node_id)]
+        return None if parent < 0 else self._node(parent)
+
+    def level(self, node_id) -> int:
+        """
+        Get the node level in this tree.
+
+        The level is an integer starting with '0' at the root.
+        """
+        return self._depths[self._get_index(node_id)]
+
+    def depth(self, node=None) -> int:
+        """Get the maximum level of this tree or the level of the node."""
+        if node is None:
+            return max(self._depths, default=0)
+
+        return self.level(node.id if isinstance(node, Node) else node)
+
+    def size(self, level: int = None) -> int:
+        """
+        Get the number of nodes of the whole tree or at specific level.
+        """
+        if level is None:
+            return len(self)
+
+        if not isinstance(level, int):
+            raise TypeError(f"Level should be an integer instead "
+                            f"of '{type(level)}'")
+
+        return self._depths.count(level)
+
+    def leaves(self, node_id=None) -> List[Node]:
+        """Get leaves from given node."""
+        if self._offsets is None:
+            self._build_children()
+
+        offsets = self._offsets
+        if node_id is None:
+            indexes = range(len(self))
+        else:
+            indexes = (self._index[n] for n in self.expand_tree(node_id))
+
+        return [self._node(i) for i in indexes
+                if offsets[i] == offsets[i + 1]]
+
+    def expand_tree(self, node_id=None,
+                    mode: Union[TraversalMode, str] = TraversalMode.DEPTH,
+                    filtering: Callable[[Node], bool] = None,
+                    key=None, reverse: bool = False):
+        """
+        Traverse the tree nodes with different modes.
+
+        Arguments have the same meaning as in
+        :meth:`ttree.Tree.expand_tree`. ``filtering`` and ``key`` receive
+        materialized :class:`Node` objects, without them children are
+        sorted by tags directly from the columns.
+        """
+        node_id = self.root if node_id is None else node_id
+        index = self._get_index(node_id)
+
+        if filtering is not None and not callable(filtering):
+            raise TypeError('Filtering must be callable.')
+
+        mode = mode if isinstance(mode, TraversalMode) else TraversalMode(mode)
+
+        if filtering is not None and not filtering(self._node(index)):
+            return
+
+        yield node_id
+        ids = self._ids
+
+        if mode is TraversalMode.DEPTH:
+            stack = self._expansion(index, filtering, key, reverse)
+            stack.reverse()
+            while stack:
+                index = stack.pop()
+                yield ids[index]
+                stack.extend(reversed(
+                    self._expansion(index, filtering, key, reverse)
+                ))
+
+        elif mode is TraversalMode.WIDTH:
+            queue = deque(self._expansion(index, filtering, key, reverse))
+            while queue:
+                index = queue.popleft()
+                yield ids[index]
+                queue.extend(self._expansion(index, filtering, key, reverse))
+
+        elif mode is TraversalMode.ZIGZAG:
+            level = self._unsorted(index, filtering)
+            level.reverse()
+            direction = False
+            while level:
+                expansions = []
+                for index in level:
+                    yield ids[index]
+                    expansions.append(self._unsorted(index, filtering))
+
+                level = []
+                for children in reversed(expansions):
+                    if direction:
+                        children.reverse()
+                    level.extend(children)
+                direction = not direction
+
+    def _unsorted(self, index: int, filtering=None) -> List[int]:
+        children = list(self._children_of(index))
+        if filtering is not None:
+            children = [i for i in children if filtering(self._node(i))]
+        return children
+
+    def to_dict(self, node_id=None, key=None, sort=True, reverse=False,
+                with_data=False) -> MutableMapping:
+        """Transform self into a dict of the same shape as Tree.to_dict."""
+        node_id = self.root if node_id is None else node_id
+        index = self._get_index(node_id)
+
+        def convert(i):
+            tag = self._tags[i]
+            if i in self._collapsed or len(self._children_of(i)):
+                value = {tag: {'children': []}}
+                if with_data:
+                    value[tag]['data'] = self._data.get(i)
+                return value
+            return {tag: {'data': self._data.get(i)}} if with_data else tag
+
+        values = {index: convert(index)}
+        stack = [index]
+        while stack:
+            current = stack.pop()
+            children = list(self._children_of(current))
+            if current in self._collapsed or not children:
+                continue
+
+            if sort:
+                if key is None:
+                    children.sort(key=lambda i: self._tags[i],
+                                  reverse=reverse)
+                else:
+                    children.sort(key=lambda i: key(self._node(i)),
+                                  reverse=reverse)
+
+            content = values[current][self._tags[current]]
+            for child in children:
+                values[child] = convert(child)
+                content['children'].append(values[child])
+                stack.append(child)
+
+        return values[index]
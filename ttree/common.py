@@ -18,3 +18,23 @@ class TraversalMode(Enum):
     #: `ZIGZAG search <https://en.wikipedia.org/wiki/Tree_(data_structure)>`_
     #: mode for tree.
     ZIGZAG = 'zigzag'
+
+
+class IndexKind(Enum):
+    #: Hash index for lookups by equal values.
+    HASH = 'hash'
+    #: Sorted index for lookups by equal values and range queries.
+    SORTED = 'sorted'
+
+
+class EventKind(Enum):
+    #: Node was added with add_node() or create_node().
+    ADDED = 'added'
+    #: Node was removed along with its subtree or linked past.
+    REMOVED = 'removed'
+    #: Node was moved to another parent.
+    MOVED = 'moved'
+    #: Node was added with a tree pasted with paste().
+    PASTED = 'pasted'
+    #: Attributes of a node were changed with update_node().
+    UPDATED = 'updated'
@@ -0,0 +1,377 @@
+"""
+Thread-safe access to a :class:`~ttree.Tree` shared by threads.
+
+:class:`ConcurrentTree` wraps a tree with two kinds of locks:
+
+* a :class:`RWLock`, so any number of readers run at once while every
+  mutation of the tree is exclusive;
+* locks of subtrees taken with :meth:`ConcurrentTree.lock_subtree`, which
+  make a sequence of reads and writes within one subtree a transaction.
+  A lock waits only for locks of its ancestors and successors held by
+  other threads, and writes of other threads into a locked subtree wait
+  until it is unlocked.
+
+Locks of subtrees keep other threads out, they don't make writes run in
+parallel: every single mutation, in a locked subtree or not, takes the
+global write lock, so mutations of the whole tree are made one at a time.
+They are short, and the bookkeeping of the tree (levels, indexes,
+snapshots) is shared by all of its nodes.
+"""
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Iterator, List, Optional, Union
+
+from ttree.common import TraversalMode
+from .node import Node
+from .snapshot import TreeSnapshot
+from .tree import Tree
+
+
+class RWLock:
+    """
+    Reader/writer lock preferring writers: new readers wait while a
+    writer is waiting, so writers are not starved by a stream of readers.
+
+    Both locks are reentrant: a thread holding the read lock takes it again
+    without waiting for writers, and the owner of the write lock may take
+    the read lock as well. The read lock can't be upgraded to the write
+    lock, its holder would wait for itself.
+    """
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        #: numbers of read locks held by threads
+        self._readers = {}
+        self._writer = None
+        self._writes = 0
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._writes += 1
+                return
+
+            if me not in self._readers:
+                # Waiting writers would wait for this thread in turn
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+            self._readers[me] = self._readers.get(me, 0) + 1
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._writes -= 1
+                return
+
+            self._readers[me] -= 1
+            if not self._readers[me]:
+                del self._readers[me]
+                if not self._readers:
+                    self._condition.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._writes += 1
+                return
+
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = me
+            self._writes = 1
+
+    def release_write(self):
+        with self._condition:
+            self._writes -= 1
+            if not self._writes:
+                self._writer = None
+                self._condition.notify_all()
+
+    @contextmanager
+    def read(self):
+        """Hold the read lock in the ``with`` block."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """Hold the write lock in the ``with`` block."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentTree:
+    """
+    Wrapper of a :class:`~ttree.Tree` which may be used by several
+    threads, see :mod:`ttree.concurrency`.
+
+    Every method is atomic. Traversals, e.g. :meth:`expand_tree`, iterate
+    a :meth:`~ttree.Tree.snapshot` taken when they are called, so they are
+    consistent and never break on concurrent changes; they hold the read
+    lock only while the next ``chunk_size`` nodes are taken. Nodes
+    returned by the methods are shared with the tree and must not be
+    changed directly.
+
+    Callbacks like ``filtering`` run under the read lock and must not
+    change the tree.
+    """
+    def __init__(self, tree: Tree = None, chunk_size: int = 256):
+        self._tree = Tree() if tree is None else tree
+        self._lock = RWLock()
+        self._chunk_size = chunk_size
+        #: guards the locked subtrees, taken by every write before the
+        #: write lock, so the structure is stable while it is held
+        self._subtrees = threading.Condition()
+        #: locked subtrees: root ID -> [thread ident, number of locks]
+        self._held = {}
+
+    def __contains__(self, node_id):
+        with self._lock.read():
+            return node_id in self._tree
+
+    def __len__(self):
+        return len(self._tree)
+
+    def __getitem__(self, node_id) -> Node:
+        with self._lock.read():
+            return self._tree[node_id]
+
+    def __iter__(self):
+        """Generate IDs of nodes in pre-order."""
+        return self._iterate(iter)
+
+    @property
+    def root(self):
+        """Return the ID of the root node."""
+        return self._tree.root
+
+    @contextmanager
+    def read(self):
+        """
+        Hold the read lock and return the tree in the ``with`` block.
+
+        Methods of this wrapper may be called in the block, but not the
+        ones changing the tree, they would wait for the block to end.
+        """
+        with self._lock.read():
+            yield self._tree
+
+    @contextmanager
+    def write(self):
+        """
+        Hold the write lock and return the tree in the ``with`` block,
+        waiting for subtrees locked by other threads to be unlocked.
+        """
+        with self._subtrees:
+            self._subtrees.wait_for(self._unlocked)
+            with self._lock.write():
+                yield self._tree
+
+    def _unlocked(self) -> bool:
+        me = threading.get_ident()
+        return all(owner == me for owner, _ in self._held.values())
+
+    def _conflicts(self, node_id, successors: bool) -> bool:
+        """
+        Check if ``node_id`` is in a subtree locked by another thread, or
+        with ``successors=True`` also if such a subtree is in its subtree.
+        """
+        me = threading.get_ident()
+        locked = {root for root, (owner, _) in self._held.items()
+                  if owner != me}
+        tree = self._tree
+        if not locked or node_id not in tree:
+            return False
+
+        current = node_id
+        while current is not None:
+            if current in locked:
+                return True
+            current = None if current == tree.root else tree[current].parent
+
+        return successors and any(
+            root in tree and tree.is_ancestor(node_id, root)
+            for root in locked
+        )
+
+    @contextmanager
+    def lock_subtree(self, node_id):
+        """
+        Lock the subtree of ``node_id`` in the ``with`` block.
+
+        Waits for the subtrees of its ancestors and successors locked by
+        other threads. In the block, other threads can neither lock the
+        subtree nor change it, e.g. add, move, remove or update its nodes,
+        while they still change other parts of the tree, one change at a
+        time.
+        """
+        me = threading.get_ident()
+        with self._subtrees:
+            self._subtrees.wait_for(
+                lambda: not self._conflicts(node_id, True)
+            )
+            lock = self._held.setdefault(node_id, [me, 0])
+            lock[1] += 1
+
+        try:
+            yield self
+        finally:
+            with self._subtrees:
+                lock[1] -= 1
+                if not lock[1]:
+                    del self._held[node_id]
+                self._subtrees.notify_all()
+
+    @contextmanager
+    def _writing(self, node_id=None, successors: bool = False, *other_ids):
+        """
+        Hold the write lock when neither ``node_id`` nor ``other_ids`` are
+        in subtrees locked by other threads, see :meth:`_conflicts`.
+        """
+        with self._subtrees:
+            if self._held:
+                checks = [(i, False) for i in other_ids]
+                if node_id is not None:
+                    checks.append((node_id, successors))
+                self._subtrees.wait_for(lambda: not any(
+                    self._conflicts(i, nested) for i, nested in checks
+                ))
+            with self._lock.write():
+                yield self._tree
+
+    def _iterate(self, function: Callable[..., Iterator], *args, **kwargs):
+        with self._lock.read():
+            snapshot = self._tree.snapshot()
+        return self._chunks(snapshot, function(snapshot, *args, **kwargs))
+
+    def _chunks(self, snapshot, iterator: Iterator):
+        # Reads of a snapshot aren't atomic with the copying of nodes
+        # by writers, so they are made under the read lock too
+        while True:
+            with self._lock.read():
+                chunk = list(islice(iterator, self._chunk_size))
+            if not chunk:
+                return
+            yield from chunk
+
+    def add_node(self, node: Node, parent: Node = None):
+        """Add a new node, see :meth:`ttree.Tree.add_node`."""
+        pid = parent.id if isinstance(parent, Node) else parent
+        with self._writing(pid) as tree:
+            tree.add_node(node, pid)
+
+    def create_node(self, *args, parent=None, node_cls=Node, **kwargs):
+        """Create a new node, see :meth:`ttree.Tree.create_node`."""
+        pid = parent.id if isinstance(parent, Node) else parent
+        with self._writing(pid) as tree:
+            return tree.create_node(*args, parent=pid, node_cls=node_cls,
+                                    **kwargs)
+
+    def move_node(self, source, destination):
+        """Move a node, see :meth:`ttree.Tree.move_node`."""
+        with self._writing(source, True, destination) as tree:
+            tree.move_node(source, destination)
+
+    def remove_node(self, node_id) -> int:
+        """Remove a node, see :meth:`ttree.Tree.remove_node`."""
+        with self._writing(node_id, True) as tree:
+            return tree.remove_node(node_id)
+
+    def remove_subtree(self, node_id) -> Tree:
+        """Remove a subtree, see :meth:`ttree.Tree.remove_subtree`."""
+        with self._writing(node_id, True) as tree:
+            return tree.remove_subtree(node_id)
+
+    def link_past_node(self, node_id):
+        """Remove a node, see :meth:`ttree.Tree.link_past_node`."""
+        with self._writing(node_id, True) as tree:
+            tree.link_past_node(node_id)
+
+    def paste(self, node_id, new_tree: Tree, deepcopy: bool = False):
+        """Paste a tree, see :meth:`ttree.Tree.paste`."""
+        with self._writing(node_id) as tree:
+            tree.paste(node_id, new_tree, deepcopy)
+
+    def update_node(self, node_id, **attrs):
+        """Update a node, see :meth:`ttree.Tree.update_node`."""
+        with self._writing(node_id) as tree:
+            tree.update_node(node_id, **attrs)
+
+    def children(self, node_id) -> List[Node]:
+        with self._lock.read():
+            return self._tree.children(node_id)
+
+    def parent(self, node_id) -> Optional[Node]:
+        with self._lock.read():
+            return self._tree.parent(node_id)
+
+    def siblings(self, node_id) -> List[Node]:
+        with self._lock.read():
+            return self._tree.siblings(node_id)
+
+    def leaves(self, node_id=None) -> List[Node]:
+        with self._lock.read():
+            return self._tree.leaves(node_id)
+
+    def level(self, node_id, filtering=None) -> int:
+        with self._lock.read():
+            return self._tree.level(node_id, filtering)
+
+    def depth(self, node=None) -> int:
+        with self._lock.read():
+            return self._tree.depth(node)
+
+    def size(self, level: int = None) -> int:
+        with self._lock.read():
+            return self._tree.size(level)
+
+    def is_ancestor(self, ancestor, grandchild) -> bool:
+        with self._lock.read():
+            return self._tree.is_ancestor(ancestor, grandchild)
+
+    def to_dict(self, node_id=None, key=None, sort=True, reverse=False,
+                with_data=False):
+        with self._lock.read():
+            return self._tree.to_dict(node_id, key, sort, reverse, with_data)
+
+    def to_json(self, with_data=False, sort=True, reverse=False) -> str:
+        with self._lock.read():
+            return self._tree.to_json(with_data, sort, reverse)
+
+    def select(self, query, node_id=None) -> Iterator[Node]:
+        """
+        Return an iterator of nodes selected by the query, see
+        :meth:`ttree.Tree.select`. Nodes are selected at once.
+        """
+        with self._lock.read():
+            return iter(list(self._tree.select(query, node_id)))
+
+    def expand_tree(self, node_id=None,
+                    mode: Union[TraversalMode, str] = TraversalMode.DEPTH,
+                    filtering: Callable[[Node], bool] = None,
+                    key=None, reverse: bool = False) -> Iterator:
+        """
+        Traverse the snapshot of the tree taken by the call, see
+        :meth:`ttree.Tree.expand_tree`.
+        """
+        return self._iterate(TreeSnapshot.expand_tree, node_id, mode,
+                             filtering, key, reverse)
+
+    def rsearch(self, node_id, filtering=None) -> Iterator:
+        """
+        Walk from ``node_id`` to the root in the snapshot of the tree taken
+        by the call, see :meth:`ttree.Tree.rsearch`.
+        """
+        return self._iterate(TreeSnapshot.rsearch, node_id, filtering)
@@ -0,0 +1,134 @@
+"""
+Structural difference of two versions of a :class:`~ttree.Tree`.
+
+:func:`diff` matches nodes of two trees by IDs and returns an edit script,
+a list of :class:`Edit`, which turns the old tree into the new one with
+:meth:`ttree.Tree.apply_patch`. Subtrees are compared by their Merkle
+hashes with IDs first, see :mod:`ttree.merkle`, so identical regions are
+skipped without being walked, and the whole diff takes O(n). Tags and
+data are the same if they are equal and have equal reprs, so e.g. ``1``
+and ``True`` differ.
+
+Edits go in an order in which they can be replayed one by one: nodes are
+added and moved top-down in pre-order of the new tree, and then removed.
+Children are moved to the end of their parents, so children of a node
+are moved from the first one which is out of its old order.
+"""
+from collections import OrderedDict
+from typing import Dict, Hashable, List, NamedTuple, Optional
+
+from ttree.common import EventKind
+from .merkle import fill_hashes
+
+
+class Edit(NamedTuple):
+    """
+    One edit of a script returned by :func:`diff`.
+
+    ``kind`` is :attr:`~ttree.common.EventKind.ADDED`,
+    :attr:`~ttree.common.EventKind.MOVED`,
+    :attr:`~ttree.common.EventKind.UPDATED` or
+    :attr:`~ttree.common.EventKind.REMOVED`. ``parent`` is the new parent
+    of added and moved nodes and the old parent of removed ones. ``tag``
+    and ``data`` are the new values of added and updated nodes.
+    """
+    kind: EventKind
+    node_id: Hashable
+    parent: Optional[Hashable] = None
+    tag: object = None
+    data: object = None
+
+
+def _differ(old, new) -> bool:
+    return old != new or repr(old) != repr(new)
+
+
+def subtree_hashes(tree) -> Dict[Hashable, bytes]:
+    """
+    Return hashes of subtrees of all nodes of the tree.
+
+    The hash of a node covers the reprs of its ID, tag and data and hashes
+    of its children in order, see :func:`ttree.merkle.node_hash`, so equal
+    hashes of a node in two trees mean equal subtrees.
+    """
+    hashes = {}
+    if tree.root is not None:
+        fill_hashes(tree, tree.root, hashes, ids=True)
+    return hashes
+
+
+def diff(old, new) -> List[Edit]:
+    """
+    Return the edit script turning the ``old`` tree into the ``new`` one,
+    see :mod:`ttree.delta`.
+
+    If the roots differ, the old tree is removed and the new one is added
+    as a whole.
+    """
+    get = OrderedDict.__getitem__
+    contains = OrderedDict.__contains__
+
+    if new.root is None or old.root != new.root:
+        edits = [] if old.root is None \
+            else [Edit(EventKind.REMOVED, old.root)]
+        if new.root is not None:
+            for node_id in new.expand_tree(key=lambda node: 0):
+                node = get(new, node_id)
+                edits.append(Edit(EventKind.ADDED, node_id, node.parent,
+                                  node.tag, node.data))
+        return edits
+
+    old_hashes, new_hashes = subtree_hashes(old), subtree_hashes(new)
+    edits = []
+    root = get(new, new.root)
+    old_root = get(old, new.root)
+    if _differ(old_root.tag, root.tag) or _differ(old_root.data, root.data):
+        edits.append(Edit(EventKind.UPDATED, new.root, None, root.tag,
+                          root.data))
+
+    stack = [new.root]
+    while stack:
+        node_id = stack.pop()
+        if old_hashes.get(node_id) == new_hashes[node_id]:
+            continue
+
+        children = get(new, node_id)._children
+        if not children:
+            continue
+
+        old_children = get(old, node_id)._children \
+            if contains(old, node_id) else None
+        positions = {child: position for position, child in
+                     enumerate(old_children or ())}
+        # Children keep their places up to the first one out of old order
+        kept, last = 0, -1
+        for child in children:
+            position = positions.get(child)
+            if position is None or position < last:
+                break
+            last = position
+            kept += 1
+
+        for index, child in enumerate(children):
+            node = get(new, child)
+            if not contains(old, child):
+                edits.append(Edit(EventKind.ADDED, child, node_id,
+                                  node.tag, node.data))
+                continue
+
+            if index >= kept:
+                edits.append(Edit(EventKind.MOVED, child, node_id))
+            old_node = get(old, child)
+            if _differ(old_node.tag, node.tag) or \
+                    _differ(old_node.data, node.data):
+                edits.append(Edit(EventKind.UPDATED, child, node_id,
+                                  node.tag, node.data))
+
+        stack.extend(reversed(children))
+
+    for node_id, node in old.items():
+        if not contains(new, node_id):
+            parent = node._parent
+            if parent is None or contains(new, parent):
+                edits.append(Edit(EventKind.REMOVED, node_id, parent))
+    return edits
@@ -0,0 +1,21 @@
+from typing import Hashable, NamedTuple, Optional, Tuple
+
+from ttree.common import EventKind
+
+
+class TreeEvent(NamedTuple):
+    """
+    Change of a node of a :class:`~ttree.Tree` sent to subscribers of
+    :meth:`ttree.Tree.subscribe`.
+
+    ``parent`` is the parent of the node after the change, or before it
+    for :attr:`~ttree.common.EventKind.REMOVED` events. ``old_parent`` is
+    set for :attr:`~ttree.common.EventKind.MOVED` events only, and
+    ``attributes`` holds the names of attributes changed by
+    :attr:`~ttree.common.EventKind.UPDATED` events.
+    """
+    kind: EventKind
+    node_id: Hashable
+    parent: Optional[Hashable] = None
+    old_parent: Optional[Hashable] = None
+    attributes: Tuple[str, ...] = ()
@@ -36,3 +36,13 @@ class LoopError(Exception):
     while A is B's ancestor.
     """
     pass
+
+
+class FrozenTree(Exception):
+    """Exception raises if trying to change a frozen tree."""
+    pass
+
+
+class InvalidQuery(Exception):
+    """Exception raises if a query of Tree.select() can't be parsed."""
+    pass
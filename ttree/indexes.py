@@ -0,0 +1,173 @@
+import math
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from typing import Callable, Hashable, List, Union
+
+from .node import Node
+
+#: exceptions of key functions which leave a node out of an index
+_SKIPPED = (AttributeError, KeyError, IndexError, TypeError)
+
+
+def attribute_getter(name: str) -> Callable[[Node], Hashable]:
+    """
+    Return a function looking up the dotted ``name`` in a node, parts of
+    the name are attributes or keys of mappings, e.g. of dict data.
+    """
+    names = name.split('.')
+
+    def getter(node):
+        value = node
+        for part in names:
+            if isinstance(value, Mapping):
+                value = value[part]
+            else:
+                value = getattr(value, part)
+        return value
+    return getter
+
+
+class Index:
+    """
+    Base of secondary indexes of a tree created with
+    :meth:`ttree.Tree.create_index`.
+
+    ``key`` is a callable taking a :class:`Node` or a name of a node
+    attribute, dotted names like ``'data.rank'`` are allowed and look up
+    keys of dict data too. Nodes for
+    which the key raises :class:`AttributeError`, :class:`KeyError`,
+    :class:`IndexError` or :class:`TypeError` are not indexed, e.g. nodes
+    without data, as well as nodes whose values are unhashable or can't
+    be compared with the indexed values of a sorted index.
+
+    The value of every indexed node is remembered, so a node is removed
+    from the index correctly even if its data was changed in place.
+    """
+    def __init__(self, key: Union[str, Callable[[Node], Hashable]]):
+        #: dotted name of the indexed attribute, None for callable keys
+        self.attribute = key if isinstance(key, str) else None
+        #: function computing the indexed value of a node
+        self.key = attribute_getter(key) if isinstance(key, str) else key
+        self._values = {}
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, value):
+        return bool(self.get(value))
+
+    def get(self, value) -> List[Hashable]:
+        """Return IDs of nodes with the ``value`` in insertion order."""
+        raise NotImplementedError
+
+    def _insert(self, node_id, value):
+        raise NotImplementedError
+
+    def _delete(self, node_id, value):
+        raise NotImplementedError
+
+    def add(self, node: Node):
+        """Index the ``node``, its previous value is replaced."""
+        node_id = node.id
+        self.remove(node_id)
+        try:
+            value = self.key(node)
+            self._insert(node_id, value)
+        except _SKIPPED:
+            return
+
+        self._values[node_id] = value
+
+    def remove(self, node_id):
+        """Remove the node from the index if it is indexed."""
+        if node_id in self._values:
+            self._delete(node_id, self._values.pop(node_id))
+
+    def value(self, node_id):
+        """Return the indexed value of the node."""
+        return self._values[node_id]
+
+
+class HashIndex(Index):
+    """Index of node IDs by values for equality lookups in O(1)."""
+    def __init__(self, key):
+        super().__init__(key)
+        #: insertion-ordered dicts of node IDs by values
+        self._ids = {}
+
+    def get(self, value) -> List[Hashable]:
+        return list(self._ids.get(value, ()))
+
+    def _insert(self, node_id, value):
+        ids = self._ids.get(value)
+        if ids is None:
+            self._ids[value] = {node_id: None}
+        else:
+            ids[node_id] = None
+
+    def _delete(self, node_id, value):
+        ids = self._ids[value]
+        del ids[node_id]
+        if not ids:
+            del self._ids[value]
+
+
+class SortedIndex(Index):
+    """
+    Index of node IDs ordered by values for equality lookups and range
+    queries in O(log n) plus the size of the result.
+
+    Nodes with equal values keep the insertion order.
+    """
+    def __init__(self, key):
+        super().__init__(key)
+        #: sorted pairs of values and insertion stamps, which order equal
+        #: values, and node IDs at the same positions
+        self._keys = []
+        self._ids = []
+        self._stamps = {}
+        self._clock = 0
+
+    def get(self, value) -> List[Hashable]:
+        return self._ids[bisect_left(self._keys, (value,)):
+                         bisect_right(self._keys, (value, math.inf))]
+
+    def range(self, start=None, stop=None, inclusive: bool = False):
+        """
+        Return IDs of nodes with values from ``start`` up to ``stop`` in
+        the order of values.
+
+        ``start`` is included, ``stop`` only if ``inclusive`` is set, and
+        None means no bound.
+        """
+        keys = self._keys
+        first = 0 if start is None else bisect_left(keys, (start,))
+        if stop is None:
+            last = len(keys)
+        elif inclusive:
+            last = bisect_right(keys, (stop, math.inf))
+        else:
+            last = bisect_left(keys, (stop,))
+        return self._ids[first:last]
+
+    def min(self):
+        """Return the smallest indexed value."""
+        return self._keys[0][0]
+
+    def max(self):
+        """Return the largest indexed value."""
+        return self._keys[-1][0]
+
+    def _insert(self, node_id, value):
+        key = (value, self._clock)
+        # Raises TypeError before any change if values can't be compared
+        position = bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._ids.insert(position, node_id)
+        self._stamps[node_id] = self._clock
+        self._clock += 1
+
+    def _delete(self, node_id, value):
+        position = bisect_left(self._keys, (value, self._stamps.pop(node_id)))
+        del self._keys[position]
+        del self._ids[position]
@@ -0,0 +1,70 @@
+from typing import Hashable, List, Tuple
+
+from ttree.exceptions import NodeNotFound
+
+
+class IntervalIndex:
+    """
+    Nested intervals (entry/exit times) index of a tree.
+
+    Nodes are numbered in pre-order of a single depth-first walk, children
+    being visited in insertion order. Every node gets an interval
+    ``[start, stop)`` of positions which is occupied by the node and all
+    its successors, so ancestor checks and subtree sizes are O(1) and the
+    nodes of any subtree are a contiguous slice of :attr:`order`.
+
+    The index is a snapshot: it is not updated when the tree is changed.
+    Use :attr:`ttree.Tree.intervals` to get an up-to-date one.
+    """
+    def __init__(self, tree):
+        #: node ids in pre-order
+        self.order = []
+        self._start = {}
+        self._stop = {}
+
+        if tree.root is None:
+            return
+
+        order, start, stop = self.order, self._start, self._stop
+        stack = [(tree.root, False)]
+        while stack:
+            node_id, visited = stack.pop()
+            if visited:
+                stop[node_id] = len(order)
+                continue
+
+            start[node_id] = len(order)
+            order.append(node_id)
+            stack.append((node_id, True))
+            stack.extend(
+                (child, False) for child in reversed(tree[node_id].children)
+            )
+
+    def __len__(self):
+        return len(self.order)
+
+    def __contains__(self, node_id):
+        return node_id in self._start
+
+    def range(self, node_id) -> Tuple[int, int]:
+        """Return ``(start, stop)`` positions of the subtree in order."""
+        try:
+            return self._start[node_id], self._stop[node_id]
+        except KeyError:
+            raise NodeNotFound(f"Node '{node_id}' is not in the tree")
+
+    def is_ancestor(self, ancestor, grandchild) -> bool:
+        """Check if ``ancestor`` is a strict ancestor of ``grandchild``."""
+        start, stop = self.range(ancestor)
+        position, _ = self.range(grandchild)
+        return start < position < stop
+
+    def subtree_size(self, node_id) -> int:
+        """Return the number of nodes in the subtree of ``node_id``."""
+        start, stop = self.range(node_id)
+        return stop - start
+
+    def subtree(self, node_id) -> List[Hashable]:
+        """Return ids of the subtree of ``node_id`` in pre-order."""
+        start, stop = self.range(node_id)
+        return self.order[start:stop]
@@ -0,0 +1,91 @@
+from array import array
+from typing import Hashable, Iterable
+
+from ttree.exceptions import NodeNotFound
+
+
+class LCAIndex:
+    """
+    Lowest common ancestor index of a tree based on binary lifting.
+
+    Nodes are addressed by their pre-order positions taken from
+    :class:`~ttree.intervals.IntervalIndex`. For every node ancestors at
+    distances of 1, 2, 4, ... up to the tree depth are stored in
+    :class:`array.array` tables, which costs O(n log depth) to build.
+    A query takes O(log depth) steps, each of them checks ancestry with
+    the intervals in O(1).
+
+    The index is a snapshot: it is not updated when the tree is changed.
+    """
+    def __init__(self, tree):
+        self._intervals = intervals = tree.intervals
+        self._levels = {}
+
+        size = len(intervals)
+        parents = array('l', bytes(array('l').itemsize * size))
+        #: end of the subtree interval for every position
+        self._stops = array('l', parents)
+        depth = 0
+        for position, node_id in enumerate(intervals.order):
+            level = tree.level(node_id)
+            self._levels[node_id] = level
+            depth = max(depth, level)
+            self._stops[position] = intervals.range(node_id)[1]
+            if position:
+                parents[position] = intervals.range(tree[node_id].parent)[0]
+
+        #: ancestors at distance 2^k for every k, the root refers to itself
+        self._jumps = [parents]
+        step = 1
+        while step * 2 <= depth:
+            previous = self._jumps[-1]
+            self._jumps.append(array('l', (previous[p] for p in previous)))
+            step *= 2
+
+    def _position(self, node_id) -> int:
+        return self._intervals.range(node_id)[0]
+
+    def lca(self, a, b) -> Hashable:
+        """Return the lowest common ancestor of ``a`` and ``b``."""
+        stops = self._stops
+        current = self._position(a)
+        position = self._position(b)
+        if current <= position < stops[current]:
+            return a
+
+        for jumps in reversed(self._jumps):
+            ancestor = jumps[current]
+            if not ancestor <= position < stops[ancestor]:
+                current = ancestor
+
+        return self._intervals.order[self._jumps[0][current]]
+
+    def lca_many(self, node_ids: Iterable[Hashable]) -> Hashable:
+        """
+        Return the lowest common ancestor of all ``node_ids``.
+
+        It is the LCA of the first and the last of the nodes in pre-order,
+        so only one pairwise query is needed.
+        """
+        first = last = None
+        for node_id in node_ids:
+            position = self._position(node_id)
+            if first is None or position < first:
+                first = position
+            if last is None or position > last:
+                last = position
+
+        if first is None:
+            raise ValueError('At least one node is required.')
+
+        order = self._intervals.order
+        return self.lca(order[first], order[last])
+
+    def distance(self, a, b) -> int:
+        """Return the number of edges on the path between ``a`` and ``b``."""
+        ancestor = self.lca(a, b)
+        levels = self._levels
+        try:
+            return levels[a] + levels[b] - 2 * levels[ancestor]
+        except KeyError as e:
+            raise NodeNotFound(f"Node '{e.args[0]}' is not in the tree")
@@ -0,0 +1,72 @@
+"""
+Merkle hashes of subtrees used by :meth:`ttree.Tree.subtree_hash`.
+
+The hash of a node is a BLAKE2b digest of its tag, a digest of its data
+and hashes of its children in order, so equal hashes mean equal tags,
+data and shapes of subtrees, whatever the IDs of their nodes are. Hashes
+don't depend on the process, e.g. on ``PYTHONHASHSEED``, as long as the
+reprs of tags and data don't, so they may be compared between replicas.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+#: size of node hashes in bytes
+DIGEST_SIZE = 16
+
+
+def default_digest(data) -> bytes:
+    """Return bytes identifying the data of a node: its repr."""
+    return b'' if data is None else repr(data).encode('utf-8')
+
+
+def _pack(value: bytes) -> bytes:
+    return len(value).to_bytes(8, 'little') + value
+
+
+def node_hash(node, hashes: Dict[Hashable, bytes],
+              digest: Callable[[object], bytes] = default_digest,
+              ids: bool = False) -> bytes:
+    """
+    Return the hash of the node whose children are in ``hashes``, with
+    ``ids`` set the repr of its ID is hashed too.
+    """
+    result = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    if ids:
+        result.update(_pack(repr(node.id).encode('utf-8')))
+    result.update(_pack(repr(node.tag).encode('utf-8')))
+    result.update(_pack(digest(node.data)))
+    children = node._children
+    if children:
+        result.update(len(children).to_bytes(8, 'little'))
+        for child in children:
+            result.update(hashes[child])
+    return result.digest()
+
+
+def fill_hashes(tree, node_id, hashes: Dict[Hashable, bytes],
+                digest: Callable[[object], bytes] = default_digest,
+                ids: bool = False) -> bytes:
+    """
+    Compute hashes of the subtree of ``node_id`` missing in ``hashes``,
+    add them to ``hashes`` and return the hash of ``node_id``, see
+    :func:`node_hash`.
+
+    Subtrees whose roots are in ``hashes`` already are not walked.
+    """
+    get = OrderedDict.__getitem__
+    stack = [(node_id, False)]
+    while stack:
+        current, ready = stack.pop()
+        node = get(tree, current)
+        if ready:
+            hashes[current] = node_hash(node, hashes, digest, ids)
+            continue
+
+        if current in hashes:
+            continue
+        stack.append((current, True))
+        if node._children:
+            stack.extend((child, False) for child in node._children
+                         if child not in hashes)
+    return hashes[node_id]
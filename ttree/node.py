@@ -1,7 +1,48 @@
 #!/usr/bin/env python
+import itertools
+import os
 import uuid
 
-from collections import Sequence, MutableMapping, Set
+from collections.abc import Sequence, MutableMapping, Set
+
+
+def _seed_ids(node: int = None, clock_seq: int = None):
+    """Start IDs of :func:`generate_id` after a new :func:`uuid.uuid1`."""
+    global _ID_TIMESTAMPS, _ID_TAIL
+    base = uuid.uuid1(node, clock_seq)
+    _ID_TIMESTAMPS = itertools.count(base.time + 1)
+    _ID_TAIL = base.int & 0xffffffffffffffff
+
+
+def _reseed_ids_after_fork():
+    # A forked child would repeat the IDs of its parent, so it takes
+    # a random clock sequence and a random multicast node address
+    bits = int.from_bytes(os.urandom(8), 'big')
+    _seed_ids(node=bits & 0xffffffffffff | 0x010000000000,
+              clock_seq=bits >> 48 & 0x3fff)
+
+
+_seed_ids()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reseed_ids_after_fork)
+
+
+def generate_id() -> uuid.UUID:
+    """
+    Generate a unique node ID.
+
+    Result is a version 1 UUID sharing clock sequence and hardware address
+    with one :func:`uuid.uuid1` call made at import time, and taking
+    consecutive timestamps after it. It is several times cheaper than
+    calling :func:`uuid.uuid1` for every node. Forked processes start
+    again with a random clock sequence and hardware address.
+    """
+    timestamp = next(_ID_TIMESTAMPS)
+    time_low = timestamp & 0xffffffff
+    time_mid = timestamp >> 32 & 0xffff
+    time_hi_version = 0x1000 | timestamp >> 48 & 0x0fff
+    high = time_low << 32 | time_mid << 16 | time_hi_version
+    return uuid.UUID(int=high << 64 | _ID_TAIL)
 
 
 class Node:
@@ -13,25 +54,33 @@ class Node:
 
     Nodes are elementary objects which are stored in a dictionary
     of a Tree. Use `data` attribute to store node-specific data.
+
+    Nodes have no instance ``__dict__``. The ID is generated on the first
+    access if it was not given, and the children list is only allocated
+    when the first child is added.
     """
+    __slots__ = ('_id', '_tag', 'expanded', '_parent', '_children', '_tree',
+                 'data')
+
     def __init__(self, tag=None, id=None, expanded=True, data=None, tree=None):
         """Create a new Node object to be placed inside a Tree object"""
 
-        #: if given as a parameter, must be unique
-        self._id = None
-        self._set_id(id)
+        #: if given as a parameter, must be unique,
+        #: if None, it will be generated on demand.
+        self._id = id
 
         #: None or something else
-        #: if None, self._id will be set to the id's value.
-        self._tag = self._id if tag is None else tag
+        #: if None, the id's value is used as tag.
+        self._tag = tag
 
         #: boolean
         self.expanded = expanded
 
         #: id of the parent's node
         self._parent = None
-        #: id(s) of the children node(s)
-        self._children = list()
+        #: id(s) of the children node(s) as keys of insertion-ordered dict,
+        #: None until the first child is added
+        self._children = None
 
         self._tree = tree
         #: User payload associated with this node.
@@ -46,9 +95,31 @@ class Node:
     def __lt__(self, other):
         return self.tag < other.tag
 
+    def __getstate__(self):
+        """
+        Return the node state without the back-reference to the tree.
+
+        The tree is not pickled or deep-copied along with its node, copies
+        are detached from any tree.
+        """
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if name in ('_tree', '__dict__', '__weakref__') \
+                        or name in state or not hasattr(self, name):
+                    continue
+                state[name] = getattr(self, name)
+        state.update(getattr(self, '__dict__', {}))
+        return state
+
+    def __setstate__(self, state):
+        self._tree = None
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def _set_id(self, node_id):
         """Initialize self._set_id"""
-        self._id = uuid.uuid1() if node_id is None else node_id
+        self._id = generate_id() if node_id is None else node_id
 
     @property
     def id(self):
@@ -59,6 +130,8 @@ class Node:
         can be accessed and modified with ``.`` and ``=`` operator
         respectively.
         """
+        if self._id is None:
+            self._id = generate_id()
         return self._id
 
     @id.setter
@@ -77,6 +150,8 @@ class Node:
         The readable node name for human. This attribute can be accessed and
         modified with ``.`` and ``=`` operator respectively.
         """
+        if self._tag is None:
+            self._tag = self.id
         return self._tag
 
     @tag.setter
@@ -104,22 +179,27 @@ class Node:
         """
         Return the value of `_children`.
 
-        With a getting operator, a list of IDs of node's children is obtained.
+        With a getting operator, a new list of IDs of node's children in
+        insertion order is obtained.
         With a setting operator, the value can be list, set, or dict.
-        For list or set, it is converted to a list type by the package;
-        for dict, the keys are treated as the node IDs.
+        For dict, the keys are treated as the node IDs.
+
+        Children are kept as keys of a dict, so adding, removing and
+        membership checks are O(1).
         """
-        return self._children
+        if self._children is None:
+            return []
+        return list(self._children)
 
     @children.setter
     def children(self, value):
         """Set the value of `_children`."""
         if value is None:
-            self._children = list()
+            self._children = None
         elif isinstance(value, (Sequence, Set)):
-            self._children = list(value)
+            self._children = dict.fromkeys(value)
         elif isinstance(value, MutableMapping):
-            self._children = list(value.keys())
+            self._children = dict.fromkeys(value.keys())
         else:
             raise ValueError('Sequence, Set or MutableMapping '
                              'are allowed values for children only.')
@@ -131,7 +211,7 @@ class Node:
 
         Return False if the ``children`` is empty or None.
         """
-        return not self.children
+        return not self._children
 
     @property
     def is_root(self):
@@ -146,9 +226,16 @@ class Node:
     def add_child(self, node_id):
         """Add child (indicated by the ``node_id`` parameter) of a node."""
         if node_id is not None:
-            self._children.append(node_id)
+            if self._children is None:
+                self._children = {node_id: None}
+            else:
+                self._children[node_id] = None
+
+    def has_child(self, node_id) -> bool:
+        """Check if ``node_id`` is a child of a node."""
+        return self._children is not None and node_id in self._children
 
     def remove_child(self, node_id):
         """Remove child (indicated by the ``node_id`` parameter) of a node."""
-        if node_id is not None and node_id in self._children:
-            self._children.remove(node_id)
+        if node_id is not None and self._children:
+            self._children.pop(node_id, None)
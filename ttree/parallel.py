@@ -0,0 +1,160 @@
+"""
+Map-reduce over nodes of a :class:`~ttree.Tree` in a process pool.
+
+The tree is cut into disjoint parts of balanced size, each part being a
+subtree or several subtrees of siblings, without the parts cut off below
+them. Every part is shipped to a
+worker as three flat lists of IDs, tags and data payloads, no
+:class:`~ttree.Node` objects and no links are pickled. Workers map and
+reduce the nodes of their parts, then results of parts are combined
+bottom-up along the tree of parts.
+
+The parent process still walks the tree and pickles the payloads in
+O(n), so a speedup is only gained when ``map_fn`` is considerably more
+expensive than pickling the data of a node.
+"""
+import os
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, List, Tuple
+
+from ttree.exceptions import NodeNotFound
+from .node import Node
+
+#: number of parts per worker, more parts balance the load better
+PARTS_PER_WORKER = 4
+
+
+def partition(tree, node_id, parts: int) -> Tuple[List[list], List[int]]:
+    """
+    Cut the subtree of ``node_id`` into about ``parts`` parts.
+
+    Return lists of node IDs of the parts in pre-order and the index of
+    the parent part of every part, -1 for the part of ``node_id``. Parts
+    go after their parent parts.
+
+    Sizes of nodes which are not cut off yet are summed up bottom-up.
+    Subtrees of children of a node are packed in order into groups of at
+    least ``n / parts`` such nodes, every group starts a new part, and the
+    node starts one too when the rest of its subtree is as large. So wide
+    trees, e.g. a root with many leaves, are cut as well, and every part
+    but the one of ``node_id`` has from ``n / parts`` up to twice as many
+    nodes.
+    """
+    get = OrderedDict.__getitem__
+    order = []
+    stack = [node_id]
+    while stack:
+        current = stack.pop()
+        order.append(current)
+        children = get(tree, current)._children
+        if children:
+            stack.extend(reversed(children))
+
+    target = max(len(order) // max(parts, 1), 1)
+    remaining = {}
+    #: roots of parts -> the first root of their part
+    cuts = {node_id: node_id}
+    for current in reversed(order):
+        size = 1
+        children = get(tree, current)._children
+        if children:
+            group, group_size = [], 0
+            for child in children:
+                child_size = remaining.pop(child)
+                if not child_size:
+                    continue
+                group.append(child)
+                group_size += child_size
+                if group_size >= target:
+                    cuts.update(dict.fromkeys(group, group[0]))
+                    group, group_size = [], 0
+            # The rest of the children stays in the part of the node
+            size += group_size
+        if size >= target:
+            cuts[current] = current
+            size = 0
+        remaining[current] = size
+
+    node_parts, parents = [], []
+    part_of, part_of_cut = {}, {}
+    for current in order:
+        first = cuts.get(current)
+        if first is None:
+            part = part_of[current] = part_of[get(tree, current)._parent]
+            node_parts[part].append(current)
+            continue
+
+        part = part_of_cut.get(first)
+        if part is None:
+            part = part_of_cut[first] = len(node_parts)
+            parents.append(-1 if current == node_id
+                           else part_of[get(tree, current)._parent])
+            node_parts.append([])
+        part_of[current] = part
+        node_parts[part].append(current)
+    return node_parts, parents
+
+
+def _map_part(map_fn: Callable, reduce_fn: Callable, ids: list, tags: list,
+              data: list):
+    """Map and reduce nodes of one part in a worker."""
+    result = map_fn(Node(tags[0], ids[0], data=data[0]))
+    for node_id, tag, payload in zip(ids[1:], tags[1:], data[1:]):
+        result = reduce_fn(result, map_fn(Node(tag, node_id, data=payload)))
+    return result
+
+
+def map_reduce(tree, map_fn: Callable[[Node], object],
+               reduce_fn: Callable[[object, object], object], node_id=None,
+               workers: int = None, executor: Executor = None):
+    """
+    Return ``reduce_fn`` folded over ``map_fn`` of every node of the
+    subtree of ``node_id``, the root by default, see :mod:`ttree.parallel`.
+
+    ``reduce_fn`` must be associative and commutative: nodes are reduced
+    in pre-order within a part, but parts are combined bottom-up. Both
+    functions must be picklable, e.g. functions of a module, and get
+    nodes with IDs, tags and data only.
+
+    Parts are mapped by ``executor`` or by a new
+    :class:`~concurrent.futures.ProcessPoolExecutor` of ``workers``
+    processes. ``workers`` also sets the number of parts and defaults to
+    the number of CPUs, so pass the size of the pool along with an
+    ``executor`` of another size. With ``workers=1`` and no ``executor``
+    parts are mapped in this process.
+    """
+    node_id = tree.root if node_id is None else node_id
+    if node_id not in tree:
+        raise NodeNotFound(f"Node '{node_id}' is not in the tree")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    node_parts, parents = partition(tree, node_id,
+                                    workers * PARTS_PER_WORKER)
+    get = OrderedDict.__getitem__
+    payloads = []
+    for ids in node_parts:
+        nodes = [get(tree, i) for i in ids]
+        payloads.append((ids, [node._tag for node in nodes],
+                         [node.data for node in nodes]))
+
+    if workers == 1 and executor is None:
+        results = [_map_part(map_fn, reduce_fn, *payload)
+                   for payload in payloads]
+    else:
+        pool = executor or ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [pool.submit(_map_part, map_fn, reduce_fn, *payload)
+                       for payload in payloads]
+            results = [future.result() for future in futures]
+        finally:
+            if executor is None:
+                pool.shutdown()
+
+    # Parts go after their parents, so children are combined first
+    for part in range(len(results) - 1, 0, -1):
+        parent = parents[part]
+        results[parent] = reduce_fn(results[parent], results[part])
+    return results[0]
@@ -0,0 +1,391 @@
+"""
+Selector language for searching nodes of a tree.
+
+A query is a sequence of steps, every step selects nodes relative to the
+nodes selected by the previous one::
+
+    /Harry/Jane           children tagged 'Jane' of the root tagged 'Harry'
+    //Diane               nodes tagged 'Diane' anywhere
+    /*//{2,3}*            nodes 2 or 3 levels below the root
+    //genus[rank='species']/*
+                          children of nodes tagged 'genus' whose data has
+                          'species' as rank
+
+Every step consists of:
+
+* an axis: ``/`` for children, ``//`` for descendants at any depth,
+  optionally followed by depth bounds ``{min,max}``, ``{min,}``, ``{,max}``
+  or ``{depth}`` counted from the previous nodes;
+* a test: ``*`` for any node, or a tag, quoted if it contains special
+  characters;
+* any number of predicates ``[attribute]`` or
+  ``[attribute op literal]``, where ``op`` is one of ``=``, ``!=``, ``<``,
+  ``<=``, ``>``, ``>=`` and ``literal`` is a quoted string, a number,
+  ``true``, ``false`` or ``null``. The ``tag`` and ``id`` attributes belong
+  to the node, other attributes are looked up in its data, as attributes
+  or dict keys, dotted names go deeper. ``data.`` prefix is optional.
+
+A query starts from the root, i.e. the first ``/Harry`` matches the root
+itself, or from the given node, whose children the first ``/`` step
+selects.
+
+Queries are compiled once with :func:`compile_query` and run with
+:meth:`Query.select`. Every step is planned against the tree: if a descendant
+step has an equality or a range predicate, or a tag test, on an attribute
+with a secondary index of the same attribute (see
+:meth:`ttree.Tree.create_index`), e.g. ``'data.rank'`` for ``[rank=1]``,
+candidates are taken from the index and checked to be within the depth
+bounds of previous nodes by walking their parents. Otherwise the
+subtrees of previous nodes are traversed down to the depth bound only,
+and subtrees which were already traversed are skipped.
+"""
+import functools
+import math
+import operator
+import re
+from collections.abc import Mapping
+from typing import Hashable, Iterator, List, Optional, Tuple
+
+from ttree.exceptions import InvalidQuery, NodeNotFound
+from .indexes import SortedIndex
+from .node import Node
+
+#: parent of the root in plans, the context of absolute queries
+_TOP = object()
+
+_OPERATORS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+_AXIS = re.compile(r'\s*(//|/)(?:\{\s*(\d*)\s*(,)?\s*(\d*)\s*\})?\s*')
+_TEST = re.compile(r"""\*|'([^']*)'|"([^"]*)"|([^/\[\]{}'"]+)""")
+_PREDICATE = re.compile(r"""
+    \[\s*
+    (?P<attribute>[A-Za-z_][\w.]*)
+    (?:\s*(?P<op>!=|<=|>=|=|<|>)\s*
+       (?:'(?P<single>[^']*)'|"(?P<double>[^"]*)"|(?P<bare>[^\]\s]+))
+    )?
+    \s*\]\s*
+""", re.VERBOSE)
+_NUMBER = re.compile(r'-?\d+(\.\d*)?([eE][-+]?\d+)?$')
+_CONSTANTS = {'true': True, 'false': False, 'null': None}
+
+_MISSING = object()
+
+
+def _resolve(node: Node, attribute: str):
+    """Return the value of the attribute or _MISSING."""
+    if attribute in ('tag', 'id'):
+        return getattr(node, attribute)
+
+    names = attribute.split('.')
+    if names[0] == 'data':
+        names = names[1:]
+
+    value = node.data
+    for name in names:
+        try:
+            if isinstance(value, Mapping):
+                value = value[name]
+            else:
+                value = getattr(value, name)
+        except (AttributeError, KeyError):
+            return _MISSING
+    return value
+
+
+class Predicate:
+    """Condition ``[attribute op value]`` of a step."""
+    def __init__(self, attribute: str, op: Optional[str] = None,
+                 value=None):
+        self.attribute = attribute
+        self.op = op
+        self.value = value
+
+    def __repr__(self):
+        if self.op is None:
+            return f'[{self.attribute}]'
+        return f'[{self.attribute}{self.op}{self.value!r}]'
+
+    def __call__(self, node: Node) -> bool:
+        value = _resolve(node, self.attribute)
+        if value is _MISSING:
+            return False
+        if self.op is None:
+            return True
+        try:
+            return _OPERATORS[self.op](value, self.value)
+        except TypeError:
+            return False
+
+    def path(self) -> str:
+        """
+        Return the dotted name of the attribute from the node, the key of
+        indexes which may answer the predicate.
+        """
+        if self.attribute in ('tag', 'id', 'data') or \
+                self.attribute.startswith('data.'):
+            return self.attribute
+        return f'data.{self.attribute}'
+
+
+class Step:
+    """One step of a query: axis with depth bounds, test and predicates."""
+    def __init__(self, min_depth: int = 1, max_depth: Optional[int] = 1,
+                 tag=None, predicates: List[Predicate] = None):
+        #: bounds of distances from the previous nodes, None is unbounded
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        #: tag to match, None for any
+        self.tag = tag
+        self.predicates = predicates or []
+
+    def __repr__(self):
+        if (self.min_depth, self.max_depth) == (1, 1):
+            axis = '/'
+        elif (self.min_depth, self.max_depth) == (1, None):
+            axis = '//'
+        else:
+            axis = (f'//{{{self.min_depth},'
+                    f'{"" if self.max_depth is None else self.max_depth}}}')
+        test = '*' if self.tag is None else repr(self.tag)
+        return axis + test + ''.join(map(repr, self.predicates))
+
+    def matches(self, node: Node) -> bool:
+        if self.tag is not None and node.tag != self.tag:
+            return False
+        return all(predicate(node) for predicate in self.predicates)
+
+    def plan(self, tree) -> Tuple[str, Optional[Tuple]]:
+        """
+        Choose how to find candidates of the step in the tree.
+
+        Return a description and ``(index, method, args)`` for the index
+        lookup or None for the traversal. Children are always scanned,
+        there are usually fewer of them than candidates in an index.
+        """
+        if self.max_depth == 1:
+            return 'children scan', None
+
+        indexes = tree._indexes
+        for predicate in self.predicates:
+            if predicate.op not in ('=', '<', '<=', '>', '>='):
+                continue
+            path = predicate.path()
+            for name, index in indexes.items():
+                if index.attribute != path:
+                    continue
+                if predicate.op == '=':
+                    return (f"index '{name}' lookup",
+                            (index, 'get', (predicate.value,)))
+                if isinstance(index, SortedIndex):
+                    return (f"index '{name}' range",
+                            (index, 'range', _range(predicate)))
+
+        if self.tag is not None:
+            for name, index in indexes.items():
+                if index.attribute == 'tag':
+                    return (f"index '{name}' lookup",
+                            (index, 'get', (self.tag,)))
+
+        if self.max_depth is None:
+            return 'subtree scan', None
+        return f'subtree scan to depth {self.max_depth}', None
+
+
+def _range(predicate: Predicate) -> tuple:
+    """Arguments of SortedIndex.range() covering the predicate."""
+    if predicate.op in ('<', '<='):
+        return None, predicate.value, predicate.op == '<='
+    # Lower bounds are inclusive, '>' is checked by the predicate itself
+    return predicate.value, None, False
+
+
+class Query:
+    """Compiled query, see :mod:`ttree.query` for the syntax."""
+    def __init__(self, text: str, steps: List[Step]):
+        self.text = text
+        self.steps = steps
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.text!r})'
+
+    def explain(self, tree) -> List[str]:
+        """Return descriptions of how every step is run in the tree."""
+        return [f'{step!r}: {step.plan(tree)[0]}' for step in self.steps]
+
+    def select(self, tree, node_id=None) -> Iterator[Node]:
+        """
+        Generate nodes of the tree selected by the query from ``node_id``
+        or from the top of the tree.
+
+        Nodes are generated lazily and at most once. Traversals go
+        depth-first in insertion order of children; steps answered by an
+        index generate nodes in the order of the index.
+        """
+        if node_id is not None and node_id not in tree:
+            raise NodeNotFound(f"Node '{node_id}' is not in the tree")
+
+        contexts = iter(() if tree.root is None and node_id is None
+                        else (_TOP if node_id is None else node_id,))
+        for step in self.steps:
+            contexts = self._run(tree, step, contexts)
+        return (tree[node_id] for node_id in contexts)
+
+    @staticmethod
+    def _children(tree, node_id) -> List[Hashable]:
+        if node_id is _TOP:
+            return [tree.root]
+        return tree[node_id].children
+
+    def _run(self, tree, step: Step, contexts) -> Iterator[Hashable]:
+        description, lookup = step.plan(tree)
+        found = None
+        if lookup is not None:
+            index, method, args = lookup
+            try:
+                found = getattr(index, method)(*args)
+            except TypeError:
+                # The literal can't be compared with the indexed values,
+                # the scan gives the same result as without the index
+                pass
+
+        if found is None:
+            candidates = self._scan(tree, step, contexts)
+        else:
+            candidates = self._lookup(tree, step, found, contexts)
+
+        seen = set()
+        for node_id in candidates:
+            if node_id not in seen and step.matches(tree[node_id]):
+                seen.add(node_id)
+                yield node_id
+
+    def _scan(self, tree, step: Step, contexts) -> Iterator[Hashable]:
+        min_depth, max_depth = step.min_depth, step.max_depth
+        # Subtrees of '//' steps are traversed once for all contexts:
+        # ``covered`` nodes were reached with their subtrees, ``expanded``
+        # contexts had only their subtrees traversed
+        pruning = max_depth is None and min_depth == 1
+        covered, expanded = set(), set()
+        for context in contexts:
+            if pruning:
+                if context in covered or context in expanded:
+                    continue
+                expanded.add(context)
+
+            stack = [(child, 1) for child in
+                     reversed(self._children(tree, context))]
+            while stack:
+                node_id, depth = stack.pop()
+                if pruning:
+                    if node_id in covered:
+                        continue
+                    covered.add(node_id)
+
+                if depth >= min_depth:
+                    yield node_id
+                if pruning and node_id in expanded:
+                    continue
+                if max_depth is None or depth < max_depth:
+                    stack.extend((child, depth + 1) for child in
+                                 reversed(tree[node_id].children))
+
+    def _lookup(self, tree, step: Step, found: List[Hashable], contexts):
+        contexts = set(contexts)
+        if not contexts:
+            return
+
+        min_depth = step.min_depth
+        max_depth = math.inf if step.max_depth is None else step.max_depth
+        root = tree.root
+        for node_id in found:
+            # Walk parents to find a context within the depth bounds
+            current, depth = node_id, 0
+            while current is not _TOP and depth < max_depth:
+                current = _TOP if current == root else tree[current].parent
+                depth += 1
+                if depth >= min_depth and current in contexts:
+                    yield node_id
+                    break
+
+
+def _literal(match) -> object:
+    if match.group('single') is not None:
+        return match.group('single')
+    if match.group('double') is not None:
+        return match.group('double')
+
+    bare = match.group('bare')
+    if bare in _CONSTANTS:
+        return _CONSTANTS[bare]
+    if _NUMBER.match(bare):
+        return float(bare) if any(c in bare for c in '.eE') else int(bare)
+    raise InvalidQuery(f'Invalid literal {bare!r}')
+
+
+@functools.lru_cache(maxsize=256)
+def compile_query(text: str) -> Query:
+    """
+    Parse the query, raise :class:`~ttree.exceptions.InvalidQuery`.
+
+    Compiled queries are cached.
+    """
+    steps = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _AXIS.match(text, position)
+        if match is None:
+            raise InvalidQuery(f"Expected '/' at {position} in {text!r}")
+
+        axis, low, comma, high = match.groups()
+        if axis == '/':
+            if low or high:
+                raise InvalidQuery(f'Depth bounds require // at {position} '
+                                   f'in {text!r}')
+            min_depth, max_depth = 1, 1
+        elif low or high:
+            min_depth = int(low) if low else 1
+            max_depth = int(high) if high else None
+            if not comma:
+                max_depth = min_depth
+            if min_depth < 1 or max_depth is not None and \
+                    max_depth < min_depth:
+                raise InvalidQuery(f'Invalid depth bounds at {position} '
+                                   f'in {text!r}')
+        else:
+            min_depth, max_depth = 1, None
+        position = match.end()
+
+        match = _TEST.match(text, position)
+        if match is None:
+            raise InvalidQuery(f'Expected tag or * at {position} '
+                               f'in {text!r}')
+        tag = next((g for g in match.groups() if g is not None), None)
+        if tag is not None and match.lastindex == 3:
+            tag = tag.strip()
+        position = match.end()
+
+        predicates = []
+        while position < len(text) and text[position] == '[':
+            match = _PREDICATE.match(text, position)
+            if match is None:
+                raise InvalidQuery(f'Invalid predicate at {position} '
+                                   f'in {text!r}')
+            predicates.append(Predicate(
+                match.group('attribute'), match.group('op'),
+                None if match.group('op') is None else _literal(match)
+            ))
+            position = match.end()
+
+        steps.append(Step(min_depth, max_depth, tag, predicates))
+
+    if not steps:
+        raise InvalidQuery('Empty query')
+    return Query(text, steps)
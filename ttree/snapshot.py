@@ -0,0 +1,155 @@
+import copy
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import List
+
+from ttree.exceptions import NodeNotFound
+from .node import Node
+from .tree import Tree
+
+#: marker of nodes which were not changed since the snapshot was taken
+_LIVE = object()
+
+
+def _copy_node(node: Node) -> Node:
+    result = copy.copy(node)
+    if node._children is not None:
+        result._children = dict(node._children)
+    return result
+
+
+class TreeSnapshot(Mapping):
+    """
+    Read-only version of a :class:`~ttree.Tree` taken with
+    :meth:`ttree.Tree.snapshot`.
+
+    Taking a snapshot is O(1): it shares all nodes with the tree. Before
+    a mutating method of the tree changes a node, the tree hands a copy of
+    the node to its live snapshots, so every change costs only the copies
+    of the nodes it touches, e.g. the node and its old and new parents for
+    :meth:`~ttree.Tree.move_node`. Nodes are linked by IDs, so ancestors
+    are not copied. Snapshots which are not referenced anymore are
+    forgotten by the tree.
+
+    Only changes made through the methods of the tree, including
+    :meth:`~ttree.Tree.update_node`, are isolated. Nodes returned by a
+    snapshot must not be changed, and data payloads are shared with the
+    tree rather than copied.
+
+    The read API mirrors :class:`~ttree.Tree`. Nodes are iterated in
+    pre-order, children being visited in insertion order.
+    """
+    def __init__(self, tree: Tree):
+        #: id of the root node
+        self.root = tree.root
+
+        self._tree = tree
+        self._size = len(tree)
+        #: versions of nodes changed in the tree after the snapshot was
+        #: taken, None for nodes which were added
+        self._saved = {}
+
+        # Levels are computed by walking the parents, see level()
+        self._levels = {}
+        self._level_sizes_cache = None
+        self._intervals = None
+
+    def _save(self, node_ids, copies):
+        """
+        Keep the current versions of ``node_ids`` before they are changed.
+
+        ``copies`` is shared by all snapshots of the tree, so a node is
+        copied once for all of them.
+        """
+        saved, tree = self._saved, self._tree
+        for node_id in node_ids:
+            if node_id is None or node_id in saved:
+                continue
+
+            if node_id not in copies:
+                node = OrderedDict.get(tree, node_id)
+                copies[node_id] = None if node is None else _copy_node(node)
+            saved[node_id] = copies[node_id]
+
+    def __getitem__(self, node_id) -> Node:
+        node = self._saved.get(node_id, _LIVE)
+        if node is _LIVE:
+            node = OrderedDict.get(self._tree, node_id)
+        if node is None:
+            raise NodeNotFound(f"Node '{node_id}' is not in the tree")
+        return node
+
+    def get(self, node_id, default=None):
+        """Return the node or ``default`` if it is not in the snapshot."""
+        try:
+            return self[node_id]
+        except NodeNotFound:
+            return default
+
+    def __contains__(self, node_id):
+        node = self._saved.get(node_id, _LIVE)
+        if node is _LIVE:
+            return OrderedDict.__contains__(self._tree, node_id)
+        return node is not None
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        if self.root is None or self.root not in self:
+            return
+
+        stack = [self.root]
+        while stack:
+            node_id = stack.pop()
+            yield node_id
+            stack.extend(reversed(self[node_id].children))
+
+    def __str__(self) -> str:
+        return Tree.__str__(self)
+
+    @property
+    def _level_sizes(self) -> List[int]:
+        if self._level_sizes_cache is None:
+            sizes = []
+            level = [self.root] if self.root in self else []
+            while level:
+                sizes.append(len(level))
+                level = [child for node_id in level
+                         for child in self[node_id].children]
+            self._level_sizes_cache = sizes
+        return self._level_sizes_cache
+
+    def to_tree(self, tree_cls=None) -> Tree:
+        """
+        Create a :class:`~ttree.Tree` with copies of the nodes of the
+        snapshot, data payloads are shared.
+        """
+        result = (Tree if tree_cls is None else tree_cls)()
+        for node_id in self:
+            result[node_id] = _copy_node(self[node_id])
+        result.root = self.root
+        if self.root is not None:
+            result._index_levels(self.root, 0)
+        return result
+
+    # Read-only methods of Tree work on any mapping of nodes
+    children = Tree.children
+    depth = Tree.depth
+    dump_json = Tree.dump_json
+    expand_tree = Tree.expand_tree
+    is_ancestor = Tree.is_ancestor
+    is_branch = Tree.is_branch
+    is_descendant = Tree.is_descendant
+    iter_json = Tree.iter_json
+    leaves = Tree.leaves
+    level = Tree.level
+    parent = Tree.parent
+    paths_to_leaves = Tree.paths_to_leaves
+    print = Tree.print
+    rsearch = Tree.rsearch
+    save2file = Tree.save2file
+    siblings = Tree.siblings
+    size = Tree.size
+    to_dict = Tree.to_dict
+    to_json = Tree.to_json
@@ -1,16 +1,39 @@
 __author__ = 'Vladimir Bolshakov <vovanbo@gmail.com>'
 
-import json
 import copy
-from collections import OrderedDict
+import inspect
+import io
+import json
+import weakref
+from array import array
+from collections import OrderedDict, deque
 from typing import Callable, List, MutableMapping, Optional, Union
 
+import ttree.aio
+import ttree.binary
+import ttree.merkle
+import ttree.parallel
+import ttree.query
 import ttree.utils
-from ttree.common import ASCIIMode, TraversalMode
+from ttree.common import ASCIIMode, EventKind, IndexKind, TraversalMode
 from ttree.exceptions import (
-    NodeNotFound, MultipleRoots, DuplicatedNode, LinkPastRootNode, LoopError
+    NodeNotFound, MultipleRoots, DuplicatedNode, LinkPastRootNode, LoopError,
+    FrozenTree
 )
+from .events import TreeEvent
+from .indexes import HashIndex, Index, SortedIndex
+from .intervals import IntervalIndex
+from .lca import LCAIndex
 from .node import Node
+from .view import SubtreeView
+
+_FLAT_STATE_VERSION = 1
+#: node attributes stored in the columns of the flat state
+_NODE_STATE = ('_id', '_tag', 'expanded', '_parent', '_children', 'data')
+#: tree attributes which are rebuilt instead of being copied
+_TRANSIENT_ATTRIBUTES = ('_levels', '_level_sizes', '_intervals',
+                         '_lca_index', '_snapshots', '_indexes',
+                         '_subscribers', '_hashes', '_hash_digest')
 
 
 class Tree(OrderedDict):
@@ -30,12 +53,45 @@ class Tree(OrderedDict):
         #: id of the root node
         self.root = None
 
+        #: level of every node maintained by mutating methods
+        self._levels = {}
+        #: number of nodes at every level
+        self._level_sizes = []
+
+        #: interval and LCA indexes, None when not built or outdated
+        self._intervals = None
+        self._lca_index = None
+        self._frozen = False
+        #: weak references to live snapshots, see snapshot()
+        self._snapshots = []
+
+        #: children by tags for every node, None until build_path_index();
+        #: children sharing a tag are kept in the order of children
+        self._path_index = None
+        self._path_separator = '/'
+        #: stamps of indexed nodes growing in the order of their siblings
+        self._path_order = {}
+        self._path_clock = 0
+
+        #: secondary indexes by names, see create_index()
+        self._indexes = {}
+
+        #: pairs of callbacks and coalesce flags, see subscribe()
+        self._subscribers = []
+
+        #: Merkle hashes of subtrees by node IDs, None until
+        #: enable_hashes(); nodes of changed paths have no hashes
+        self._hashes = None
+        self._hash_digest = ttree.merkle.default_digest
+
         if tree is not None:
             if not isinstance(tree, Tree):
                 raise TypeError('Tree instance is required.')
 
             self.root = tree.root
             self.__merge_tree(tree, deepcopy)
+            self._levels = dict(tree._levels)
+            self._level_sizes = list(tree._level_sizes)
 
     def __str__(self) -> str:
         return ttree.utils.print_tree(self, ascii_mode='simple')
@@ -47,22 +103,433 @@ class Tree(OrderedDict):
             raise NodeNotFound(f"Node '{item}' is not in the tree")
 
     def __setitem__(self, key, value, **kwargs):
+        if self._snapshots:
+            self._save((key,))
         super(Tree, self).__setitem__(key, value, **kwargs)
         if isinstance(value, Node):
             value._tree = self
 
     def __delitem__(self, key, **kwargs):
         if key in self:
+            self._save((key,))
             self[key]._tree = None
         super(Tree, self).__delitem__(key, **kwargs)
 
     def __merge_tree(self, other: 'Tree', deepcopy: bool = False):
         if deepcopy:
-            for node_id in other:
-                self[node_id] = copy.deepcopy(other[node_id])
+            self.update(copy.deepcopy(other))
         else:
             self.update(other)
 
+    def __reduce__(self):
+        return self.__class__._from_flat_state, (self._flat_state(),)
+
+    def __deepcopy__(self, memo):
+        (version, ids, tags, counts, children, collapsed, data, classes,
+         links, attributes) = self._flat_state()
+        # Everything that may hold user objects is copied in one call, so
+        # shared payloads stay shared and memo lookups are done once
+        ids, tags, data, links, attributes = copy.deepcopy(
+            (ids, tags, data, links, attributes), memo
+        )
+        result = self.__class__._from_flat_state(
+            (version, ids, tags, counts, children, collapsed, data, classes,
+             links, attributes)
+        )
+        memo[id(self)] = result
+        return result
+
+    def _flat_state(self) -> tuple:
+        """
+        Return the tree as flat columns used by pickle and deepcopy.
+
+        Nodes are addressed by their positions in the tree: children of
+        all nodes are stored in one :class:`array.array` along with the
+        numbers of children of every node, and IDs, tags and data payloads
+        are plain lists, so no :class:`Node` objects and no back-references
+        are serialized. Links which can't be expressed with positions, e.g.
+        the parent of the root of a subtree, are kept in the ``links``
+        dict. Levels and other indexes are rebuilt on load.
+        """
+        ids = list(self)
+        positions = {node_id: i for i, node_id in enumerate(ids)}
+        nodes = list(self.values())
+        tags = [node._tag for node in nodes]
+        counts = array('q', bytes(8 * len(nodes)))
+        children = array('q')
+        collapsed = array('q')
+        # position -> (parent ID, raw children or None, extra node state)
+        links = {}
+
+        node_cls = type(nodes[0]) if nodes else Node
+        uniform = True
+        has_data = False
+        for position, node in enumerate(nodes):
+            raw_children = None
+            if node._children:
+                try:
+                    children.extend([positions[c] for c in node._children])
+                    counts[position] = len(node._children)
+                except KeyError:
+                    raw_children = list(node._children)
+
+            pid = node._parent
+            linked = pid in positions and self[pid].has_child(ids[position])
+            external = pid is not None and not linked
+
+            extra = None
+            if type(node) is not Node:
+                uniform = uniform and type(node) is node_cls
+                extra = node.__getstate__()
+                for name in _NODE_STATE:
+                    extra.pop(name, None)
+
+            if external or raw_children is not None or extra:
+                links[position] = (pid, raw_children, extra or None)
+            if not node.expanded:
+                collapsed.append(position)
+            if node.data is not None:
+                has_data = True
+
+        attributes = {
+            name: value for name, value in self.__dict__.items()
+            if name not in _TRANSIENT_ATTRIBUTES
+        }
+        return (
+            _FLAT_STATE_VERSION, ids, tags, counts, children, collapsed,
+            [node.data for node in nodes] if has_data else None,
+            node_cls if uniform else [type(node) for node in nodes],
+            links, attributes
+        )
+
+    @classmethod
+    def _from_flat_state(cls, state) -> 'Tree':
+        """Create a new tree from the result of :meth:`_flat_state`."""
+        (version, ids, tags, counts, children, collapsed, data, classes,
+         links, attributes) = state
+        if version != _FLAT_STATE_VERSION:
+            raise ValueError(f'Unsupported tree state version {version}')
+
+        result = cls()
+        nodes = []
+        for position, node_id in enumerate(ids):
+            node_cls = classes if isinstance(classes, type) \
+                else classes[position]
+            node = node_cls.__new__(node_cls)
+            node._id = node_id
+            node._tag = tags[position]
+            node.expanded = True
+            node._parent = None
+            node._children = None
+            node._tree = result
+            node.data = None if data is None else data[position]
+            nodes.append(node)
+
+        starts = array('q', counts)
+        start = 0
+        for position, count in enumerate(counts):
+            starts[position] = start
+            if count:
+                stop = start + count
+                node_id = ids[position]
+                child_positions = children[start:stop]
+                nodes[position]._children = dict.fromkeys(
+                    [ids[i] for i in child_positions]
+                )
+                for i in child_positions:
+                    nodes[i]._parent = node_id
+                start = stop
+
+        for position in collapsed:
+            nodes[position].expanded = False
+
+        for position, (pid, raw_children, extra) in links.items():
+            node = nodes[position]
+            node._parent = pid
+            if raw_children is not None:
+                node._children = dict.fromkeys(raw_children)
+            if extra:
+                for name, value in extra.items():
+                    setattr(node, name, value)
+
+        setitem = OrderedDict.__setitem__
+        for node_id, node in zip(ids, nodes):
+            setitem(result, node_id, node)
+
+        result.__dict__.update(attributes)
+        root = result.root
+        if root is None or root not in result:
+            return result
+
+        if any(raw_children is not None for _, raw_children, _ in
+               links.values()):
+            result._index_levels(root, 0)
+            return result
+
+        # Walk the positions level by level like in from_edges
+        levels, sizes = result._levels, result._level_sizes
+        level = [ids.index(root)]
+        while level:
+            sizes.append(len(level))
+            depth = len(sizes) - 1
+            next_level = []
+            for position in level:
+                levels[ids[position]] = depth
+                count = counts[position]
+                if count:
+                    start = starts[position]
+                    next_level.extend(children[start:start + count])
+            level = next_level
+        return result
+
+    def _touch(self):
+        """Check that the tree can be changed and drop outdated caches."""
+        if self._frozen:
+            raise FrozenTree('Frozen tree can not be changed.')
+
+        self._intervals = None
+        self._lca_index = None
+
+    def _save(self, node_ids):
+        """Hand the nodes which are about to change to live snapshots."""
+        if self._snapshots:
+            copies = {}
+            # Collected snapshots remove their references at any time
+            for ref in list(self._snapshots):
+                snapshot = ref()
+                if snapshot is not None:
+                    snapshot._save(node_ids, copies)
+
+    def snapshot(self):
+        """
+        Return a read-only :class:`~ttree.snapshot.TreeSnapshot` of the
+        current version of the tree.
+
+        The snapshot is taken in O(1) and is not affected by later changes
+        made through the methods of the tree.
+        """
+        from .snapshot import TreeSnapshot
+
+        result = TreeSnapshot(self)
+        # The reference removes itself when the snapshot is collected
+        self._snapshots.append(weakref.ref(result, self._snapshots.remove))
+        return result
+
+    def subscribe(self, callback: Callable, coalesce: bool = False):
+        """
+        Call ``callback`` on changes of the tree and return it.
+
+        The callback takes a :class:`~ttree.events.TreeEvent` for every
+        node added, removed, moved, pasted or updated by the methods of the
+        tree. With ``coalesce=True`` it takes the list of all events of one
+        method call or one :meth:`batch` instead, where the batch reports
+        only the net changes, e.g. nothing for a node added and removed
+        again. Events are built only while there are subscribers.
+        """
+        self._subscribers.append((callback, coalesce))
+        return callback
+
+    def unsubscribe(self, callback: Callable):
+        """Stop calling ``callback`` added with :meth:`subscribe`."""
+        self._subscribers = [
+            pair for pair in self._subscribers if pair[0] != callback
+        ]
+
+    def _emit(self, events: List[TreeEvent]):
+        for callback, coalesce in list(self._subscribers):
+            if coalesce:
+                callback(events)
+            else:
+                for event in events:
+                    callback(event)
+
+    def _set_level(self, node_id, level: int):
+        sizes = self._level_sizes
+        old_level = self._levels.get(node_id)
+        if old_level is not None:
+            sizes[old_level] -= 1
+
+        self._levels[node_id] = level
+        if level < len(sizes):
+            sizes[level] += 1
+        else:
+            sizes.append(1)
+
+    def _index_levels(self, node_id, level: int):
+        """
+        Set levels of ``node_id`` and all its successors, where ``level``
+        is the new level of ``node_id``.
+        """
+        stack = [(node_id, level)]
+        while stack:
+            node_id, level = stack.pop()
+            self._set_level(node_id, level)
+            stack.extend(
+                (child, level + 1) for child in self[node_id].children
+            )
+
+        self._trim_level_sizes()
+
+    def _unindex_levels(self, node_ids):
+        """Forget levels of removed nodes."""
+        levels, sizes = self._levels, self._level_sizes
+        for node_id in node_ids:
+            level = levels.pop(node_id, None)
+            if level is not None:
+                sizes[level] -= 1
+
+        self._trim_level_sizes()
+
+    def _trim_level_sizes(self):
+        sizes = self._level_sizes
+        while sizes and not sizes[-1]:
+            sizes.pop()
+
+    def _index_path(self, parent, node_id):
+        """
+        Add ``node_id`` appended to the children of ``parent`` to the
+        children by tags of ``parent``.
+        """
+        if self._path_index is not None and parent is not None:
+            self._path_order[node_id] = self._path_clock
+            self._path_clock += 1
+            self._path_siblings(parent, self[node_id].tag)[node_id] = None
+
+    def _path_siblings(self, parent, tag) -> OrderedDict:
+        """Return the children of ``parent`` with the ``tag`` to change."""
+        tags = self._path_index.setdefault(parent, {})
+        siblings = tags.get(tag)
+        if siblings is None:
+            # Ordered dicts give their last key in O(1) on Python < 3.8 too
+            siblings = tags[tag] = OrderedDict()
+        return siblings
+
+    def _index_renamed_path(self, parent, node_id):
+        """
+        Add the renamed ``node_id`` to the children by tags of ``parent``
+        at its place among the children sharing its new tag.
+        """
+        if self._path_index is None or parent is None:
+            return
+
+        order = self._path_order
+        siblings = self._path_siblings(parent, self[node_id].tag)
+        if siblings and order[next(reversed(siblings))] > order[node_id]:
+            ordered = sorted([*siblings, node_id], key=order.__getitem__)
+            siblings.clear()
+            siblings.update(dict.fromkeys(ordered))
+        else:
+            siblings[node_id] = None
+
+    def _index_children_paths(self, node_id):
+        """Index all children of ``node_id`` by tags again."""
+        get = OrderedDict.__getitem__
+        order = self._path_order
+        tags = {}
+        for child in get(self, node_id)._children or ():
+            order[child] = self._path_clock
+            self._path_clock += 1
+            tag = get(self, child).tag
+            siblings = tags.get(tag)
+            if siblings is None:
+                siblings = tags[tag] = OrderedDict()
+            siblings[child] = None
+        if tags:
+            self._path_index[node_id] = tags
+        else:
+            self._path_index.pop(node_id, None)
+
+    def _reindex(self, node_ids):
+        """Update values of changed nodes in secondary indexes."""
+        for index in self._indexes.values():
+            for node_id in node_ids:
+                if node_id is not None and node_id in self:
+                    index.add(self[node_id])
+
+    def _drop_from_indexes(self, node_ids):
+        for index in self._indexes.values():
+            for node_id in node_ids:
+                index.remove(node_id)
+
+    def _forget_paths(self, node_ids):
+        """Drop children by tags and stamps of removed nodes."""
+        if self._path_index is not None:
+            for node_id in node_ids:
+                self._path_index.pop(node_id, None)
+                self._path_order.pop(node_id, None)
+
+    def _rehash(self, node_ids):
+        """
+        Drop hashes of changed nodes and their ancestors, they are computed
+        again by :meth:`subtree_hash`.
+        """
+        hashes = self._hashes
+        get = OrderedDict.__getitem__
+        for node_id in node_ids:
+            # Ancestors of a node without a hash have no hashes either
+            while node_id is not None and \
+                    hashes.pop(node_id, None) is not None:
+                node_id = None if node_id == self.root \
+                    else get(self, node_id)._parent
+
+    def _forget_hashes(self, node_ids):
+        """Drop hashes of removed nodes."""
+        for node_id in node_ids:
+            self._hashes.pop(node_id, None)
+
+    def _unindex_path(self, parent, node_id):
+        """
+        Remove ``node_id`` from the children by tags of ``parent``, the next
+        child with the same tag takes its place.
+        """
+        if self._path_index is None:
+            return
+
+        tags = self._path_index.get(parent)
+        tag = self[node_id].tag
+        siblings = tags.get(tag) if tags else None
+        if siblings is None or node_id not in siblings:
+            return
+
+        del siblings[node_id]
+        if not siblings:
+            del tags[tag]
+            if not tags:
+                del self._path_index[parent]
+
+    @property
+    def frozen(self) -> bool:
+        """Check if the tree is frozen with :meth:`freeze`."""
+        return self._frozen
+
+    def freeze(self):
+        """
+        Forbid changes of the tree.
+
+        The interval index is built at once and kept until :meth:`unfreeze`,
+        so all ancestor and subtree size queries are O(1). Any attempt to
+        change the frozen tree raises :class:`~ttree.exceptions.FrozenTree`.
+        """
+        self.intervals
+        self._frozen = True
+
+    def unfreeze(self):
+        """Allow changes of the tree frozen with :meth:`freeze`."""
+        self._frozen = False
+
+    @property
+    def intervals(self) -> IntervalIndex:
+        """
+        Return :class:`~ttree.intervals.IntervalIndex` of the tree.
+
+        The index is built in O(n) on the first access after the tree was
+        changed and cached until the next change. While the cached index is
+        up to date, :meth:`is_ancestor` and :meth:`is_descendant` use it.
+        """
+        if self._intervals is None:
+            self._intervals = IntervalIndex(self)
+        return self._intervals
+
     @property
     def paths_to_leaves(self):
         """
@@ -91,9 +558,62 @@ class Tree(OrderedDict):
              ['harry', 'jane', 'mark'],
              ['harry', 'jane', 'diane', 'george', 'jill'],
              ['harry', 'bill']]
+
+        The whole result is kept in memory, use
+        :meth:`iter_paths_to_leaves` to stream the paths instead.
         """
         return [[n for n in self.rsearch(l.id)][::-1] for l in self.leaves()]
 
+    def iter_paths_to_leaves(self, node_id=None, deltas: bool = False):
+        """
+        Generate paths of identifiers from ``node_id`` (the root by default)
+        to each leaf of its subtree.
+
+        Paths are produced by a single depth-first walk, children being
+        visited in insertion order, which keeps one stack of the current
+        path. Every path is yielded as a tuple.
+
+        With ``deltas=True`` pairs ``(shared, suffix)`` are yielded
+        instead, where ``shared`` is the length of the prefix shared with
+        the previous path and ``suffix`` is the tuple of the rest of the
+        path, so the total output is O(n) rather than O(leaves * depth):
+
+        .. code-block:: python3
+
+            path = []
+            for shared, suffix in tree.iter_paths_to_leaves(deltas=True):
+                del path[shared:]
+                path.extend(suffix)
+        """
+        node_id = self.root if node_id is None else node_id
+        if node_id is None:
+            return
+
+        if node_id not in self:
+            raise NodeNotFound(f"Node '{node_id}' is not in the tree")
+
+        path = []
+        # Length of the prefix of the previous path which is still on
+        # the path stack
+        shared = 0
+        stack = [(node_id, 0)]
+        while stack:
+            node_id, depth = stack.pop()
+            if depth < shared:
+                shared = depth
+            del path[depth:]
+            path.append(node_id)
+
+            children = self[node_id].children
+            if children:
+                stack.extend((child, depth + 1)
+                             for child in reversed(children))
+            elif deltas:
+                yield shared, tuple(path[shared:])
+                shared = len(path)
+            else:
+                yield tuple(path)
+
     def add_node(self, node: Node, parent: Node = None):
         """
         Add a new node to tree.
@@ -104,6 +624,8 @@ class Tree(OrderedDict):
         if not isinstance(node, Node):
             raise TypeError('First parameter must be instance of Node.')
 
+        self._touch()
+
         if node.id in self:
             raise DuplicatedNode(f"Node with ID '{node.id}' "
                                  f"is already exists in tree.")
@@ -120,8 +642,19 @@ class Tree(OrderedDict):
 
         self[node.id] = node
         if pid in self:
+            if self._snapshots:
+                self._save((pid,))
             self[pid].add_child(node.id)
+            if self._path_index is not None:
+                self._index_path(pid, node.id)
         self[node.id].parent = pid
+        self._set_level(node.id, 0 if pid is None else self.level(pid) + 1)
+        if self._indexes:
+            self._reindex((node.id, pid))
+        if self._hashes is not None:
+            self._rehash((pid,))
+        if self._subscribers:
+            self._emit([TreeEvent(EventKind.ADDED, node.id, pid)])
 
     def children(self, node_id) -> List[Node]:
         """
@@ -144,6 +677,66 @@ class Tree(OrderedDict):
         self.add_node(node, parent)
         return node
 
+    def create_index(self, key, kind: Union[IndexKind, str] = IndexKind.HASH,
+                     name: str = None) -> Index:
+        """
+        Create a secondary index of nodes and return it.
+
+        ``key`` is a name of a node attribute, e.g. ``'tag'`` or
+        ``'data.rank'``, or a callable taking a :class:`Node`. A
+        :class:`~ttree.indexes.HashIndex` answers lookups by equal values in
+        O(1), a :class:`~ttree.indexes.SortedIndex` also answers range
+        queries in O(log n). The index is built in O(n) and then kept
+        consistent by the mutating methods of the tree, including
+        :meth:`update_node`; nodes changed directly have to be updated
+        with :meth:`update_node` too.
+
+        Indexes are known by ``name``, which defaults to the attribute
+        name or the name of the callable. They are neither copied nor
+        pickled along with the tree.
+        """
+        kind = kind if isinstance(kind, IndexKind) else IndexKind(kind)
+        if name is None:
+            name = key if isinstance(key, str) else key.__name__
+
+        if name in self._indexes:
+            raise ValueError(f"Index '{name}' already exists.")
+
+        index = (HashIndex if kind is IndexKind.HASH else SortedIndex)(key)
+        for node in self.values():
+            index.add(node)
+
+        self._indexes[name] = index
+        return index
+
+    def drop_index(self, name: str):
+        """Remove the secondary index created with :meth:`create_index`."""
+        del self._indexes[name]
+
+    def get_index(self, name: str) -> Optional[Index]:
+        """Return the secondary index by its name or None."""
+        return self._indexes.get(name)
+
+    def enable_hashes(self, digest: Callable[[object], bytes] = None):
+        """
+        Maintain Merkle hashes of subtrees returned by :meth:`subtree_hash`.
+
+        A hash covers the tag and ``digest`` of the data of a node and
+        hashes of its children in order, see :mod:`ttree.merkle`;
+        ``digest`` returns bytes, the repr of the data by default. Hashes
+        are computed lazily and kept, and a change of the tree drops only
+        the hashes of the changed nodes and their ancestors, so unchanged
+        subtrees are never hashed again. Nodes should be changed with
+        :meth:`update_node` then.
+        """
+        self._hashes = {}
+        self._hash_digest = digest or ttree.merkle.default_digest
+
+    def disable_hashes(self):
+        """Drop the hashes kept since :meth:`enable_hashes`."""
+        self._hashes = None
+        self._hash_digest = ttree.merkle.default_digest
+
     def depth(self, node=None) -> int:
         """
         Get the maximum level of this tree or the level of the given node
@@ -158,9 +751,7 @@ class Tree(OrderedDict):
         result = 0
         if node is None:
             # Get maximum level of this tree
-            for leaf in self.leaves():
-                level = self.level(leaf.id)
-                result = level if level >= result else result
+            result = max(len(self._level_sizes) - 1, 0)
         else:
             # Get level of the given node
             node_id = node.id if isinstance(node, Node) else node
@@ -210,45 +801,344 @@ class Tree(OrderedDict):
             return
 
         yield node_id
-        queue = (self[i] for i in self[node_id].children)
 
-        if filtering is not None:
-            queue = filter(filtering, queue)
-
-        if mode in (TraversalMode.DEPTH, TraversalMode.WIDTH):
-            queue = sorted(queue, key=key, reverse=reverse)
+        def expansion(node):
+            children = (self[i] for i in node.children)
+            if filtering is not None:
+                children = filter(filtering, children)
+            return children
+
+        if mode is TraversalMode.DEPTH:
+            # Pre-order walk over an explicit stack: children are pushed
+            # in backward order, so the first of them is popped first.
+            stack = sorted(expansion(self[node_id]), key=key, reverse=reverse)
+            stack.reverse()
+            while stack:
+                node = stack.pop()
+                yield node.id
+                stack.extend(reversed(
+                    sorted(expansion(node), key=key, reverse=reverse)
+                ))
+
+        elif mode is TraversalMode.WIDTH:
+            queue = deque(
+                sorted(expansion(self[node_id]), key=key, reverse=reverse)
+            )
             while queue:
-                yield queue[0].id
-                expansion = sorted(
-                    filter(filtering, (self[i] for i in queue[0].children)),
-                    key=key, reverse=reverse
-                )
-
-                if mode is TraversalMode.DEPTH:
-                    queue = expansion + queue[1:]  # depth-first
-                elif mode is TraversalMode.WIDTH:
-                    queue = queue[1:] + expansion  # width-first
+                node = queue.popleft()
+                yield node.id
+                queue.extend(sorted(expansion(node), key=key, reverse=reverse))
 
         elif mode is TraversalMode.ZIGZAG:
             # Suggested by Ilya Kuprik (ilya-spy@ynadex.ru).
-            stack_fw = []
-            queue = list(queue)
-            queue.reverse()
-            stack = stack_bw = queue
+            # Each level is collected from the children of the previous
+            # one taken backwards; every second level also reverses the
+            # order of siblings.
+            level = list(expansion(self[node_id]))
+            level.reverse()
             direction = False
-            while stack:
-                expansion = filter(filtering,
-                                   (self[i] for i in stack[0].children))
-                yield stack.pop(0).id
-                expansion = list(expansion)
-                if direction:
-                    expansion.reverse()
-                    stack_bw = expansion + stack_bw
+            while level:
+                expansions = []
+                for node in level:
+                    yield node.id
+                    expansions.append(list(expansion(node)))
+
+                level = []
+                for children in reversed(expansions):
+                    if direction:
+                        children.reverse()
+                    level.extend(children)
+                direction = not direction
+
+    def aexpand_tree(self, node_id=None,
+                     mode: Union[TraversalMode, str] = TraversalMode.DEPTH,
+                     filtering: Callable[[Node], bool] = None,
+                     key=None, reverse: bool = False,
+                     budget: int = ttree.aio.DEFAULT_BUDGET):
+        """
+        Asynchronous :meth:`expand_tree` for ``async for``, which yields
+        control to the event loop after every ``budget`` nodes.
+        """
+        return ttree.aio.aiterate(
+            self.expand_tree(node_id, mode, filtering, key, reverse), budget
+        )
+
+    @classmethod
+    def from_edges(cls, edges, node_cls=Node) -> 'Tree':
+        """
+        Build a new tree from parent-pointer rows in one pass.
+
+        Every row of ``edges`` is a tuple ``(id, parent_id, tag, data)``,
+        ``tag`` and ``data`` may be omitted. The root row has ``None`` as
+        ``parent_id``. Rows may go in any order, e.g. children before their
+        parents. The whole batch is validated at once: duplicated IDs,
+        several roots, unknown parents and cycles raise the same exceptions
+        as :meth:`add_node` and :meth:`move_node`, and no tree is built.
+
+        Children are linked in the order of rows.
+        """
+        if not issubclass(node_cls, Node):
+            raise ValueError('node_cls must be a subclass of Node.')
+
+        nodes = {}
+        root = None
+        for row in edges:
+            node_id, pid, tag, data = (
+                row if len(row) == 4 else (tuple(row) + (None, None))[:4]
+            )
+            if node_id in nodes:
+                raise DuplicatedNode(f"Node with ID '{node_id}' "
+                                     f"is already exists in tree.")
+
+            if pid is None:
+                if root is not None:
+                    raise MultipleRoots('A tree takes one root merely.')
+                root = node_id
+
+            node = node_cls(tag, node_id, data=data)
+            node._parent = pid
+            nodes[node_id] = node
+
+        for node_id, node in nodes.items():
+            pid = node._parent
+            if pid is None:
+                continue
+
+            try:
+                nodes[pid].add_child(node_id)
+            except KeyError:
+                raise NodeNotFound(f"Parent node '{pid}' is not in the tree")
+
+        result = cls()
+        if not nodes:
+            return result
+
+        if root is None:
+            raise LoopError('Nodes without root form a cycle.')
+
+        # Walk from the root level by level, nodes of cycles are not
+        # reachable from it
+        levels, sizes = result._levels, result._level_sizes
+        level = [root]
+        while level:
+            sizes.append(len(level))
+            depth = len(sizes) - 1
+            next_level = []
+            for node_id in level:
+                node = nodes[node_id]
+                levels[node_id] = depth
+                OrderedDict.__setitem__(result, node_id, node)
+                node._tree = result
+                if node._children:
+                    next_level.extend(node._children)
+            level = next_level
+
+        if len(result) != len(nodes):
+            raise LoopError('Some nodes form a cycle and are not reachable '
+                            'from the root.')
+
+        result.root = root
+        return result
+
+    @classmethod
+    def _from_events(cls, events, id_factory=None) -> 'Tree':
+        """
+        Build a new tree from events generated by
+        :func:`ttree.utils.dict_events` or :func:`ttree.utils.json_events`.
+        """
+        result = cls()
+        levels, sizes = result._levels, result._level_sizes
+        stack = []
+        for event in events:
+            kind = event[0]
+            if kind == 'start':
+                tag = event[1]
+                node = Node(
+                    tag, None if id_factory is None else id_factory(tag)
+                )
+                node_id = node.id
+                if node_id in result:
+                    raise DuplicatedNode(f"Node with ID '{node_id}' "
+                                         f"is already exists in tree.")
+
+                if stack:
+                    parent = stack[-1]
+                    node._parent = parent.id
+                    parent.add_child(node_id)
                 else:
-                    stack_fw = expansion + stack_fw
-                if not stack:
-                    direction = not direction
-                    stack = stack_fw if direction else stack_bw
+                    result.root = node_id
+
+                OrderedDict.__setitem__(result, node_id, node)
+                node._tree = result
+                level = len(stack)
+                levels[node_id] = level
+                if level < len(sizes):
+                    sizes[level] += 1
+                else:
+                    sizes.append(1)
+                stack.append(node)
+            elif kind == 'data':
+                stack[-1].data = event[1]
+            elif kind == 'collapsed':
+                stack[-1].expanded = False
+            elif kind == 'end':
+                stack.pop()
+
+        return result
+
+    @classmethod
+    def from_dict(cls, value, id_factory=None) -> 'Tree':
+        """
+        Create a new tree from the dict in the format of :meth:`to_dict`.
+
+        Both shapes, with and without data, are accepted. Nodes with
+        empty children lists are restored as collapsed ones. The dict keeps
+        tags only, so IDs are generated with ``id_factory`` called with the
+        tag of every node, or with :func:`~ttree.node.generate_id` if it
+        is not given.
+        """
+        return cls._from_events(ttree.utils.dict_events(value), id_factory)
+
+    @classmethod
+    def from_json(cls, source, incremental: bool = False, id_factory=None,
+                  chunk_size: int = 65536) -> 'Tree':
+        """
+        Create a new tree from JSON in the format of :meth:`to_json`.
+
+        ``source`` is a string or a text file object. With
+        ``incremental=True`` the JSON is parsed chunk by chunk by
+        :func:`ttree.utils.json_events` instead of being loaded at once, so
+        the size of the JSON text is not limited by memory and no
+        intermediate dict is built. See :meth:`from_dict` for the
+        ``id_factory``.
+        """
+        if incremental:
+            fp = io.StringIO(source) if isinstance(source, str) else source
+            return cls._from_events(
+                ttree.utils.json_events(fp, chunk_size), id_factory
+            )
+
+        text = source if isinstance(source, str) else source.read()
+        return cls.from_dict(json.loads(text), id_factory)
+
+    def apply_patch(self, script):
+        """
+        Apply the edit script returned by :func:`ttree.delta.diff` in one
+        :meth:`batch`, so the script is applied as a whole or not at all.
+
+        Data payloads of the script are shared, not copied.
+        """
+        with self.batch() as batch:
+            for edit in script:
+                kind = edit.kind
+                if kind is EventKind.ADDED:
+                    batch.create_node(edit.tag, edit.node_id,
+                                      parent=edit.parent, data=edit.data)
+                elif kind is EventKind.MOVED:
+                    batch.move_node(edit.node_id, edit.parent)
+                elif kind is EventKind.UPDATED:
+                    batch.update_node(edit.node_id, tag=edit.tag,
+                                      data=edit.data)
+                elif kind is EventKind.REMOVED:
+                    batch.remove_node(edit.node_id)
+                else:
+                    raise ValueError(f'Unsupported edit {edit!r}')
+
+    def batch(self):
+        """
+        Return a :class:`~ttree.batch.TreeBatch` buffering mutations of the
+        tree, which are validated and applied together at the end of the
+        ``with`` block, or not applied at all:
+
+        .. code-block:: python3
+
+            with tree.batch() as batch:
+                batch.create_node('Jill', 'jill', parent='mary')
+                batch.create_node('Mary', 'mary', parent='diane')
+                batch.move_node('mark', 'bill')
+                batch.remove_node('george')
+        """
+        from .batch import TreeBatch
+
+        return TreeBatch(self)
+
+    def build_path_index(self, separator: str = '/'):
+        """
+        Build the index of paths of tags used by :meth:`get_by_path` and
+        :meth:`ensure_path`.
+
+        For every node the index keeps a dict of its children by their
+        tags, so a path is resolved in O(path length). The index is
+        maintained by the mutating methods of the tree, tags should be
+        changed with :meth:`update_node` then. If siblings share a tag,
+        the path leads to the first of them. ``separator`` splits string
+        paths.
+        """
+        self._path_index = {}
+        self._path_order = {}
+        self._path_clock = 0
+        for node_id in self:
+            self._index_children_paths(node_id)
+        self._path_separator = separator
+
+    def _path_tags(self, path):
+        if isinstance(path, str):
+            return [tag for tag in path.split(self._path_separator) if tag]
+        return list(path)
+
+    def _child_by_tag(self, node_id, tag):
+        if self._path_index is not None:
+            siblings = self._path_index.get(node_id, {}).get(tag)
+            return next(iter(siblings)) if siblings else None
+
+        for child in self[node_id].children:
+            if self[child].tag == tag:
+                return child
+        return None
+
+    def get_by_path(self, path, node_id=None) -> Node:
+        """
+        Return the node found by the path of tags from ``node_id``, the
+        root by default, which is not a part of the path.
+
+        ``path`` is a string of tags joined with the separator, e.g.
+        ``'usr/lib/python3'``, or a sequence of tags. Without
+        :meth:`build_path_index` children are scanned at every step.
+        """
+        current = self.root if node_id is None else node_id
+        if current not in self:
+            raise NodeNotFound(f"Node '{current}' is not in the tree")
+
+        for tag in self._path_tags(path):
+            current = self._child_by_tag(current, tag)
+            if current is None:
+                raise NodeNotFound(f"Path '{path}' is not in the tree")
+        return self[current]
+
+    def ensure_path(self, path, node_id=None, id_factory=None,
+                    node_cls=Node) -> Node:
+        """
+        Return the node of the path like :meth:`get_by_path`, creating
+        the missing nodes of the path like ``mkdir -p``.
+
+        IDs of new nodes are generated with ``id_factory`` called with the
+        tuple of tags of the path up to the new node, or with
+        :func:`~ttree.node.generate_id` if it is not given.
+        """
+        current = self.root if node_id is None else node_id
+        if current not in self:
+            raise NodeNotFound(f"Node '{current}' is not in the tree")
+
+        tags = self._path_tags(path)
+        for position, tag in enumerate(tags):
+            child = self._child_by_tag(current, tag)
+            if child is None:
+                new_id = None if id_factory is None \
+                    else id_factory(tuple(tags[:position + 1]))
+                child = self.create_node(tag, new_id, parent=current,
+                                         node_cls=node_cls).id
+            current = child
+        return self[current]
 
     def is_branch(self, node_id):
         """
@@ -276,9 +1166,38 @@ class Tree(OrderedDict):
 
         Update: @filtering params is added to calculate level passing
         exclusive nodes.
+
+        Without @filtering the level is taken from the index maintained
+        by the tree in O(1).
         """
+        if filtering is None and node_id in self._levels:
+            return self._levels[node_id]
+
         return len([n for n in self.rsearch(node_id, filtering)]) - 1
 
+    def _get_lca_index(self) -> LCAIndex:
+        if self._lca_index is None:
+            self._lca_index = LCAIndex(self)
+        return self._lca_index
+
+    def lca(self, a, b):
+        """
+        Return the ID of the lowest common ancestor of nodes ``a`` and ``b``.
+
+        A node is considered an ancestor of itself. The first call after
+        a change of the tree builds :class:`~ttree.lca.LCAIndex` in
+        O(n log depth), then every query takes O(log depth).
+        """
+        return self._get_lca_index().lca(a, b)
+
+    def lca_many(self, node_ids):
+        """Return the ID of the lowest common ancestor of all ``node_ids``."""
+        return self._get_lca_index().lca_many(node_ids)
+
+    def distance(self, a, b) -> int:
+        """Return the number of edges on the path between ``a`` and ``b``."""
+        return self._get_lca_index().distance(a, b)
+
     def link_past_node(self, node_id):
         """
         Remove a node and link its children to its parent.
@@ -292,19 +1211,53 @@ class Tree(OrderedDict):
             raise LinkPastRootNode('Cannot link past the root node, '
                                    'delete it with remove_node()')
 
+        self._touch()
+
         # Get the parent of the node we are linking past
         parent = self[self[node_id].parent]
+        children = self[node_id].children
+        self._save([parent.id, node_id] + children)
 
-        # Set the children of the node to the parent
+        # Set the children of the node to the parent and link them
+        level = self.level(node_id)
+        self._unindex_path(parent.id, node_id)
         for child in self[node_id].children:
             self[child].parent = parent.id
+            parent.add_child(child)
+            self._index_path(parent.id, child)
+            self._index_levels(child, level)
 
-        # Link the children to the parent
-        parent.children += self[node_id].children
         # Delete the node
+        self._forget_paths((node_id,))
         parent.remove_child(node_id)
+        self._unindex_levels((node_id,))
+        if self._indexes:
+            self._reindex([parent.id] + self[node_id].children)
+            self._drop_from_indexes((node_id,))
+        if self._hashes is not None:
+            self._forget_hashes((node_id,))
+            self._rehash((parent.id,))
         del self[node_id]
 
+        if self._subscribers:
+            events = [TreeEvent(EventKind.MOVED, child, parent.id, node_id)
+                      for child in children]
+            events.append(TreeEvent(EventKind.REMOVED, node_id, parent.id))
+            self._emit(events)
+
+    def map_reduce(self, map_fn: Callable[[Node], object],
+                   reduce_fn: Callable[[object, object], object],
+                   node_id=None, workers: int = None, executor=None):
+        """
+        Return ``reduce_fn`` folded over ``map_fn`` of every node of the
+        subtree of ``node_id``, computed by a pool of ``workers``
+        processes over disjoint parts of the tree of balanced size.
+
+        See :func:`ttree.parallel.map_reduce`.
+        """
+        return ttree.parallel.map_reduce(self, map_fn, reduce_fn, node_id,
+                                         workers, executor)
+
     def move_node(self, source, destination):
         """
         Move node (source) from its parent to another parent (destination).
@@ -312,27 +1265,50 @@ class Tree(OrderedDict):
         if source not in self or destination not in self:
             raise NodeNotFound
 
-        if self.is_ancestor(source, destination):
+        if source == destination or self.is_ancestor(source, destination):
             raise LoopError
 
+        self._touch()
         parent = self[source].parent
+        self._save((source, parent, destination))
+        self._unindex_path(parent, source)
         self[parent].remove_child(source)
         self[destination].add_child(source)
         self[source].parent = destination
+        self._index_path(destination, source)
+        self._reindex((source, parent, destination))
+        if self._hashes is not None:
+            self._rehash((parent, destination))
+        self._index_levels(source, self.level(destination) + 1)
+        if self._subscribers:
+            self._emit([TreeEvent(EventKind.MOVED, source, destination,
+                                  parent)])
 
     def is_ancestor(self, ancestor, grandchild) -> bool:
-        parent = self[grandchild].parent
-        child = grandchild
+        """
+        Check if ``ancestor`` is a strict ancestor of ``grandchild``.
 
-        while parent is not None:
-            if parent == ancestor:
-                return True
+        O(1) with an up-to-date interval index (see :attr:`intervals`),
+        otherwise parent links are walked up to the root.
+        """
+        if self._intervals is not None:
+            return self._intervals.is_ancestor(ancestor, grandchild)
+
+        if ancestor not in self:
+            raise NodeNotFound(f"Node '{ancestor}' is not in the tree")
 
-            child = self[child].parent
-            parent = self[child].parent
+        current = grandchild
+        while current != self.root:
+            current = self[current].parent
+            if current == ancestor:
+                return True
 
         return False
 
+    def is_descendant(self, grandchild, ancestor) -> bool:
+        """Check if ``grandchild`` is a strict descendant of ``ancestor``."""
+        return self.is_ancestor(ancestor, grandchild)
+
     def parent(self, node_id) -> Optional[Node]:
         """
         Obtain specific node's parent (Node instance).
@@ -367,10 +1343,27 @@ class Tree(OrderedDict):
             # TODO: a deprecated routine is needed to avoid exception
             raise ValueError(f'Duplicated nodes {list(set_joint)} exists.')
 
+        self._touch()
+        self._save((node_id,))
+
         self.__merge_tree(new_tree, deepcopy)
 
         self[node_id].add_child(new_tree.root)
         self[new_tree.root].parent = node_id
+        if self._path_index is not None:
+            for new_id in new_tree:
+                for child in self[new_id].children:
+                    self._index_path(new_id, child)
+            self._index_path(node_id, new_tree.root)
+        if self._indexes:
+            self._reindex(list(new_tree) + [node_id])
+        if self._hashes is not None:
+            self._rehash((node_id,))
+        self._index_levels(new_tree.root, self.level(node_id) + 1)
+        if self._subscribers:
+            self._emit([TreeEvent(EventKind.PASTED, new_id,
+                                  self[new_id].parent)
+                        for new_id in new_tree])
 
     def remove_node(self, node_id) -> int:
         """
@@ -382,16 +1375,31 @@ class Tree(OrderedDict):
         if node_id is None:
             return 0
 
+        self._touch()
         parent = self[node_id].parent
+        self._save((parent,))
 
         removed = [n for n in self.expand_tree(node_id)]
+        if self._subscribers:
+            events = [TreeEvent(EventKind.REMOVED, n, self[n].parent)
+                      for n in removed]
+        self._unindex_path(parent, node_id)
+        self._forget_paths(removed)
         for id_ in removed:
             del self[id_]
+        self._unindex_levels(removed)
 
         # Update its parent info
-        if parent:
+        if parent is not None:
             self[parent].remove_child(node_id)
 
+        self._drop_from_indexes(removed)
+        self._reindex((parent,))
+        if self._hashes is not None:
+            self._forget_hashes(removed)
+            self._rehash((parent,))
+        if self._subscribers:
+            self._emit(events)
         return len(removed)
 
     def remove_subtree(self, node_id) -> 'Tree':
@@ -415,16 +1423,32 @@ class Tree(OrderedDict):
         if node_id is None:
             return subtree
 
+        self._touch()
         subtree.root = node_id
         parent = self[node_id].parent
-        self[node_id].parent = None  # reset root parent for the new tree
 
         removed = [n for n in self.expand_tree(node_id)]
+        if self._subscribers:
+            events = [TreeEvent(EventKind.REMOVED, n, self[n].parent)
+                      for n in removed]
+        self._save(removed + [parent])
+        self._unindex_path(parent, node_id)
+        self._forget_paths(removed)
+        self[node_id].parent = None  # reset root parent for the new tree
         for id_ in removed:
             subtree[id_] = self.pop(id_)
+        self._unindex_levels(removed)
+        subtree._index_levels(node_id, 0)
 
         # Update its parent info
         self[parent].remove_child(node_id)
+        self._drop_from_indexes(removed)
+        self._reindex((parent,))
+        if self._hashes is not None:
+            self._forget_hashes(removed)
+            self._rehash((parent,))
+        if self._subscribers:
+            self._emit(events)
         return subtree
 
     def rsearch(self, node_id, filtering: Callable[[Node], bool] = None):
@@ -451,6 +1475,16 @@ class Tree(OrderedDict):
             # subtree() hasn't update the parent
             current = self[current].parent if self.root != current else None
 
+    def save_binary(self, filename, with_data: bool = True):
+        """
+        Save the tree into the compact binary file.
+
+        The file can be opened with :class:`~ttree.binary.MappedTree`
+        without parsing. See :mod:`ttree.binary` for the format.
+        """
+        with open(filename, 'wb') as fp:
+            ttree.binary.write_binary(self, fp, with_data)
+
     def save2file(self, filename, node_id=None, id_hidden=True,
                   filtering=None, key=None, reverse=False,
                   ascii_mode=ASCIIMode.ex, data_property=None):
@@ -504,6 +1538,41 @@ class Tree(OrderedDict):
         except NodeNotFound:
             print('Tree is empty')
 
+    async def aprint(self, node_id=None, id_hidden=True, filtering=None,
+                     key=None, reverse=False, ascii_mode=ASCIIMode.ex,
+                     data_property=None, func=None,
+                     budget: int = ttree.aio.DEFAULT_BUDGET):
+        """
+        Asynchronous :meth:`print`, which yields control to the event loop
+        after every ``budget`` lines. ``func`` takes every line and may be
+        a coroutine function, the builtin :func:`print` by default.
+        """
+        func = print if func is None else func
+        try:
+            await ttree.aio.aprint_tree(
+                self, node_id, id_hidden, filtering, key, reverse,
+                ascii_mode, data_property, func=func, budget=budget
+            )
+        except NodeNotFound:
+            result = func('Tree is empty')
+            if inspect.isawaitable(result):
+                await result
+
+    def select(self, query, node_id=None):
+        """
+        Generate nodes selected by the query, e.g.
+        ``"/root//genus[rank='species']/*"``.
+
+        ``query`` is a string or a :class:`~ttree.query.Query` compiled
+        with :func:`~ttree.query.compile_query`, see :mod:`ttree.query` for
+        the syntax. Steps use secondary indexes created with
+        :meth:`create_index` where possible and traverse only the subtrees
+        they need otherwise.
+        """
+        if isinstance(query, str):
+            query = ttree.query.compile_query(query)
+        return query.select(self, node_id)
+
     def siblings(self, node_id) -> List[Node]:
         """
         Return the siblings of given ``node_id``.
@@ -537,10 +1606,41 @@ class Tree(OrderedDict):
             raise TypeError(f"Level should be an integer instead "
                             f"of '{type(level)}'")
 
-        return len(
-            [node for node in self.values()
-             if self.level(node.id) == level]
-        )
+        if 0 <= level < len(self._level_sizes):
+            return self._level_sizes[level]
+        return 0
+
+    def subtree_hash(self, node_id=None) -> bytes:
+        """
+        Return the Merkle hash of the subtree of ``node_id``, the root by
+        default, see :mod:`ttree.merkle`.
+
+        Equal hashes mean equal tags, data and shapes of subtrees, whatever
+        the IDs of their nodes are. Since :meth:`enable_hashes` only the
+        nodes changed after the last call are hashed, otherwise the whole
+        subtree is.
+        """
+        node_id = self.root if node_id is None else node_id
+        if node_id not in self:
+            raise NodeNotFound(f"Node '{node_id}' is not in the tree")
+
+        hashes = {} if self._hashes is None else self._hashes
+        return ttree.merkle.fill_hashes(self, node_id, hashes,
+                                        self._hash_digest)
+
+    def content_equals(self, other: 'Tree') -> bool:
+        """
+        Check if the tree has the same tags, data and shape as ``other``
+        by their :meth:`subtree_hash`, which is O(1) for trees with
+        enabled hashes which are not changed since the last check.
+        """
+        if self.root is None or other.root is None:
+            return self.root is None and other.root is None
+        return self.subtree_hash() == other.subtree_hash()
+
+    def subtree_size(self, node_id) -> int:
+        """Return the number of nodes in the subtree of ``node_id``."""
+        return self.intervals.subtree_size(node_id)
 
     def subtree(self, node_id) -> 'Tree':
         """
@@ -553,6 +1653,9 @@ class Tree(OrderedDict):
             new_tree = Tree(t.subtree(t.root), deep=True)
 
         This line creates a deep copy of the entire tree.
+
+        Use :meth:`subtree_view` to read a part of the tree without
+        copying it.
         """
         result = self.__class__()
         if node_id is None:
@@ -564,9 +1667,20 @@ class Tree(OrderedDict):
         result.root = node_id
         for subtree_node in self.expand_tree(node_id):
             result[self[subtree_node].id] = self[subtree_node]
+        result._index_levels(node_id, 0)
 
         return result
 
+    def subtree_view(self, node_id) -> SubtreeView:
+        """
+        Return a live read-only :class:`~ttree.view.SubtreeView` of the
+        subtree with ``node_id`` being its root.
+
+        Unlike :meth:`subtree` nothing is copied, the view is created
+        in O(1).
+        """
+        return SubtreeView(self, node_id)
+
     def to_dict(self, node_id=None, key=None, sort=True, reverse=False,
                 with_data=False) -> MutableMapping:
         """transform self into a dict"""
@@ -602,6 +1716,77 @@ class Tree(OrderedDict):
 
     def to_json(self, with_data=False, sort=True, reverse=False) -> str:
         """Return the json string corresponding to self"""
-        return json.dumps(
-            self.to_dict(with_data=with_data, sort=sort, reverse=reverse)
+        return ''.join(
+            self.iter_json(with_data=with_data, sort=sort, reverse=reverse)
         )
+
+    def iter_json(self, node_id=None, with_data=False, sort=True,
+                  reverse=False, chunk_size: int = 65536):
+        """
+        Generate the json string corresponding to self in chunks.
+
+        The result is the same as of :meth:`to_json`, but the tree is
+        written incrementally without building the nested dict.
+        See :func:`ttree.utils.json_chunks`.
+        """
+        return ttree.utils.json_chunks(self, node_id, with_data, sort,
+                                       reverse, chunk_size)
+
+    def aiter_json(self, node_id=None, with_data=False, sort=True,
+                   reverse=False, chunk_size: int = 4096,
+                   budget: int = 1):
+        """
+        Asynchronous :meth:`iter_json` for ``async for``, which yields
+        control to the event loop after every ``budget`` chunks.
+        """
+        return ttree.aio.aiterate(
+            self.iter_json(node_id, with_data, sort, reverse, chunk_size),
+            budget
+        )
+
+    async def ato_json(self, with_data=False, sort=True, reverse=False,
+                       chunk_size: int = 4096) -> str:
+        """
+        Asynchronous :meth:`to_json`, which yields control to the event
+        loop after every chunk of ``chunk_size`` characters.
+        """
+        return ''.join([chunk async for chunk in self.aiter_json(
+            with_data=with_data, sort=sort, reverse=reverse,
+            chunk_size=chunk_size
+        )])
+
+    def dump_json(self, fp, node_id=None, with_data=False, sort=True,
+                  reverse=False, chunk_size: int = 65536):
+        """Write the json string corresponding to self to file object."""
+        for chunk in self.iter_json(node_id, with_data, sort, reverse,
+                                    chunk_size):
+            fp.write(chunk)
+
+    def update_node(self, node_id, **attrs):
+        """
+        Update attributes of the node, e.g. ``tag``, ``data`` or
+        ``expanded``.
+
+        Unlike changing the :class:`Node` object directly, the change is
+        not seen by snapshots taken before it. Use :meth:`move_node` to
+        change the parent.
+        """
+        for name in ('id', 'parent', 'children'):
+            if name in attrs:
+                raise ValueError(f"'{name}' of a node can't be updated.")
+
+        node = self[node_id]
+        self._touch()
+        self._save((node_id,))
+        if 'tag' in attrs:
+            self._unindex_path(node.parent, node_id)
+        for name, value in attrs.items():
+            setattr(node, name, value)
+        if 'tag' in attrs:
+            self._index_renamed_path(node.parent, node_id)
+        self._reindex((node_id,))
+        if self._hashes is not None:
+            self._rehash((node_id,))
+        if self._subscribers:
+            self._emit([TreeEvent(EventKind.UPDATED, node_id, node.parent,
+                                  attributes=tuple(attrs))])
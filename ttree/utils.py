@@ -1,7 +1,10 @@
-from typing import Hashable, Callable, Union
+import json
+from typing import Hashable, Callable, Iterator, Union
 
 from ttree.common import ASCIIMode, TraversalMode
 
+_END = object()
+
 
 def tree_printer_gen(tree, node_id: Hashable, filtering=None, key=None,
                      reverse: bool = False,
@@ -78,6 +81,25 @@ def get_label(node, data_property: str, id_hidden: bool):
     return result if id_hidden else f'{result}[{node.id}]'
 
 
+def tree_lines(tree, node_id: Hashable = None, id_hidden: bool = True,
+               filtering=None, key=None, reverse: bool = False,
+               ascii_mode: Union[ASCIIMode, str] = ASCIIMode.ex,
+               data_property: str = None) -> Iterator[str]:
+    """
+    Generate lines of the tree printed by :func:`print_tree`.
+
+    Parameters are the same as of :func:`print_tree`.
+    """
+    ascii_mode = (
+        ascii_mode if isinstance(ascii_mode, ASCIIMode)
+        else ASCIIMode[ascii_mode]
+    )
+
+    for pre, node in tree_printer_gen(tree, node_id, filtering, key,
+                                      reverse, ascii_mode):
+        yield f'{pre}{get_label(node, data_property, id_hidden)}'
+
+
 def print_tree(tree, node_id: Hashable = None, id_hidden: bool = True,
                filtering=None, key=None, reverse: bool = False,
                ascii_mode: Union[ASCIIMode, str] = ASCIIMode.ex,
@@ -116,16 +138,8 @@ def print_tree(tree, node_id: Hashable = None, id_hidden: bool = True,
     :param data_property: Data property name
     :param func: Printer function callable
     """
-    ascii_mode = (
-        ascii_mode if isinstance(ascii_mode, ASCIIMode)
-        else ASCIIMode[ascii_mode]
-    )
-
-    result = (
-        f'{pre}{get_label(node, data_property, id_hidden)}'
-        for pre, node in tree_printer_gen(tree, node_id, filtering, key,
-                                          reverse, ascii_mode)
-    )
+    result = tree_lines(tree, node_id, id_hidden, filtering, key, reverse,
+                        ascii_mode, data_property)
 
     if func is not None and callable(func):
         for s in result:
@@ -174,3 +188,243 @@ def export_to_dot(tree, filename: str, shape='circle', graph='digraph'):
             f.write(f'\t{child}\n')
 
         f.write('}')
+
+
+def _json_key(value) -> str:
+    """Encode dictionary key in the same way as :func:`json.dumps` does."""
+    if isinstance(value, str):
+        pass
+    elif value is True:
+        value = 'true'
+    elif value is False:
+        value = 'false'
+    elif value is None:
+        value = 'null'
+    elif isinstance(value, (int, float)):
+        value = json.dumps(value)
+    else:
+        raise TypeError(f'keys must be str, int, float, bool or None, '
+                        f'not {value.__class__.__name__}')
+    return json.dumps(value)
+
+
+def json_chunks(tree, node_id: Hashable = None, with_data: bool = False,
+                sort: bool = True, reverse: bool = False,
+                chunk_size: int = 65536) -> Iterator[str]:
+    """
+    Generate JSON representation of the tree in chunks.
+
+    The output is the same as ``json.dumps(tree.to_dict(...))``, but no
+    intermediate dict is built and the tree is walked without recursion,
+    so memory usage is bounded by the depth of the tree and the
+    ``chunk_size``.
+
+    :param ~ttree.Tree tree: Tree instance
+    :param node_id: Traversal root node ID
+    :param with_data: Include data of nodes
+    :param sort: Sort children of every node
+    :param reverse: Reverse mode
+    :param chunk_size: Approximate size of yielded chunks in characters
+    """
+    node_id = tree.root if node_id is None else node_id
+    buffer, size = [], 0
+
+    def open_node(node):
+        """Return opening text of the node and its children if any."""
+        if node.expanded and node.is_leaf:
+            if with_data:
+                return (f'{{{_json_key(node.tag)}: '
+                        f'{{"data": {json.dumps(node.data)}}}}}'), None
+            return json.dumps(node.tag), None
+
+        children = [tree[i] for i in node.children] if node.expanded else []
+        if sort:
+            children.sort(reverse=reverse)
+        return f'{{{_json_key(node.tag)}: {{"children": [', children
+
+    def close_node(node):
+        if with_data:
+            return f'], "data": {json.dumps(node.data)}}}}}'
+        return ']}}'
+
+    root = tree[node_id]
+    text, children = open_node(root)
+    buffer.append(text)
+    # Every frame holds a node with its children and position of the next
+    # child to write
+    stack = [[root, children, 0]] if children is not None else []
+    while stack:
+        frame = stack[-1]
+        node, children, position = frame
+        if position == len(children):
+            stack.pop()
+            text = close_node(node)
+        else:
+            frame[2] += 1
+            child = children[position]
+            text, grandchildren = open_node(child)
+            if position:
+                text = ', ' + text
+            if grandchildren is not None:
+                stack.append([child, grandchildren, 0])
+
+        buffer.append(text)
+        size += len(text)
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+
+    if buffer:
+        yield ''.join(buffer)
+
+
+def dict_events(value) -> Iterator[tuple]:
+    """
+    Generate events of the tree represented by ``value`` as returned by
+    :meth:`ttree.Tree.to_dict`.
+
+    Events are tuples: ``('start', tag)`` opens a node which is a child
+    of the currently open one, ``('data', data)`` and ``('collapsed',)``
+    describe the currently open node and ``('end',)`` closes it.
+    The structure is walked without recursion.
+    """
+    stack = [iter((value,))]
+    while stack:
+        item = next(stack[-1], _END)
+        if item is _END:
+            stack.pop()
+            if stack:
+                yield ('end',)
+            continue
+
+        if not isinstance(item, dict):
+            yield ('start', item)
+            yield ('end',)
+            continue
+
+        if len(item) != 1:
+            raise ValueError(f'Node must be a dict with exactly one key, '
+                             f'got {list(item)}')
+
+        (tag, content), = item.items()
+        yield ('start', tag)
+        if 'data' in content:
+            yield ('data', content['data'])
+
+        children = content.get('children')
+        if children is not None and not children:
+            yield ('collapsed',)
+        stack.append(iter(children or ()))
+
+
+def json_events(fp, chunk_size: int = 65536) -> Iterator[tuple]:
+    """
+    Generate events of the tree read incrementally from JSON file object.
+
+    The JSON must be in the format of :meth:`ttree.Tree.to_json`. It is
+    read by chunks of ``chunk_size`` characters and parsed without
+    recursion, so only the current chunk and the path of open nodes are
+    kept in memory. Events are the same as of :func:`dict_events`.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, eof = '', 0, False
+
+    def fill() -> bool:
+        nonlocal buffer, position, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    def peek() -> str:
+        """Skip whitespaces and return next character, '' at the end."""
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\n\r':
+                position += 1
+
+            if position < len(buffer):
+                return buffer[position]
+            if not fill():
+                return ''
+
+    def expect(char: str):
+        nonlocal position
+        if peek() != char:
+            raise ValueError(f'Expecting {char!r} in JSON tree')
+        position += 1
+
+    def value():
+        nonlocal position
+        peek()
+        while True:
+            try:
+                result, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+
+            # A number at the end of buffer may be incomplete, a complete
+            # value is always followed by a delimiter
+            if (end == len(buffer) or buffer[end] not in ' \t\n\r,:]}') \
+                    and not eof and fill():
+                continue
+
+            position = end
+            return result
+
+    def node():
+        if peek() != '{':
+            yield ('start', value())
+            yield ('end',)
+            return
+
+        expect('{')
+        yield ('start', value())
+        expect(':')
+        expect('{')
+        stack.append(['members', True])
+
+    stack = []
+    yield from node()
+    while stack:
+        frame = stack[-1]
+        kind, first = frame
+        closing = '}' if kind == 'members' else ']'
+        if peek() == closing:
+            position += 1
+            stack.pop()
+            if kind == 'members':
+                expect('}')
+                yield ('end',)
+            continue
+
+        if not first:
+            expect(',')
+        frame[1] = False
+
+        if kind == 'children':
+            yield from node()
+            continue
+
+        name = value()
+        expect(':')
+        if name == 'data':
+            yield ('data', value())
+        elif name == 'children':
+            expect('[')
+            if peek() == ']':
+                position += 1
+                yield ('collapsed',)
+            else:
+                stack.append(['children', True])
+        else:
+            raise ValueError(f'Unexpected key {name!r} in JSON tree')
+
+    if peek():
+        raise ValueError('Extra data after JSON tree')
@@ -0,0 +1,209 @@
+from collections.abc import Mapping
+from typing import Callable, List, Optional, Union
+
+import ttree.utils
+from ttree.common import ASCIIMode, TraversalMode
+from ttree.exceptions import NodeNotFound
+from .node import Node
+
+
+class SubtreeView(Mapping):
+    """
+    Live read-only view of the subtree of a :class:`~ttree.Tree` returned
+    by :meth:`ttree.Tree.subtree_view`.
+
+    Creating a view is O(1): nothing is copied, reads are delegated to the
+    tree and bounded to the successors of :attr:`root`, which has no
+    parent in the view. Levels are counted from :attr:`root`. Changes of
+    the tree are seen by the view at once.
+
+    A containment check walks parents for the difference of levels, or is
+    O(1) if the interval index of the tree is up to date (see
+    :attr:`ttree.Tree.intervals`). Traversals start from nodes of the
+    view and are delegated to the tree without extra checks.
+    """
+    def __init__(self, tree, node_id):
+        if node_id not in tree:
+            raise NodeNotFound(f"Node '{node_id}' is not in the tree")
+
+        #: id of the root node of the view
+        self.root = node_id
+        self._tree = tree
+
+    def __contains__(self, node_id):
+        tree, root = self._tree, self.root
+        if node_id not in tree or root not in tree:
+            return False
+
+        if tree._intervals is not None:
+            start, stop = tree._intervals.range(root)
+            return start <= tree._intervals.range(node_id)[0] < stop
+
+        steps = tree.level(node_id) - tree.level(root)
+        while steps > 0:
+            node_id = tree[node_id].parent
+            steps -= 1
+        return steps == 0 and node_id == root
+
+    def __getitem__(self, node_id) -> Node:
+        self._check(node_id)
+        return self._tree[node_id]
+
+    def get(self, node_id, default=None):
+        """Return the node or ``default`` if it is not in the view."""
+        try:
+            return self[node_id]
+        except NodeNotFound:
+            return default
+
+    def __iter__(self):
+        """Iterate IDs in pre-order, children in insertion order."""
+        if self.root not in self._tree:
+            return
+
+        tree = self._tree
+        stack = [self.root]
+        while stack:
+            node_id = stack.pop()
+            yield node_id
+            stack.extend(reversed(tree[node_id].children))
+
+    def __len__(self):
+        if self.root not in self._tree:
+            return 0
+        if self._tree._intervals is not None:
+            return self._tree._intervals.subtree_size(self.root)
+        return sum(1 for _ in self)
+
+    def __str__(self) -> str:
+        return ttree.utils.print_tree(self._tree, self.root,
+                                      ascii_mode='simple')
+
+    def _check(self, node_id):
+        if node_id not in self:
+            raise NodeNotFound(f"Node '{node_id}' is not in the subtree")
+
+    def _start(self, node_id):
+        """Return the node to start a traversal from, the root by default."""
+        if node_id is None:
+            return self.root
+        self._check(node_id)
+        return node_id
+
+    @property
+    def tree(self):
+        """Return the tree of the view."""
+        return self._tree
+
+    def children(self, node_id) -> List[Node]:
+        """Return the children (Node) list of ``node_id``."""
+        self._check(node_id)
+        return self._tree.children(node_id)
+
+    def is_branch(self, node_id):
+        """Get the children ids list of the node with ID == node_id."""
+        self._check(node_id)
+        return self._tree.is_branch(node_id)
+
+    def parent(self, node_id) -> Optional[Node]:
+        """Obtain the parent of the node, None for the root of the view."""
+        self._check(node_id)
+        if node_id == self.root:
+            return None
+        return self._tree.parent(node_id)
+
+    def level(self, node_id, filtering=None) -> int:
+        """
+        Get the level of the node counted from the root of the view.
+
+        See :meth:`ttree.Tree.level`.
+        """
+        if filtering is not None:
+            return len(list(self.rsearch(node_id, filtering))) - 1
+
+        self._check(node_id)
+        return self._tree.level(node_id) - self._tree.level(self.root)
+
+    def depth(self, node=None) -> int:
+        """Get the maximum level of the view or the level of the node."""
+        if node is not None:
+            return self.level(node.id if isinstance(node, Node) else node)
+
+        base = self._tree.level(self.root)
+        return max(self._tree.level(n) for n in self) - base
+
+    def size(self, level: int = None) -> int:
+        """Get the number of nodes in the view or at the specific level."""
+        if level is None:
+            return len(self)
+
+        if not isinstance(level, int):
+            raise TypeError(f"Level should be an integer instead "
+                            f"of '{type(level)}'")
+
+        level += self._tree.level(self.root)
+        return sum(1 for n in self if self._tree.level(n) == level)
+
+    def rsearch(self, node_id, filtering=None):
+        """Search from ``node_id`` up to the root of the view."""
+        self._check(node_id)
+        if filtering is not None and not callable(filtering):
+            raise TypeError('Filtering must be a callable.')
+
+        current = node_id
+        while True:
+            node = self._tree[current]
+            if filtering is None or filtering(node):
+                yield current
+            if current == self.root:
+                return
+            current = node.parent
+
+    def expand_tree(self, node_id=None,
+                    mode: Union[TraversalMode, str] = TraversalMode.DEPTH,
+                    filtering: Callable[[Node], bool] = None,
+                    key=None, reverse: bool = False):
+        """Traverse the view, see :meth:`ttree.Tree.expand_tree`."""
+        return self._tree.expand_tree(self._start(node_id), mode,
+                                      filtering, key, reverse)
+
+    def leaves(self, node_id=None) -> List[Node]:
+        """Get leaves of the view or from the given node."""
+        return self._tree.leaves(self._start(node_id))
+
+    def to_dict(self, node_id=None, key=None, sort=True, reverse=False,
+                with_data=False):
+        """Transform the view into a dict, see :meth:`ttree.Tree.to_dict`."""
+        return self._tree.to_dict(self._start(node_id), key, sort, reverse,
+                                  with_data)
+
+    def iter_json(self, node_id=None, with_data=False, sort=True,
+                  reverse=False, chunk_size: int = 65536):
+        """Generate the json string of the view in chunks."""
+        return self._tree.iter_json(self._start(node_id), with_data, sort,
+                                    reverse, chunk_size)
+
+    def to_json(self, with_data=False, sort=True, reverse=False) -> str:
+        """Return the json string corresponding to the view."""
+        return ''.join(
+            self.iter_json(with_data=with_data, sort=sort, reverse=reverse)
+        )
+
+    def print(self, node_id=None, id_hidden=True, filtering=None,
+              key=None, reverse=False, ascii_mode=ASCIIMode.ex,
+              data_property=None):
+        """Print the view, see :meth:`ttree.Tree.print`."""
+        self._tree.print(self._start(node_id), id_hidden, filtering, key,
+                         reverse, ascii_mode, data_property)
+
+    def save2file(self, filename, node_id=None, id_hidden=True,
+                  filtering=None, key=None, reverse=False,
+                  ascii_mode=ASCIIMode.ex, data_property=None):
+        """Save the view into file, see :meth:`ttree.Tree.save2file`."""
+        self._tree.save2file(filename, self._start(node_id), id_hidden,
+                             filtering, key, reverse, ascii_mode,
+                             data_property)
+
+    def to_tree(self):
+        """Copy the subtree with :meth:`ttree.Tree.subtree`."""
+        return self._tree.subtree(self.root)